@@ -0,0 +1,38 @@
+"""job result cache and cache usage counters
+
+Revision ID: 0005
+Revises: 0004
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "job_result_cache",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("input_sha256", sa.String(length=64), nullable=False),
+        sa.Column("pipeline_key", sa.String(length=64), nullable=False),
+        sa.Column("job_id", sa.Integer(), sa.ForeignKey("jobs.id"), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.UniqueConstraint("input_sha256", "pipeline_key", name="uq_job_result_cache_input_pipeline"),
+    )
+    op.create_index("ix_job_result_cache_input_sha256", "job_result_cache", ["input_sha256"])
+    op.create_index("ix_job_result_cache_job_id", "job_result_cache", ["job_id"])
+
+    op.add_column("org_usage_monthly", sa.Column("cache_hits", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("org_usage_monthly", sa.Column("cache_misses", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade():
+    op.drop_column("org_usage_monthly", "cache_misses")
+    op.drop_column("org_usage_monthly", "cache_hits")
+    op.drop_index("ix_job_result_cache_job_id", table_name="job_result_cache")
+    op.drop_index("ix_job_result_cache_input_sha256", table_name="job_result_cache")
+    op.drop_table("job_result_cache")
@@ -0,0 +1,28 @@
+"""composite indexes for keyset-paginated events and analytics
+
+Revision ID: 0006
+Revises: 0005
+"""
+
+from alembic import op
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_events_job_timestamp", "events", ["job_id", "timestamp", "id"])
+    op.create_index("ix_events_job_clip_timestamp", "events", ["job_id", "clip_id", "timestamp", "id"])
+    op.create_index("ix_analytics_windows_job_t_start", "analytics_windows", ["job_id", "t_start", "id"])
+    op.create_index(
+        "ix_analytics_windows_job_clip_t_start", "analytics_windows", ["job_id", "clip_id", "t_start", "id"]
+    )
+
+
+def downgrade():
+    op.drop_index("ix_analytics_windows_job_clip_t_start", table_name="analytics_windows")
+    op.drop_index("ix_analytics_windows_job_t_start", table_name="analytics_windows")
+    op.drop_index("ix_events_job_clip_timestamp", table_name="events")
+    op.drop_index("ix_events_job_timestamp", table_name="events")
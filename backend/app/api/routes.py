@@ -1,27 +1,95 @@
+import hashlib
+import math
+import uuid
 from datetime import datetime, timezone
 from pathlib import Path
 
+from botocore.exceptions import ClientError
 from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
-from fastapi.responses import RedirectResponse
-from sqlalchemy import select
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, RedirectResponse
+from sqlalchemy import select, tuple_
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.db.session import get_db
 from app.models.entities import AnalyticsWindow, ApiToken, Event, Job, Organization
-from app.schemas.api import AnalyticsWindowOut, ArtifactManifestOut, AuthIn, DataProductOut, EventOut, JobOut, ReviewIn, TokenOut
+from app.schemas.api import (
+    AnalyticsWindowOut,
+    ArtifactManifestOut,
+    AuthIn,
+    DataProductOut,
+    DirectUploadCompleteIn,
+    DirectUploadIn,
+    DirectUploadOut,
+    EventOut,
+    JobOut,
+    ReviewIn,
+    TokenOut,
+    UploadPartUrlOut,
+)
 from app.services.auth import AuthContext, authenticate_user, issue_api_token, issue_token, require_user, token_hash
-from app.services.storage import signed_url, upload_bytes
+from app.services.storage import (
+    MULTIPART_PART_SIZE,
+    MultipartUpload,
+    abort_multipart_upload,
+    complete_multipart_upload,
+    create_multipart_upload,
+    delete_object,
+    move_object,
+    object_size,
+    signed_part_url,
+    signed_url,
+)
 from app.services.usage import ensure_within_limits, get_or_create_usage, record_export
 from app.workers.tasks import process_job
 
 router = APIRouter(prefix="/api")
 
+UPLOAD_READ_BYTES = 1024 * 1024
+MAX_UPLOAD_PARTS = 10000
+
 
 def enqueue_job(job_id: int) -> None:
     process_job.apply_async(args=[job_id], queue="video")
 
 
+def upload_extension(filename: str) -> str:
+    ext = Path(filename).suffix.lower().replace(".", "")
+    allowed = {e.strip() for e in settings.allowed_extensions.split(",") if e.strip()} | {"zip"}
+    if ext not in allowed:
+        raise HTTPException(status_code=400, detail="Unsupported format")
+    return ext
+
+
+async def stream_upload_to_storage(file: UploadFile, ext: str, max_bytes: int) -> tuple[str, str, int]:
+    """
+    Copy an upload into object storage in bounded chunks, hashing as it goes.
+
+    The body is staged under a random key and then moved to its
+    content-addressed key `jobs/raw/<sha256>.<ext>`. Returns (key, sha256, size).
+    """
+    staging_key = f"jobs/raw/staging/{uuid.uuid4().hex}"
+    upload = await run_in_threadpool(MultipartUpload, staging_key, file.content_type or "video/mp4")
+    hasher = hashlib.sha256()
+
+    try:
+        while chunk := await file.read(UPLOAD_READ_BYTES):
+            if upload.size + len(chunk) > max_bytes:
+                raise HTTPException(status_code=400, detail="File too large")
+            hasher.update(chunk)
+            await run_in_threadpool(upload.write, chunk)
+        await run_in_threadpool(upload.complete)
+    except BaseException:
+        await run_in_threadpool(upload.abort)
+        raise
+
+    digest = hasher.hexdigest()
+    key = f"jobs/raw/{digest}.{ext}"
+    await run_in_threadpool(move_object, staging_key, key)
+    return key, digest, upload.size
+
+
 @router.post("/auth/login", response_model=TokenOut)
 def login(payload: AuthIn):
     auth = authenticate_user(payload.username, payload.password)
@@ -38,29 +106,112 @@ async def upload_video(
     auth: AuthContext = Depends(require_user),
 ):
     ensure_within_limits(db, auth.org_id)
-    ext = Path(file.filename).suffix.lower().replace(".", "")
-    allowed = {e.strip() for e in settings.allowed_extensions.split(",") if e.strip()} | {"zip"}
-    if ext not in allowed:
-        raise HTTPException(status_code=400, detail="Unsupported format")
-    payload = await file.read()
-    if len(payload) > settings.upload_max_mb * 1024 * 1024:
+    ext = upload_extension(file.filename)
+    key, digest, size = await stream_upload_to_storage(file, ext, settings.upload_max_mb * 1024 * 1024)
+    job = Job(
+        org_id=auth.org_id,
+        filename=file.filename,
+        status="queued",
+        storage_key=key,
+        settings_json={"fps_sampled": settings.fps_sampled, "input_sha256": digest, "input_size_bytes": size},
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    # the worker checks the result cache against its own pipeline settings
+    enqueue_job(job.id)
+    return job
+
+
+@router.post("/videos/uploads", response_model=DirectUploadOut)
+def create_direct_upload(payload: DirectUploadIn, db: Session = Depends(get_db), auth: AuthContext = Depends(require_user)):
+    """Create a job plus presigned multipart part URLs so the client uploads straight to object storage."""
+    ensure_within_limits(db, auth.org_id)
+    ext = upload_extension(payload.filename)
+    if payload.size_bytes > settings.upload_max_mb * 1024 * 1024:
         raise HTTPException(status_code=400, detail="File too large")
-    key = f"jobs/raw/{file.filename}"
-    upload_bytes(key, payload, file.content_type or "video/mp4")
-    job = Job(org_id=auth.org_id, filename=file.filename, status="queued", storage_key=key, settings_json={"fps_sampled": settings.fps_sampled})
+
+    part_size = max(MULTIPART_PART_SIZE, math.ceil(payload.size_bytes / MAX_UPLOAD_PARTS))
+    part_count = math.ceil(payload.size_bytes / part_size)
+    key = f"jobs/raw/direct/{uuid.uuid4().hex}.{ext}"
+    upload_id = create_multipart_upload(key, payload.content_type)
+
+    job = Job(
+        org_id=auth.org_id,
+        filename=payload.filename,
+        status="uploading",
+        storage_key=key,
+        settings_json={"fps_sampled": settings.fps_sampled, "upload_id": upload_id, "input_size_bytes": payload.size_bytes},
+    )
     db.add(job)
     db.commit()
     db.refresh(job)
+
+    return DirectUploadOut(
+        job_id=job.id,
+        upload_id=upload_id,
+        part_size=part_size,
+        parts=[UploadPartUrlOut(part_number=n, url=signed_part_url(key, upload_id, n)) for n in range(1, part_count + 1)],
+    )
+
+
+@router.post("/videos/uploads/{job_id}/complete", response_model=JobOut)
+def complete_direct_upload(
+    job_id: int,
+    payload: DirectUploadCompleteIn,
+    db: Session = Depends(get_db),
+    auth: AuthContext = Depends(require_user),
+):
+    job = db.get(Job, job_id)
+    if not job or job.org_id != auth.org_id:
+        raise HTTPException(status_code=404, detail="Not found")
+    upload_id = (job.settings_json or {}).get("upload_id")
+    if job.status != "uploading" or not upload_id:
+        raise HTTPException(status_code=409, detail="Upload already completed")
+
+    try:
+        complete_multipart_upload(job.storage_key, upload_id, [{"PartNumber": p.part_number, "ETag": p.etag} for p in payload.parts])
+    except ClientError as exc:
+        raise HTTPException(status_code=400, detail="Upload incomplete or parts invalid") from exc
+
+    size = object_size(job.storage_key)
+    if size > settings.upload_max_mb * 1024 * 1024:
+        delete_object(job.storage_key)
+        job.status = "failed"
+        db.commit()
+        raise HTTPException(status_code=400, detail="File too large")
+
+    job.status = "queued"
+    job.settings_json = {**{k: v for k, v in (job.settings_json or {}).items() if k != "upload_id"}, "input_size_bytes": size}
+    db.commit()
+    db.refresh(job)
     enqueue_job(job.id)
     return job
 
 
+@router.delete("/videos/uploads/{job_id}")
+def abort_direct_upload(job_id: int, db: Session = Depends(get_db), auth: AuthContext = Depends(require_user)):
+    job = db.get(Job, job_id)
+    if not job or job.org_id != auth.org_id:
+        raise HTTPException(status_code=404, detail="Not found")
+    upload_id = (job.settings_json or {}).get("upload_id")
+    if job.status != "uploading" or not upload_id:
+        raise HTTPException(status_code=409, detail="Upload already completed")
+    abort_multipart_upload(job.storage_key, upload_id)
+    job.status = "failed"
+    db.commit()
+    return {"ok": True}
+
+
 @router.post("/jobs/{job_id}/run", response_model=JobOut)
 def run_job(job_id: int, db: Session = Depends(get_db), auth: AuthContext = Depends(require_user)):
     ensure_within_limits(db, auth.org_id)
     job = db.get(Job, job_id)
     if not job or job.org_id != auth.org_id:
         raise HTTPException(status_code=404, detail="Not found")
+    if job.status == "uploading":
+        # the object is only assembled by /videos/uploads/{id}/complete
+        raise HTTPException(status_code=409, detail="Upload not completed")
     enqueue_job(job_id)
     job.status = "queued"
     db.commit()
@@ -81,26 +232,130 @@ def job_detail(job_id: int, db: Session = Depends(get_db), auth: AuthContext = D
     return job
 
 
-@router.get("/jobs/{job_id}/events", response_model=list[EventOut])
-def events(job_id: int, clip_id: str | None = Query(default=None), db: Session = Depends(get_db), auth: AuthContext = Depends(require_user)):
+MAX_PAGE_ROWS = 10_000
+
+
+def _projection(fields: str | None, allowed: list[str]) -> list[str]:
+    if not fields:
+        return allowed
+    names = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in names if f not in allowed]
+    if unknown or not names:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}" if unknown else "No fields")
+    return names
+
+
+def _parse_cursor(cursor: str) -> tuple[float, int]:
+    try:
+        key, row_id = cursor.rsplit(":", 1)
+        return float(key), int(row_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+
+
+def _result_rows(
+    db: Session,
+    model,
+    time_col,
+    *,
+    job_id: int,
+    clip_id: str | None,
+    fields: list[str],
+    t_from: float | None,
+    t_to: float | None,
+    cursor: str | None,
+    limit: int | None,
+) -> JSONResponse:
+    """
+    Rows of `model` for one job ordered by (time_col, id), as plain JSON.
+
+    Objects carry the response model's fields, or only those named in
+    `fields`, so the endpoints declare no `response_model` (it would reject or
+    re-inflate projected rows). Only the requested columns are selected (no
+    ORM objects, no JSON columns unless asked for) and serialized directly.
+    With `limit`, at most that
+    many rows are returned and, when more follow, the `X-Next-Cursor` header
+    holds the key to pass back as `cursor` (keyset pagination: each page is an
+    index range scan on (job_id, time_col) however deep it is).
+    """
+    stmt = select(*(getattr(model, f) for f in fields), time_col, model.id).where(model.job_id == job_id)
+    if clip_id:
+        stmt = stmt.where(model.clip_id == clip_id)
+    if t_from is not None:
+        stmt = stmt.where(time_col >= t_from)
+    if t_to is not None:
+        stmt = stmt.where(time_col < t_to)
+    if cursor:
+        stmt = stmt.where(tuple_(time_col, model.id) > _parse_cursor(cursor))
+    stmt = stmt.order_by(time_col, model.id)
+    if limit is not None:
+        stmt = stmt.limit(limit + 1)
+
+    rows = db.execute(stmt).all()
+    headers = {}
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = f"{rows[-1][-2]!r}:{rows[-1][-1]}"
+    n = len(fields)
+    return JSONResponse([dict(zip(fields, row[:n])) for row in rows], headers=headers)
+
+
+@router.get("/jobs/{job_id}/events")
+def events(
+    job_id: int,
+    clip_id: str | None = Query(default=None),
+    fields: str | None = Query(default=None, description="Comma-separated subset of event fields"),
+    t_from: float | None = Query(default=None),
+    t_to: float | None = Query(default=None),
+    cursor: str | None = Query(default=None),
+    limit: int | None = Query(default=None, ge=1, le=MAX_PAGE_ROWS),
+    db: Session = Depends(get_db),
+    auth: AuthContext = Depends(require_user),
+):
     job = db.get(Job, job_id)
     if not job or job.org_id != auth.org_id:
         raise HTTPException(status_code=404, detail="Not found")
-    stmt = select(Event).where(Event.job_id == job_id)
-    if clip_id:
-        stmt = stmt.where(Event.clip_id == clip_id)
-    return db.scalars(stmt.order_by(Event.timestamp)).all()
-
-
-@router.get("/jobs/{job_id}/analytics", response_model=list[AnalyticsWindowOut])
-def analytics(job_id: int, clip_id: str | None = Query(default=None), db: Session = Depends(get_db), auth: AuthContext = Depends(require_user)):
+    return _result_rows(
+        db,
+        Event,
+        Event.timestamp,
+        job_id=job_id,
+        clip_id=clip_id,
+        fields=_projection(fields, list(EventOut.model_fields)),
+        t_from=t_from,
+        t_to=t_to,
+        cursor=cursor,
+        limit=limit,
+    )
+
+
+@router.get("/jobs/{job_id}/analytics")
+def analytics(
+    job_id: int,
+    clip_id: str | None = Query(default=None),
+    fields: str | None = Query(default=None, description="Comma-separated subset of window fields"),
+    t_from: float | None = Query(default=None),
+    t_to: float | None = Query(default=None),
+    cursor: str | None = Query(default=None),
+    limit: int | None = Query(default=None, ge=1, le=MAX_PAGE_ROWS),
+    db: Session = Depends(get_db),
+    auth: AuthContext = Depends(require_user),
+):
     job = db.get(Job, job_id)
     if not job or job.org_id != auth.org_id:
         raise HTTPException(status_code=404, detail="Not found")
-    stmt = select(AnalyticsWindow).where(AnalyticsWindow.job_id == job_id)
-    if clip_id:
-        stmt = stmt.where(AnalyticsWindow.clip_id == clip_id)
-    return db.scalars(stmt.order_by(AnalyticsWindow.t_start)).all()
+    return _result_rows(
+        db,
+        AnalyticsWindow,
+        AnalyticsWindow.t_start,
+        job_id=job_id,
+        clip_id=clip_id,
+        fields=_projection(fields, list(AnalyticsWindowOut.model_fields)),
+        t_from=t_from,
+        t_to=t_to,
+        cursor=cursor,
+        limit=limit,
+    )
 
 
 @router.get("/jobs/{job_id}/clips")
@@ -212,6 +467,8 @@ def org_usage(db: Session = Depends(get_db), auth: AuthContext = Depends(require
         "processed_minutes": usage.processed_minutes,
         "jobs_total": usage.jobs_total,
         "exports_total": usage.exports_total,
+        "cache_hits": usage.cache_hits,
+        "cache_misses": usage.cache_misses,
         "limits": {
             "processed_minutes": settings.usage_limit_minutes_per_month,
             "jobs": settings.usage_limit_jobs_per_month,
@@ -15,6 +15,32 @@ class Settings(BaseSettings):
     upload_max_mb: int = 1024
     allowed_extensions: str = "mp4,mov,mkv"
     fps_sampled: int = 5
+    yolo_weights: str = "/app/backend/yolov8n.pt"
+    yolo_device: str = "cpu"
+    yolo_warmup_on_start: bool = True
+    yolo_backend: str = "torch"
+    yolo_export_dir: str = ""
+    yolo_intra_op_threads: int = 0
+    yolo_inter_op_threads: int = 0
+    yolo_int8_max_drift: float = 0.05
+    yolo_imgsz: int = 640
+    inference_roi: str = ""
+    adaptive_imgsz_min: int = 0
+    adaptive_window_frames: int = 10
+    adaptive_min_detections: int = 1
+    keyframe_interval_max: int = 1
+    keyframe_interval_min: int = 1
+    keyframe_motion_high_px: float = 12.0
+    track_batch_size: int = 8
+    pipeline_queue_depth: int = 16
+    video_decoder: str = "opencv"
+    ffmpeg_decode_threads: int = 0
+    preview_full_res_annotation: bool = False
+    chunk_duration_s: float = 0.0
+    chunk_overlap_s: float = 2.0
+    analytics_window_s: float = 5.0
+    analytics_track_idle_s: float = 2.0
+    analytics_flush_rows: int = 500
     cors_origins: str = "http://localhost:3000,http://127.0.0.1:3000"
     usage_limit_minutes_per_month: int = 5000
     usage_limit_jobs_per_month: int = 200
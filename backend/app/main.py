@@ -21,6 +21,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # paginated results put the next page's cursor in this header
+    expose_headers=["X-Next-Cursor"],
 )
 app.include_router(router)
 
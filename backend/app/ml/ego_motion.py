@@ -37,4 +37,111 @@ def estimate_global_motion(
     deltas = curr_pts[valid] - prev_pts[valid]
     dx = float(np.median(deltas[:, 0, 0]))
     dy = float(np.median(deltas[:, 0, 1]))
-    return dx, dy
\ No newline at end of file
+    return dx, dy
+
+
+class EgoMotionEstimator:
+    """
+    Stateful global-motion estimator for a frame sequence.
+
+    Compared with calling `estimate_global_motion` on each consecutive pair, the
+    previous frame's downscaled gray image and tracked points are kept between
+    calls, so every frame is converted and resized once and `goodFeaturesToTrack`
+    only runs again when fewer than `min_points` points survive. Work happens on
+    a copy downscaled to `width` pixels; results are in input-frame pixels.
+
+    Pass the frame's object boxes (xc, yc, w, h in input pixels) to `update` to
+    keep features off moving traffic, which otherwise biases the median.
+    """
+
+    def __init__(
+        self,
+        *,
+        width: int = 320,
+        max_corners: int = 200,
+        min_points: int = 40,
+        quality_level: float = 0.01,
+        min_distance: int = 6,
+        win_size: tuple[int, int] = (15, 15),
+        max_level: int = 2,
+    ):
+        self.width = width
+        self.max_corners = max_corners
+        self.min_points = min_points
+        self.quality_level = quality_level
+        self.min_distance = min_distance
+        self.win_size = win_size
+        self.max_level = max_level
+        self.redetections = 0
+        self.reset()
+
+    def reset(self) -> None:
+        self._prev_gray: np.ndarray | None = None
+        self._points: np.ndarray | None = None
+
+    def update(self, frame: np.ndarray | None, boxes: np.ndarray | None = None) -> tuple[float, float]:
+        """Add the next frame and return its (dx, dy) motion relative to the previous one."""
+        if cv2 is None or frame is None:
+            return 0.0, 0.0
+
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        h, w = gray.shape[:2]
+        scale = w / self.width if w > self.width else 1.0
+        if scale != 1.0:
+            gray = cv2.resize(gray, (self.width, max(1, int(round(h / scale)))), interpolation=cv2.INTER_AREA)
+        boxes = None if boxes is None or len(boxes) == 0 else np.asarray(boxes, dtype=np.float32) / scale
+
+        prev_gray, points = self._prev_gray, self._points
+        self._prev_gray = gray
+
+        if prev_gray is None or prev_gray.shape != gray.shape:
+            self._points = self._detect(gray, boxes)
+            return 0.0, 0.0
+
+        if points is None or len(points) < self.min_points:
+            points = self._detect(prev_gray, boxes)
+            if points is None:
+                self._points = None
+                return 0.0, 0.0
+
+        next_points, status, _ = cv2.calcOpticalFlowPyrLK(
+            prev_gray, gray, points, None, winSize=self.win_size, maxLevel=self.max_level
+        )
+        if next_points is None or status is None:
+            self._points = None
+            return 0.0, 0.0
+
+        valid = status.reshape(-1) == 1
+        if boxes is not None:
+            valid &= ~_inside_boxes(next_points.reshape(-1, 2), boxes)
+        self._points = next_points[valid]
+        if valid.sum() < 8:
+            return 0.0, 0.0
+
+        deltas = (next_points[valid] - points[valid]).reshape(-1, 2)
+        dx, dy = np.median(deltas, axis=0) * scale
+        return float(dx), float(dy)
+
+    def _detect(self, gray: np.ndarray, boxes: np.ndarray | None) -> np.ndarray | None:
+        mask = None
+        if boxes is not None:
+            mask = np.full(gray.shape, 255, dtype=np.uint8)
+            for xc, yc, bw, bh in boxes:
+                x1, y1 = max(0, int(xc - bw / 2)), max(0, int(yc - bh / 2))
+                mask[y1:int(yc + bh / 2) + 1, x1:int(xc + bw / 2) + 1] = 0
+        self.redetections += 1
+        points = cv2.goodFeaturesToTrack(
+            gray,
+            maxCorners=self.max_corners,
+            qualityLevel=self.quality_level,
+            minDistance=self.min_distance,
+            mask=mask,
+        )
+        return None if points is None or len(points) == 0 else points
+
+
+def _inside_boxes(points: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+    """Boolean per point: inside any (xc, yc, w, h) box."""
+    dx = np.abs(points[:, None, 0] - boxes[None, :, 0]) <= boxes[None, :, 2] / 2
+    dy = np.abs(points[:, None, 1] - boxes[None, :, 1]) <= boxes[None, :, 3] / 2
+    return (dx & dy).any(axis=1)
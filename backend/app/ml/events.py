@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from typing import Any
+
+VEHICLE_CLASSES = frozenset({"car", "truck", "bus"})
+BIKE_CLASSES = frozenset({"bicycle", "motorcycle"})
+
+
+class TrackEventState:
+    """
+    O(1) running state behind the event heuristics for one track.
+
+    Holds what `cut_in_confidence`, `close_following_confidence` and
+    `bike_proximity_confidence` actually read from a trajectory: the first and
+    latest point, the first and latest "close" centred timestamps and the
+    count of close bike points.
+    """
+
+    __slots__ = (
+        "class_name", "n", "first_xc", "first_area", "last_t", "last_xc", "last_area",
+        "follow_start_t", "follow_last_t", "bike_close", "bike_first_t", "fired",
+    )
+
+    def __init__(self, class_name: str):
+        self.class_name = class_name
+        self.n = 0
+        self.first_xc = self.first_area = 0.0
+        self.last_t = self.last_xc = self.last_area = 0.0
+        self.follow_start_t: float | None = None
+        self.follow_last_t = 0.0
+        self.bike_close = 0
+        self.bike_first_t = 0.0
+        self.fired: set[str] = set()
+
+
+class EventEngine:
+    """
+    Online version of the per-track event heuristics in `app.ml.heuristics`.
+
+    `update` folds one observation into the track's `TrackEventState` and
+    returns candidate events whose threshold was crossed by it (each type
+    fires at most once per track). `finish` drops the state and returns the
+    track's final events; their confidences equal the batch functions applied
+    to the full trajectory. Vehicles are scored for cut-in and close
+    following, bicycles and motorcycles for proximity.
+    """
+
+    def __init__(self, frame_w: int, *, min_follow_s: float = 2.0):
+        self.frame_w = frame_w
+        self.center_lo = frame_w * 0.33
+        self.center_hi = frame_w * 0.67
+        self.min_follow_s = min_follow_s
+        self.tracks: dict[int, TrackEventState] = {}
+
+    def update(self, track_id: int, class_name: str, t: float, xc: float, area: float, area_ratio: float) -> list[dict[str, Any]]:
+        state = self.tracks.get(track_id)
+        if state is None:
+            state = self.tracks[track_id] = TrackEventState(class_name)
+            state.first_xc, state.first_area = xc, area
+        state.n += 1
+        state.last_t, state.last_xc, state.last_area = t, xc, area
+
+        centered = self.center_lo <= xc <= self.center_hi
+        if state.class_name in VEHICLE_CLASSES:
+            if centered and area_ratio > 0.08:
+                if state.follow_start_t is None:
+                    state.follow_start_t = t
+                state.follow_last_t = t
+        elif state.class_name in BIKE_CLASSES:
+            if centered and area_ratio > 0.01:
+                if state.bike_close == 0:
+                    state.bike_first_t = t
+                state.bike_close += 1
+
+        crossed = []
+        for event in self._events(state):
+            if event["type"] not in state.fired:
+                state.fired.add(event["type"])
+                crossed.append(event)
+        return crossed
+
+    def finish(self, track_id: int) -> list[dict[str, Any]]:
+        state = self.tracks.pop(track_id, None)
+        return [] if state is None else self._events(state)
+
+    def _events(self, state: TrackEventState) -> list[dict[str, Any]]:
+        events = []
+        if state.class_name in VEHICLE_CLASSES:
+            cut_in = self._cut_in(state)
+            if cut_in > 0:
+                events.append({"type": "cut_in", "timestamp": state.last_t, "confidence": cut_in})
+            follow = self._close_following(state)
+            if follow > 0:
+                events.append({"type": "close_following", "timestamp": state.follow_start_t, "confidence": follow})
+        elif state.class_name in BIKE_CLASSES and state.bike_close:
+            events.append(
+                {"type": "bike_proximity", "timestamp": state.bike_first_t, "confidence": min(1.0, 0.4 + state.bike_close * 0.1)}
+            )
+        return events
+
+    def _cut_in(self, state: TrackEventState) -> float:
+        # mirrors cut_in_confidence: start outside the centre band, end inside, box grew
+        if state.n < 3:
+            return 0.0
+        start_center = self.center_lo <= state.first_xc <= self.center_hi
+        end_center = self.center_lo <= state.last_xc <= self.center_hi
+        area_growth = (state.last_area - state.first_area) / max(state.first_area, 1)
+        if not start_center and end_center and area_growth > 0.35:
+            return min(1.0, 0.5 + area_growth / 2)
+        return 0.0
+
+    def _close_following(self, state: TrackEventState) -> float:
+        if state.follow_start_t is None:
+            return 0.0
+        dur = state.follow_last_t - state.follow_start_t
+        if dur < self.min_follow_s:
+            return 0.0
+        return min(1.0, dur / 6.0)
@@ -1,5 +1,7 @@
 from collections import defaultdict
 
+import numpy as np
+
 
 def in_center(xc: float, frame_w: int) -> bool:
     return frame_w * 0.33 <= xc <= frame_w * 0.67
@@ -68,3 +70,99 @@ def build_windows(samples: list[dict], window_s: int = 5) -> list[dict]:
             "avg_speed_proxy": sum(comp_motions) / max(1, len(comp_motions)),
         })
     return out
+
+
+def congestion_scores(
+    active_tracks: np.ndarray,
+    avg_compensated_speed: np.ndarray,
+    stopped_ratio: np.ndarray,
+    density_index: np.ndarray | None = None,
+) -> np.ndarray:
+    """`congestion_score` over arrays of windows; element-wise identical to the scalar version."""
+    if density_index is None:
+        density_index = np.asarray(active_tracks, dtype=np.float64) / 20.0
+    density = np.maximum(0.0, np.minimum(1.0, np.asarray(density_index, dtype=np.float64)))
+    stopped = np.maximum(0.0, np.minimum(1.0, np.asarray(stopped_ratio, dtype=np.float64)))
+    low_speed = 1.0 - np.minimum(1.0, np.maximum(0.0, np.asarray(avg_compensated_speed, dtype=np.float64)) / 8.0)
+    score = 100.0 * (0.45 * density + 0.35 * stopped + 0.20 * low_speed)
+    return _round2(np.maximum(0.0, np.minimum(100.0, score)))
+
+
+def _round2(values: np.ndarray) -> np.ndarray:
+    """Python's `round(x, 2)` for arrays: `np.round` unless x sits on a rounding tie."""
+    scaled = values * 100.0
+    out = np.rint(scaled) / 100.0
+    # np.rint(x * 100) can land on the other side of a .5 tie than Python's
+    # correctly rounded decimal result; those few values go through round()
+    ties = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    for i in ties:
+        out[i] = round(float(values[i]), 2)
+    return out
+
+
+def build_windows_arrays(
+    t: np.ndarray,
+    raw_motion: np.ndarray,
+    comp_motion: np.ndarray,
+    active_tracks: np.ndarray,
+    clip_id: np.ndarray | None = None,
+    window_s: int = 5,
+) -> dict[str, np.ndarray]:
+    """
+    Columnar `build_windows` for large sample sets.
+
+    Samples are grouped by (clip_id, window index) with one `np.unique` and
+    reduced with `np.bincount`, which sums each group in input order, so every
+    window equals what `build_windows` returns for that clip's samples. Rows
+    are sorted by clip_id, then t_start; `congestion_score` is included.
+    """
+    t = np.asarray(t, dtype=np.float64)
+    n = len(t)
+    empty = {
+        key: np.zeros(0)
+        for key in (
+            "t_start", "t_end", "active_tracks", "avg_raw_speed", "avg_compensated_speed",
+            "stopped_ratio", "density_index", "avg_speed_proxy", "congestion_score",
+        )
+    }
+    if n == 0:
+        return {"clip_id": np.zeros(0, dtype=object), **empty}
+
+    idx = (t // window_s).astype(np.int64)
+    if clip_id is None:
+        clips, clip_codes = np.array([None], dtype=object), np.zeros(n, dtype=np.int64)
+    else:
+        # Samples usually arrive clip by clip: factorize the runs, not every row
+        clip_id = np.asarray(clip_id)
+        starts = np.flatnonzero(np.concatenate(([True], clip_id[1:] != clip_id[:-1])))
+        clips, run_codes = np.unique(clip_id[starts], return_inverse=True)
+        clip_codes = np.repeat(run_codes.reshape(-1), np.diff(np.append(starts, n)))
+    span = int(idx.max() - idx.min()) + 1
+    keys, group = np.unique(clip_codes.reshape(-1) * span + (idx - idx.min()), return_inverse=True)
+    group = group.reshape(-1)
+    groups = len(keys)
+
+    comp = np.asarray(comp_motion, dtype=np.float64)
+    counts = np.bincount(group, minlength=groups).astype(np.float64)
+    raw_sum = np.bincount(group, weights=np.asarray(raw_motion, dtype=np.float64), minlength=groups)
+    comp_sum = np.bincount(group, weights=comp, minlength=groups)
+    stopped = np.bincount(group, weights=(comp < 1.0).astype(np.float64), minlength=groups)
+    active = np.zeros(groups, dtype=np.int64)
+    np.maximum.at(active, group, np.asarray(active_tracks, dtype=np.int64))
+
+    window_idx = keys % span + idx.min()
+    avg_comp = comp_sum / counts
+    stopped_ratio = stopped / counts
+    density_index = np.minimum(1.0, active / 20.0)
+    return {
+        "clip_id": clips[keys // span],
+        "t_start": window_idx * window_s,
+        "t_end": (window_idx + 1) * window_s,
+        "active_tracks": active,
+        "avg_raw_speed": raw_sum / counts,
+        "avg_compensated_speed": avg_comp,
+        "stopped_ratio": stopped_ratio,
+        "density_index": density_index,
+        "avg_speed_proxy": avg_comp,
+        "congestion_score": congestion_scores(active, avg_comp, stopped_ratio, density_index),
+    }
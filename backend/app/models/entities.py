@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import DateTime, Float, ForeignKey, Integer, JSON, String, Text
+from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer, JSON, String, Text, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.session import Base
 
@@ -38,6 +38,10 @@ class Track(Base):
 
 class Event(Base):
     __tablename__ = "events"
+    __table_args__ = (
+        Index("ix_events_job_timestamp", "job_id", "timestamp", "id"),
+        Index("ix_events_job_clip_timestamp", "job_id", "clip_id", "timestamp", "id"),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     job_id: Mapped[int] = mapped_column(ForeignKey("jobs.id"), index=True)
     clip_id: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)
@@ -55,6 +59,10 @@ class Event(Base):
 
 class AnalyticsWindow(Base):
     __tablename__ = "analytics_windows"
+    __table_args__ = (
+        Index("ix_analytics_windows_job_t_start", "job_id", "t_start", "id"),
+        Index("ix_analytics_windows_job_clip_t_start", "job_id", "clip_id", "t_start", "id"),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     job_id: Mapped[int] = mapped_column(ForeignKey("jobs.id"), index=True)
     clip_id: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)
@@ -99,3 +107,15 @@ class OrgUsageMonthly(Base):
     processed_minutes: Mapped[float] = mapped_column(Float, default=0.0)
     jobs_total: Mapped[int] = mapped_column(Integer, default=0)
     exports_total: Mapped[int] = mapped_column(Integer, default=0)
+    cache_hits: Mapped[int] = mapped_column(Integer, default=0)
+    cache_misses: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class JobResultCache(Base):
+    __tablename__ = "job_result_cache"
+    __table_args__ = (UniqueConstraint("input_sha256", "pipeline_key", name="uq_job_result_cache_input_pipeline"),)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    input_sha256: Mapped[str] = mapped_column(String(64), index=True)
+    pipeline_key: Mapped[str] = mapped_column(String(64))
+    job_id: Mapped[int] = mapped_column(ForeignKey("jobs.id"), index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
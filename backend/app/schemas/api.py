@@ -75,3 +75,30 @@ class ArtifactOut(BaseModel):
 class ArtifactManifestOut(BaseModel):
     job_id: int
     artifacts: list[ArtifactOut]
+
+
+class DirectUploadIn(BaseModel):
+    filename: str
+    size_bytes: int = Field(gt=0)
+    content_type: str = "video/mp4"
+
+
+class UploadPartUrlOut(BaseModel):
+    part_number: int
+    url: str
+
+
+class DirectUploadOut(BaseModel):
+    job_id: int
+    upload_id: str
+    part_size: int
+    parts: list[UploadPartUrlOut]
+
+
+class UploadedPartIn(BaseModel):
+    part_number: int = Field(ge=1, le=10000)
+    etag: str
+
+
+class DirectUploadCompleteIn(BaseModel):
+    parts: list[UploadedPartIn]
@@ -0,0 +1,153 @@
+from sqlalchemy import insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.entities import AnalyticsWindow, Event, Job, JobResultCache, Track
+from app.services.data_product import hash_payload
+
+# Bump when a worker change alters tracks/events/windows or the preview for the same input
+#   3: event confidences scored over whole tracks (no truncated history)
+#   4: preview rendered by FrameAnnotator (bounded trails, preview-scale blur)
+#   5: preview annotated at preview resolution
+PIPELINE_VERSION = "5"
+
+
+def pipeline_key(job_settings: dict | None) -> str:
+    """Fingerprint of everything besides the input bytes that determines a job's results."""
+    job_settings = job_settings or {}
+    return hash_payload(
+        {
+            "pipeline": PIPELINE_VERSION,
+            "weights": settings.yolo_weights,
+            "backend": settings.yolo_backend,
+            "imgsz": settings.yolo_imgsz,
+            "roi": settings.inference_roi,
+            "adaptive_imgsz": [
+                settings.adaptive_imgsz_min,
+                settings.adaptive_window_frames,
+                settings.adaptive_min_detections,
+            ],
+            "keyframe_interval": [settings.keyframe_interval_min, settings.keyframe_interval_max],
+            "keyframe_motion_high_px": settings.keyframe_motion_high_px,
+            "fps_sampled": job_settings.get("fps_sampled") or settings.fps_sampled,
+            "chunk_duration_s": settings.chunk_duration_s,
+            "chunk_overlap_s": settings.chunk_overlap_s,
+            "analytics_window_s": settings.analytics_window_s,
+            "analytics_track_idle_s": settings.analytics_track_idle_s,
+            "video_decoder": settings.video_decoder,
+            "preview_full_res_annotation": settings.preview_full_res_annotation,
+        }
+    )
+
+
+def lookup_result(
+    db: Session, input_sha256: str, key: str, *, org_id: int | None, exclude_job_id: int | None = None
+) -> Job | None:
+    """
+    A completed job of the same organization with these input bytes and pipeline settings.
+
+    Results are never shared across organizations: they carry the source's
+    artifact keys, and a hit would reveal that another tenant uploaded the file.
+    """
+    stmt = (
+        select(Job)
+        .join(JobResultCache, JobResultCache.job_id == Job.id)
+        .where(
+            JobResultCache.input_sha256 == input_sha256,
+            JobResultCache.pipeline_key == key,
+            Job.status == "completed",
+            Job.org_id == org_id,
+        )
+    )
+    if exclude_job_id is not None:
+        stmt = stmt.where(Job.id != exclude_job_id)
+    return db.scalars(stmt).first()
+
+
+def remember_result(db: Session, job: Job) -> None:
+    """
+    Register a completed job as the cached result for its input hash and pipeline settings.
+
+    Uses the `pipeline_key` the worker stored when it picked the job up, so the
+    entry describes the settings the results were actually produced with.
+    """
+    job_settings = job.settings_json or {}
+    input_sha256 = job_settings.get("input_sha256")
+    if not input_sha256:
+        return
+    key = job_settings.get("pipeline_key") or pipeline_key(job_settings)
+    row = db.scalars(
+        select(JobResultCache).where(
+            JobResultCache.input_sha256 == input_sha256,
+            JobResultCache.pipeline_key == key,
+        )
+    ).first()
+    if row:
+        row.job_id = job.id
+    else:
+        db.add(JobResultCache(input_sha256=input_sha256, pipeline_key=key, job_id=job.id))
+    db.flush()
+
+
+def reuse_result(db: Session, source: Job, target: Job) -> None:
+    """
+    Complete `target` from a previously processed `source` without rerunning inference.
+
+    Artifacts are shared by key; tracks, events and analytics windows are copied
+    so per-job review state stays independent.
+    """
+    source_settings = source.settings_json or {}
+    target.status = "completed"
+    target.duration_s = 0.0
+    target.fps_sampled = source.fps_sampled
+    target.artifacts_json = dict(source.artifacts_json or {})
+    target.settings_json = {
+        **(target.settings_json or {}),
+        "reused_from_job_id": source.id,
+        "preview_clip_key": source_settings.get("preview_clip_key") or f"jobs/{source.id}/preview_tracking.mp4",
+    }
+    for key in ("clips", "marketplace_product_key", "marketplace_product_sha256"):
+        if key in source_settings:
+            target.settings_json[key] = source_settings[key]
+
+    # Core bulk copies: one multi-row INSERT per table instead of a flush per track
+    tracks = Track.__table__
+    columns = ["clip_id", "class_name", "start_t", "end_t", "bbox_stats_json", "motion_stats_json"]
+    source_tracks = db.execute(
+        select(tracks.c.id, *(tracks.c[name] for name in columns))
+        .where(tracks.c.job_id == source.id)
+        .order_by(tracks.c.id)
+    ).all()
+    track_ids: dict[int, int] = {}
+    if source_tracks:
+        new_ids = db.scalars(
+            insert(tracks).returning(tracks.c.id, sort_by_parameter_order=True),
+            [{"job_id": target.id, **{name: row._mapping[name] for name in columns}} for row in source_tracks],
+        ).all()
+        track_ids = {row.id: new_id for row, new_id in zip(source_tracks, new_ids)}
+
+    events = Event.__table__
+    event_rows = [
+        {**row._asdict(), "job_id": target.id, "track_id": track_ids.get(row.track_id) if row.track_id else None}
+        for row in db.execute(
+            select(
+                events.c.clip_id, events.c.track_id, events.c.type, events.c.timestamp, events.c.confidence,
+                events.c.details_json, events.c.clip_key,
+            )
+            .where(events.c.job_id == source.id)
+            .order_by(events.c.id)
+        )
+    ]
+    if event_rows:
+        db.execute(insert(events), event_rows)
+
+    windows = AnalyticsWindow.__table__
+    columns = ["clip_id", "t_start", "t_end", "congestion_score", "counts_json", "motion_json"]
+    db.execute(
+        insert(windows).from_select(
+            ["job_id", *columns],
+            select(literal(target.id), *(windows.c[name] for name in columns))
+            .where(windows.c.job_id == source.id)
+            .order_by(windows.c.id),
+        )
+    )
@@ -3,6 +3,9 @@ import boto3
 from app.core.config import settings
 
 
+# S3 requires every part but the last to be at least 5 MiB
+MULTIPART_PART_SIZE = 8 * 1024 * 1024
+
 s3 = boto3.client(
     "s3",
     endpoint_url=settings.s3_endpoint_url,
@@ -27,6 +30,109 @@ def upload_bytes(key: str, payload: bytes, content_type: str = "application/octe
     )
 
 
+def upload_file(key: str, path: str, content_type: str = "application/octet-stream"):
+    ensure_bucket()
+    s3.upload_file(
+        path,
+        settings.s3_bucket,
+        key,
+        ExtraArgs={"ContentType": content_type},
+    )
+
+
+class MultipartUpload:
+    """
+    Incremental S3 multipart upload that buffers at most one part in memory.
+
+    Call `write` with chunks of any size, then `complete`; call `abort` on
+    failure so the storage backend drops the uploaded parts.
+    """
+
+    def __init__(self, key: str, content_type: str = "application/octet-stream", part_size: int = MULTIPART_PART_SIZE):
+        ensure_bucket()
+        self.key = key
+        self.part_size = part_size
+        self.size = 0
+        self._buffer = bytearray()
+        self._parts: list[dict] = []
+        self.upload_id = s3.create_multipart_upload(
+            Bucket=settings.s3_bucket,
+            Key=key,
+            ContentType=content_type,
+        )["UploadId"]
+
+    def write(self, data: bytes) -> None:
+        self._buffer += data
+        self.size += len(data)
+        while len(self._buffer) >= self.part_size:
+            self._upload_part(bytes(self._buffer[: self.part_size]))
+            del self._buffer[: self.part_size]
+
+    def complete(self) -> None:
+        if self._buffer or not self._parts:
+            self._upload_part(bytes(self._buffer))
+            self._buffer.clear()
+        s3.complete_multipart_upload(
+            Bucket=settings.s3_bucket,
+            Key=self.key,
+            UploadId=self.upload_id,
+            MultipartUpload={"Parts": self._parts},
+        )
+
+    def abort(self) -> None:
+        s3.abort_multipart_upload(Bucket=settings.s3_bucket, Key=self.key, UploadId=self.upload_id)
+
+    def _upload_part(self, body: bytes) -> None:
+        number = len(self._parts) + 1
+        resp = s3.upload_part(
+            Bucket=settings.s3_bucket,
+            Key=self.key,
+            PartNumber=number,
+            UploadId=self.upload_id,
+            Body=body,
+        )
+        self._parts.append({"PartNumber": number, "ETag": resp["ETag"]})
+
+
+def create_multipart_upload(key: str, content_type: str = "application/octet-stream") -> str:
+    ensure_bucket()
+    return s3.create_multipart_upload(Bucket=settings.s3_bucket, Key=key, ContentType=content_type)["UploadId"]
+
+
+def signed_part_url(key: str, upload_id: str, part_number: int, expires_in: int = 3600) -> str:
+    return s3.generate_presigned_url(
+        "upload_part",
+        Params={"Bucket": settings.s3_bucket, "Key": key, "UploadId": upload_id, "PartNumber": part_number},
+        ExpiresIn=expires_in,
+    )
+
+
+def complete_multipart_upload(key: str, upload_id: str, parts: list[dict]) -> None:
+    s3.complete_multipart_upload(
+        Bucket=settings.s3_bucket,
+        Key=key,
+        UploadId=upload_id,
+        MultipartUpload={"Parts": sorted(parts, key=lambda p: p["PartNumber"])},
+    )
+
+
+def abort_multipart_upload(key: str, upload_id: str) -> None:
+    s3.abort_multipart_upload(Bucket=settings.s3_bucket, Key=key, UploadId=upload_id)
+
+
+def object_size(key: str) -> int:
+    return int(s3.head_object(Bucket=settings.s3_bucket, Key=key)["ContentLength"])
+
+
+def delete_object(key: str) -> None:
+    s3.delete_object(Bucket=settings.s3_bucket, Key=key)
+
+
+def move_object(src_key: str, dst_key: str) -> None:
+    s3.copy({"Bucket": settings.s3_bucket, "Key": src_key}, settings.s3_bucket, dst_key)
+    delete_object(src_key)
+
+
 def download_file(key: str, path: str):
     ensure_bucket()
     s3.download_file(settings.s3_bucket, key, path)
@@ -31,6 +31,8 @@ def get_or_create_usage(db: Session, org_id: int) -> OrgUsageMonthly:
         processed_minutes=0.0,
         jobs_total=0,
         exports_total=0,
+        cache_hits=0,
+        cache_misses=0,
     )
     db.add(row)
     db.flush()
@@ -74,3 +76,14 @@ def record_export(db: Session, org_id: int) -> None:
         )
 
     db.flush()
+
+
+def record_cache_lookup(db: Session, org_id: int, hit: bool) -> None:
+    u = get_or_create_usage(db, org_id)
+
+    if hit:
+        u.cache_hits += 1
+    else:
+        u.cache_misses += 1
+
+    db.flush()
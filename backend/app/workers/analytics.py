@@ -0,0 +1,329 @@
+from __future__ import annotations
+
+import math
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+from sqlalchemy import delete, insert, select
+
+from app.ml.events import EventEngine
+from app.ml.heuristics import congestion_score
+from app.models.entities import AnalyticsWindow, Event, Track
+from app.workers.vision.detections import FrameDetections
+
+
+class WindowAccumulator:
+    """
+    Running version of `build_windows`: samples arrive in time order and each
+    `window_s` bucket is emitted as soon as a later sample closes it.
+
+    Only the open bucket's sums are kept, so memory does not grow with the
+    clip. For the same samples the emitted windows equal `build_windows`.
+    """
+
+    def __init__(self, window_s: float = 5):
+        self.window_s = window_s
+        self._idx: int | None = None
+        self._n = 0
+        self._raw = 0.0
+        self._comp = 0.0
+        self._stopped = 0
+        self._active = 0
+
+    def add(self, sample: dict[str, Any]) -> dict[str, Any] | None:
+        """Add one sample; returns the window it closed, if any."""
+        idx = int(sample["t"] // self.window_s)
+        closed = None
+        if self._idx is not None and idx != self._idx:
+            closed = self.close()
+        if self._idx is None:
+            self._idx = idx
+        comp = sample.get("comp_motion", 0.0)
+        self._n += 1
+        self._raw += sample.get("raw_motion", 0.0)
+        self._comp += comp
+        self._stopped += comp < 1.0
+        self._active = max(self._active, sample.get("active_tracks", 0))
+        return closed
+
+    def close(self) -> dict[str, Any] | None:
+        """Emit the open window (if it has samples) and reset."""
+        if self._idx is None:
+            return None
+        n = max(1, self._n)
+        window = {
+            "t_start": self._idx * self.window_s,
+            "t_end": (self._idx + 1) * self.window_s,
+            "active_tracks": self._active,
+            "avg_raw_speed": self._raw / n,
+            "avg_compensated_speed": self._comp / n,
+            "stopped_ratio": self._stopped / n,
+            "density_index": min(1.0, self._active / 20.0),
+            "avg_speed_proxy": self._comp / n,
+        }
+        self._idx = None
+        self._n = self._stopped = self._active = 0
+        self._raw = self._comp = 0.0
+        return window
+
+
+class _TrackState:
+    __slots__ = ("class_name", "start_t", "n", "last_t", "last_xc", "last_yc", "samples", "raw_sum", "comp_sum")
+
+    def __init__(self, class_name: str, t: float, xc: float, yc: float):
+        self.class_name = class_name
+        self.start_t = t
+        self.n = 1
+        self.last_t = t
+        self.last_xc = xc
+        self.last_yc = yc
+        self.samples = 0
+        self.raw_sum = 0.0
+        self.comp_sum = 0.0
+
+
+class StreamingAnalytics:
+    """
+    Per-frame analytics stage: raw and ego-motion-compensated track motion,
+    congestion windows, closed tracks and their events.
+
+    `update` is called once per sampled frame, in order, with the frame's
+    detections and global motion (dx, dy) from `EgoMotionEstimator`. Every
+    track seen in consecutive frames contributes one sample (`raw_motion` is
+    its centre displacement in pixels, `comp_motion` the same after
+    subtracting the global motion); samples feed a `WindowAccumulator`, and
+    each closed window goes to `on_window`.
+
+    Events come from an `EventEngine` updated per observation: candidates go
+    to `on_event` as soon as a threshold is crossed, and a track unseen for
+    `idle_s` is closed and passed to `on_track` with its motion stats and
+    final events. All per-track state is O(1), so memory stays bounded however
+    long the video is. Frames before `start_s` (chunk lead-in) are ignored.
+    """
+
+    def __init__(
+        self,
+        *,
+        frame_width: int,
+        on_window: Callable[[dict[str, Any]], None],
+        on_track: Callable[[dict[str, Any]], None],
+        on_event: Callable[[int, dict[str, Any]], None] | None = None,
+        window_s: float = 5,
+        start_s: float = 0.0,
+        idle_s: float = 2.0,
+    ):
+        self.frame_width = frame_width
+        self.on_window = on_window
+        self.on_track = on_track
+        self.on_event = on_event
+        self.start_s = start_s
+        self.idle_s = idle_s
+        self.windows = WindowAccumulator(window_s)
+        self.events = EventEngine(frame_width)
+        self.tracks: dict[int, _TrackState] = {}
+        self.windows_emitted = 0
+        self.tracks_emitted = 0
+
+    def update(self, detections: FrameDetections, motion: tuple[float, float] = (0.0, 0.0)) -> None:
+        t = detections.t
+        if t < self.start_s:
+            return
+
+        ego_dx, ego_dy = motion
+        tracked = detections.track_id >= 0
+        active = int(tracked.sum())
+        names = detections.names
+
+        for i in np.flatnonzero(tracked):
+            tid = int(detections.track_id[i])
+            xc, yc = float(detections.xc[i]), float(detections.yc[i])
+            state = self.tracks.get(tid)
+            if state is None:
+                class_id = int(detections.class_id[i])
+                state = self.tracks[tid] = _TrackState(names.get(class_id, str(class_id)), t, xc, yc)
+            else:
+                dx, dy = xc - state.last_xc, yc - state.last_yc
+                raw = math.hypot(dx, dy)
+                comp = math.hypot(dx - ego_dx, dy - ego_dy)
+                state.samples += 1
+                state.raw_sum += raw
+                state.comp_sum += comp
+                state.n += 1
+                state.last_t, state.last_xc, state.last_yc = t, xc, yc
+
+                window = self.windows.add({"t": t, "raw_motion": raw, "comp_motion": comp, "active_tracks": active})
+                if window is not None:
+                    self._emit_window(window)
+
+            crossed = self.events.update(
+                tid, state.class_name, t, xc, float(detections.area[i]), float(detections.area_ratio[i])
+            )
+            if self.on_event is not None:
+                for event in crossed:
+                    self.on_event(tid, event)
+
+        for tid in [tid for tid, state in self.tracks.items() if t - state.last_t > self.idle_s]:
+            self._emit_track(tid, self.tracks.pop(tid))
+
+    def close(self) -> None:
+        """Flush the open window and every live track (end of video or chunk)."""
+        window = self.windows.close()
+        if window is not None:
+            self._emit_window(window)
+        for tid in sorted(self.tracks):
+            self._emit_track(tid, self.tracks[tid])
+        self.tracks.clear()
+
+    def _emit_window(self, window: dict[str, Any]) -> None:
+        self.windows_emitted += 1
+        self.on_window(window)
+
+    def _emit_track(self, tid: int, state: _TrackState) -> None:
+        samples = max(1, state.samples)
+        self.tracks_emitted += 1
+        self.on_track(
+            {
+                "track_id": tid,
+                "class": state.class_name,
+                "start_t": state.start_t,
+                "end_t": state.last_t,
+                "detections": state.n,
+                "motion": {
+                    "samples": state.samples,
+                    "avg_raw_speed": state.raw_sum / samples,
+                    "avg_compensated_speed": state.comp_sum / samples,
+                },
+                "events": self.events.finish(tid),
+            }
+        )
+
+
+class AnalyticsWriter:
+    """
+    Buffered bulk writer for `StreamingAnalytics` output.
+
+    Windows, tracks and their events are inserted in batches of `batch_rows`
+    with one executemany `INSERT` per table (batched into multi-row statements
+    by SQLAlchemy's insertmanyvalues; track ids come back via `RETURNING` in
+    parameter order), using a short-lived session per flush, so the stage can
+    run on the encoder thread without sharing the task's session and memory
+    stays bounded however many rows a job produces.
+
+    `clear` schedules removal of the rows a previous attempt wrote for the
+    same time range; the delete runs in the first flush's transaction, so a
+    retry replaces those rows atomically and one that fails before writing
+    anything leaves them in place.
+    """
+
+    def __init__(self, session_factory: Callable[[], Any], *, job_id: int, clip_id: str, batch_rows: int = 500):
+        self.session_factory = session_factory
+        self.job_id = job_id
+        self.clip_id = clip_id
+        self.batch_rows = max(1, batch_rows)
+        self._windows: list[dict[str, Any]] = []
+        self._tracks: list[dict[str, Any]] = []
+        self._clear: tuple[float, float | None] | None = None
+        self.windows_written = 0
+        self.tracks_written = 0
+        self.events_written = 0
+
+    def clear(self, start_s: float = 0.0, end_s: float | None = None) -> None:
+        self._clear = (start_s, end_s)
+
+    def _delete_range(self, db: Any, start_s: float, end_s: float | None) -> None:
+        def in_range(column):
+            cond = column >= start_s
+            return cond if end_s is None else cond & (column < end_s)
+
+        scope = (AnalyticsWindow.job_id == self.job_id) & (AnalyticsWindow.clip_id == self.clip_id)
+        db.execute(delete(AnalyticsWindow).where(scope & in_range(AnalyticsWindow.t_start)))
+        track_scope = (Track.job_id == self.job_id) & (Track.clip_id == self.clip_id) & in_range(Track.start_t)
+        db.execute(delete(Event).where(Event.track_id.in_(select(Track.id).where(track_scope))))
+        db.execute(delete(Track).where(track_scope))
+
+    def add_window(self, window: dict[str, Any]) -> None:
+        self._windows.append(window)
+        self._maybe_flush()
+
+    def add_track(self, track: dict[str, Any]) -> None:
+        self._tracks.append(track)
+        self._maybe_flush()
+
+    def _maybe_flush(self) -> None:
+        if len(self._windows) + len(self._tracks) >= self.batch_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._windows and not self._tracks and self._clear is None:
+            return
+        windows, tracks = self._windows, self._tracks
+        self._windows, self._tracks = [], []
+
+        events: list[dict[str, Any]] = []
+        with self.session_factory() as db:
+            if self._clear is not None:
+                self._delete_range(db, *self._clear)
+            # Core statements on the session's connection skip the ORM bulk
+            # layer, which otherwise costs more than the inserts themselves
+            conn = db.connection()
+            if windows:
+                conn.execute(insert(AnalyticsWindow.__table__), [self._window_row(w) for w in windows])
+            if tracks:
+                track_ids = conn.scalars(
+                    insert(Track.__table__).returning(Track.__table__.c.id, sort_by_parameter_order=True),
+                    [self._track_row(t) for t in tracks],
+                ).all()
+                events = [
+                    {
+                        "job_id": self.job_id,
+                        "clip_id": self.clip_id,
+                        "track_id": track_id,
+                        "type": e["type"],
+                        "timestamp": e["timestamp"],
+                        "confidence": e["confidence"],
+                        "details_json": {"track_id": t["track_id"], "class": t["class"]},
+                    }
+                    for t, track_id in zip(tracks, track_ids)
+                    for e in t["events"]
+                ]
+                if events:
+                    conn.execute(insert(Event.__table__), events)
+            db.commit()
+        self._clear = None
+
+        self.windows_written += len(windows)
+        self.tracks_written += len(tracks)
+        self.events_written += len(events)
+
+    def _window_row(self, w: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "clip_id": self.clip_id,
+            "t_start": w["t_start"],
+            "t_end": w["t_end"],
+            "congestion_score": congestion_score(
+                w["active_tracks"], w["avg_compensated_speed"], w["stopped_ratio"], w["density_index"]
+            ),
+            "counts_json": {
+                "active_tracks": w["active_tracks"],
+                "density_index": w["density_index"],
+                "stopped_ratio": w["stopped_ratio"],
+            },
+            "motion_json": {
+                "avg_raw_speed": w["avg_raw_speed"],
+                "avg_compensated_speed": w["avg_compensated_speed"],
+                "avg_speed_proxy": w["avg_speed_proxy"],
+            },
+        }
+
+    def _track_row(self, t: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "clip_id": self.clip_id,
+            "class_name": t["class"],
+            "start_t": t["start_t"],
+            "end_t": t["end_t"],
+            "bbox_stats_json": {"track_id": t["track_id"], "detections": t["detections"]},
+            "motion_stats_json": t["motion"],
+        }
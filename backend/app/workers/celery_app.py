@@ -1,4 +1,5 @@
 from celery import Celery
+from celery.signals import worker_process_init
 
 from app.core.config import settings
 
@@ -12,6 +13,10 @@ celery_app = Celery(
 # Route jobs to the "video" queue
 celery_app.conf.task_routes = {
     "app.workers.tasks.process_job": {"queue": "video"},
+    "app.workers.tasks.process_chunk": {"queue": "video"},
+    "app.workers.tasks.merge_chunks": {"queue": "video"},
+    "app.workers.tasks.merge_clips": {"queue": "video"},
+    "app.workers.tasks.mark_job_failed": {"queue": "video"},
 }
 
 # Prefer consuming from video queue by default
@@ -24,5 +29,16 @@ celery_app.conf.worker_prefetch_multiplier = 1
 # Silence Celery startup warning (recommended for Redis)
 celery_app.conf.broker_connection_retry_on_startup = True
 
+
+@worker_process_init.connect
+def warm_model_cache(**_kwargs):
+    # Load and warm the YOLO model once per worker process, not once per job
+    if not settings.yolo_warmup_on_start:
+        return
+    from app.workers.vision.tracking import get_model
+
+    get_model()
+
+
 # Ensure tasks are registered
 from app.workers import tasks as _tasks  # noqa: F401
\ No newline at end of file
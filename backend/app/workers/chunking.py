@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+from typing import Any
+
+from app.workers.vision.detections import FrameDetections
+
+
+def plan_chunks(
+    duration_s: float, chunk_s: float, overlap_s: float = 0.0, *, align_s: float = 0.0
+) -> list[dict[str, Any]]:
+    """
+    Split [0, duration_s) into contiguous time ranges of about `chunk_s` seconds.
+
+    With `align_s` > 0 the chunk length is rounded to a whole number of
+    `align_s` (at least one), so every boundary falls on a multiple of it: with
+    the analytics window length, no window straddles two chunks (each would
+    emit it) and a chunk's windows are exactly those starting in its range.
+
+    A trailing remainder shorter than half a chunk is folded into the previous
+    chunk. Every chunk but the first also decodes `overlap_s` seconds before its
+    start (its head) so its tracker is warm, and every chunk but the last
+    records boxes over its final `tail_s` seconds so boundary tracks can be
+    stitched.
+    """
+    if align_s > 0 and chunk_s > 0:
+        chunk_s = max(1, round(chunk_s / align_s)) * align_s
+    if chunk_s <= 0 or duration_s <= chunk_s:
+        return [{"index": 0, "start_s": 0.0, "end_s": None, "overlap_s": 0.0, "tail_s": 0.0}]
+
+    starts: list[float] = []
+    while len(starts) * chunk_s < duration_s:
+        starts.append(len(starts) * chunk_s)
+    if len(starts) > 1 and duration_s - starts[-1] < chunk_s / 2:
+        starts.pop()
+
+    chunks = []
+    for i, start in enumerate(starts):
+        last = i == len(starts) - 1
+        chunks.append(
+            {
+                "index": i,
+                "start_s": start,
+                "end_s": None if last else starts[i + 1],
+                "overlap_s": 0.0 if i == 0 else min(overlap_s, start),
+                "tail_s": 0.0 if last else overlap_s,
+            }
+        )
+    return chunks
+
+
+class ChunkTrackRecorder:
+    """
+    Per-chunk track summary: lifetime of every local track id plus the boxes seen
+    in the lead-in overlap (head) and in the last `tail_s` of the chunk (tail).
+    Head and tail boxes are what `stitch_track_ids` matches across boundaries.
+    """
+
+    def __init__(self, *, start_s: float, end_s: float | None, tail_s: float):
+        self.start_s = start_s
+        self.tail_start_s = None if end_s is None or tail_s <= 0 else end_s - tail_s
+        self.tracks: dict[int, dict[str, Any]] = {}
+
+    def update(self, detections: FrameDetections | list[dict[str, Any]]) -> None:
+        if isinstance(detections, FrameDetections):
+            t = detections.t
+            rows = ((tid, cls_name, t, xc, yc, w, h) for tid, cls_name, xc, yc, w, h, _ in detections.rows())
+        else:
+            rows = (
+                (int(d.get("track_id", -1)), d["class"], float(d["t"]), d["xc"], d["yc"], d["w"], d["h"])
+                for d in detections
+            )
+
+        for tid, cls_name, t, xc, yc, w, h in rows:
+            if tid < 0:
+                continue
+            track = self.tracks.get(tid)
+            if track is None:
+                track = {"class": cls_name, "start_t": t, "end_t": t, "n": 0, "head": [], "tail": []}
+                self.tracks[tid] = track
+            track["end_t"] = t
+            track["n"] += 1
+
+            if t < self.start_s:
+                track["head"].append([round(t, 4), xc, yc, w, h])
+            elif self.tail_start_s is not None and t >= self.tail_start_s:
+                track["tail"].append([round(t, 4), xc, yc, w, h])
+
+    def to_dict(self) -> dict[str, dict[str, Any]]:
+        # JSON keys must be strings (chunk results travel through the result backend)
+        return {str(tid): track for tid, track in self.tracks.items()}
+
+
+def box_iou(a: list[float], b: list[float]) -> float:
+    """IoU of two (xc, yc, w, h) boxes."""
+    ax1, ay1, ax2, ay2 = a[0] - a[2] / 2, a[1] - a[3] / 2, a[0] + a[2] / 2, a[1] + a[3] / 2
+    bx1, by1, bx2, by2 = b[0] - b[2] / 2, b[1] - b[3] / 2, b[0] + b[2] / 2, b[1] + b[3] / 2
+    iw = max(0.0, min(ax2, bx2) - max(ax1, bx1))
+    ih = max(0.0, min(ay2, by2) - max(ay1, by1))
+    inter = iw * ih
+    union = a[2] * a[3] + b[2] * b[3] - inter
+    return inter / union if union > 0 else 0.0
+
+
+def _overlap_iou(tail: list[list[float]], head: list[list[float]]) -> float:
+    head_by_t = {box[0]: box[1:] for box in head}
+    ious = [box_iou(box[1:], head_by_t[box[0]]) for box in tail if box[0] in head_by_t]
+    return sum(ious) / len(ious) if ious else 0.0
+
+
+def stitch_track_ids(chunks: list[dict[str, Any]], *, min_iou: float = 0.3) -> dict[int, dict[str, int]]:
+    """
+    Assign job-wide track ids across chunk boundaries.
+
+    `chunks` are chunk results ordered by index, each with a `tracks` mapping from
+    `ChunkTrackRecorder.to_dict`. A track in chunk k continues a track in chunk
+    k-1 when they share a class and their boxes over the common overlap frames
+    have mean IoU >= `min_iou` (greedy, best pairs first). Returns
+    {chunk_index: {local_id: global_id}}.
+    """
+    id_maps: dict[int, dict[str, int]] = {}
+    next_id = 1
+    prev: dict[str, Any] | None = None
+
+    for chunk in chunks:
+        idx = int(chunk["index"])
+        tracks = chunk.get("tracks") or {}
+        mapping: dict[str, int] = {}
+
+        if prev is not None:
+            prev_map = id_maps[int(prev["index"])]
+            candidates = []
+            for prev_id, prev_track in (prev.get("tracks") or {}).items():
+                if not prev_track.get("tail"):
+                    continue
+                for local_id, track in tracks.items():
+                    if not track.get("head") or track["class"] != prev_track["class"]:
+                        continue
+                    iou = _overlap_iou(prev_track["tail"], track["head"])
+                    if iou >= min_iou:
+                        candidates.append((iou, prev_id, local_id))
+
+            used_prev: set[str] = set()
+            for _, prev_id, local_id in sorted(candidates, reverse=True):
+                if prev_id in used_prev or local_id in mapping:
+                    continue
+                used_prev.add(prev_id)
+                mapping[local_id] = prev_map[prev_id]
+
+        for local_id in sorted(tracks, key=int):
+            if local_id not in mapping:
+                mapping[local_id] = next_id
+                next_id += 1
+
+        id_maps[idx] = mapping
+        prev = chunk
+
+    return id_maps
+
+
+def concat_segments(paths: list[str], out_path: str) -> None:
+    """Concatenate identically-encoded mp4 segments with ffmpeg's concat demuxer (no re-encode)."""
+    list_path = Path(out_path).with_suffix(".txt")
+    list_path.write_text("".join(f"file '{Path(p).resolve()}'\n" for p in paths))
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-y",
+            "-loglevel",
+            "error",
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-i",
+            str(list_path),
+            "-c",
+            "copy",
+            "-movflags",
+            "+faststart",
+            out_path,
+        ],
+        check=True,
+    )
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import queue
+import threading
+from collections.abc import Callable, Iterable
+from typing import Any
+
+_DONE = object()
+_POLL_S = 0.1
+
+
+class _StageFailure:
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+def _put(q: queue.Queue, item: Any, stop: threading.Event) -> bool:
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=_POLL_S)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(q: queue.Queue, stop: threading.Event) -> Any:
+    while True:
+        try:
+            return q.get(timeout=_POLL_S)
+        except queue.Empty:
+            if stop.is_set():
+                return _DONE
+
+
+def run_pipeline(
+    source: Iterable[Any],
+    infer: Callable[[list[Any]], list[Any]],
+    sink: Callable[[Any, Any], None],
+    *,
+    batch_size: int = 1,
+    queue_depth: int = 16,
+) -> int:
+    """
+    Run decode -> infer -> encode as three overlapping stages.
+
+    `source` is iterated on a decoder thread and `sink(item, result)` is called
+    on an encoder thread; `infer(batch)` runs on the calling thread (so the
+    model is only touched from one thread) and must return one result per item.
+    Stages are connected by bounded FIFO queues, so output order matches input
+    order. The first exception raised by any stage stops the others and is
+    re-raised here. Returns the number of items processed.
+    """
+    batch_size = max(1, batch_size)
+    decoded: queue.Queue = queue.Queue(maxsize=max(1, queue_depth))
+    inferred: queue.Queue = queue.Queue(maxsize=max(1, queue_depth))
+    stop = threading.Event()
+    errors: list[BaseException] = []
+
+    def decode() -> None:
+        try:
+            for item in source:
+                if not _put(decoded, item, stop):
+                    return
+        except BaseException as exc:
+            _put(decoded, _StageFailure(exc), stop)
+            return
+        _put(decoded, _DONE, stop)
+
+    def encode() -> None:
+        while True:
+            item = _get(inferred, stop)
+            if item is _DONE:
+                return
+            try:
+                sink(*item)
+            except BaseException as exc:
+                errors.append(exc)
+                stop.set()
+                return
+
+    decoder = threading.Thread(target=decode, name="pipeline-decode", daemon=True)
+    encoder = threading.Thread(target=encode, name="pipeline-encode", daemon=True)
+    decoder.start()
+    encoder.start()
+
+    processed = 0
+    try:
+        finished = False
+        while not finished and not stop.is_set():
+            batch: list[Any] = []
+            while len(batch) < batch_size:
+                item = _get(decoded, stop)
+                if item is _DONE:
+                    finished = True
+                    break
+                if isinstance(item, _StageFailure):
+                    raise item.exc
+                batch.append(item)
+
+            if not batch:
+                continue
+
+            results = infer(batch)
+            if len(results) != len(batch):
+                raise RuntimeError(f"infer returned {len(results)} results for {len(batch)} items")
+
+            for pair in zip(batch, results):
+                if not _put(inferred, pair, stop):
+                    break
+            processed += len(batch)
+    except BaseException as exc:
+        errors.insert(0, exc)
+        stop.set()
+    finally:
+        _put(inferred, _DONE, stop)
+        encoder.join()
+        stop.set()
+        decoder.join()
+
+    if errors:
+        raise errors[0]
+    return processed
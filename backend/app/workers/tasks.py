@@ -1,10 +1,17 @@
 from __future__ import annotations
 
+import mimetypes
+import re
+import shutil
 import time
-import subprocess
 import tempfile
-from pathlib import Path
-from collections import defaultdict
+import zipfile
+from pathlib import Path, PurePosixPath
+from collections.abc import Iterator
+
+import numpy as np
+from celery import chord
+from sqlalchemy import select, update
 
 # MUST be above decorator
 from app.workers.celery_app import celery_app
@@ -15,35 +22,418 @@ try:
 except Exception:
     cv2 = None
 
+from app.core.config import settings
 from app.core.logging import logger
 from app.db.session import SessionLocal
-from app.models.entities import Job
-from app.services.storage import download_file, upload_bytes
-from app.services.usage import record_job_processed
-from app.workers.vision.tracking import load_yolo_model, track_frame
-from app.workers.vision.annotate import annotate_frame
-
-
-def _encode_preview_h264(src_path: str, out_path: str) -> None:
-    cmd = [
-        "ffmpeg",
-        "-y",
-        "-i",
-        src_path,
-        "-vf",
-        "scale=-2:720,fps=15",
-        "-c:v",
-        "libx264",
-        "-preset",
-        "veryfast",
-        "-b:v",
-        "2200k",
-        "-movflags",
-        "+faststart",
-        "-an",
-        out_path,
-    ]
-    subprocess.run(cmd, check=True)
+from app.models.entities import Event, Job, Track
+from app.services.storage import download_file, signed_url, upload_bytes, upload_file
+from app.services.result_cache import lookup_result, pipeline_key, remember_result, reuse_result
+from app.services.usage import record_cache_lookup, record_job_processed
+from app.ml.ego_motion import EgoMotionEstimator
+from app.workers.analytics import AnalyticsWriter, StreamingAnalytics
+from app.workers.artifacts import hash_file
+from app.workers.chunking import ChunkTrackRecorder, concat_segments, plan_chunks, stitch_track_ids
+from app.workers.pipeline import run_pipeline
+from app.workers.vision.tracking import (
+    AdaptiveResolution,
+    get_model,
+    model_is_cached,
+    parse_roi,
+    reset_tracker,
+    roi_pixels,
+    track_batch_columnar,
+)
+from app.workers.vision.annotate import FrameAnnotator
+from app.workers.vision.decode import iter_ffmpeg_frames
+from app.workers.vision.encode import PreviewEncoder
+from app.workers.vision.frames import iter_sampled_frames, sample_step
+from app.workers.vision.keyframes import KeyframeTracker
+
+
+# mimetypes has no entry for .mkv on many systems
+VIDEO_CONTENT_TYPES = {".mp4": "video/mp4", ".mov": "video/quicktime", ".mkv": "video/x-matroska"}
+
+
+def _is_zip_job(job: Job) -> bool:
+    return Path(job.filename or job.storage_key).suffix.lower() == ".zip"
+
+
+def _video_content_type(path: str) -> str:
+    suffix = Path(path).suffix.lower()
+    return VIDEO_CONTENT_TYPES.get(suffix) or mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+
+def _safe_clip_id(stem: str, seen: set[str]) -> str:
+    base = re.sub(r"[^A-Za-z0-9_.-]+", "_", stem).strip("._")[:56] or "clip"
+    clip_id = base
+    n = 2
+    while clip_id in seen:
+        clip_id = f"{base}_{n}"
+        n += 1
+    seen.add(clip_id)
+    return clip_id
+
+
+def _extract_zip_inputs(zip_path: str, out_dir: str) -> Iterator[tuple[str, str]]:
+    """
+    Yield (clip_id, path) for every supported video in a ZIP.
+
+    Members are extracted one at a time as the caller iterates, so only the
+    clip being handed off needs to be on disk. Absolute paths and `..`
+    components are rejected; nested folders are flattened.
+    """
+    allowed = {f".{e.strip().lower()}" for e in settings.allowed_extensions.split(",") if e.strip()}
+    seen: set[str] = set()
+
+    with zipfile.ZipFile(zip_path) as zf:
+        for info in zf.infolist():
+            if info.is_dir():
+                continue
+
+            name = PurePosixPath(info.filename.replace("\\", "/"))
+            if name.is_absolute() or ".." in name.parts:
+                logger.warning("zip.member_rejected", member=info.filename)
+                continue
+            if name.suffix.lower() not in allowed:
+                continue
+
+            clip_id = _safe_clip_id(name.stem, seen)
+            out_path = Path(out_dir) / f"{clip_id}{name.suffix.lower()}"
+            with zf.open(info) as src, open(out_path, "wb") as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+
+            yield clip_id, str(out_path)
+
+
+def _probe_video(source: str) -> dict:
+    cap = cv2.VideoCapture(source)
+    try:
+        if not cap.isOpened():
+            raise RuntimeError("Failed to open video")
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        return {
+            "fps": fps,
+            "frame_count": frame_count,
+            "duration_s": frame_count / fps,
+            "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        }
+    finally:
+        cap.release()
+
+
+def _fps_sampled(job: Job) -> float:
+    return (job.settings_json or {}).get("fps_sampled") or settings.fps_sampled
+
+
+def _process_segment(
+    source: str,
+    preview_path: str,
+    *,
+    job_id: int,
+    clip_id: str,
+    fps_sampled: float,
+    start_s: float = 0.0,
+    end_s: float | None = None,
+    overlap_s: float = 0.0,
+    tail_s: float = 0.0,
+) -> dict:
+    """
+    Track one time range of a video and write its preview segment.
+
+    Decoding starts `overlap_s` before `start_s` to warm the tracker; those
+    lead-in frames are tracked but not written to the preview, so consecutive
+    segments concatenate without duplicated frames.
+
+    Analytics windows, tracks and events are written to the database while the
+    segment is processed (see `StreamingAnalytics`); rows a previous attempt
+    wrote for the same range are removed first.
+    """
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        raise RuntimeError("Failed to open video")
+
+    samples = None
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+        output_fps = fps / sample_step(fps, fps_sampled)
+
+        start_frame = max(0, int(round((start_s - overlap_s) * fps)))
+        end_frame = None if end_s is None else int(round(end_s * fps))
+        if settings.video_decoder == "ffmpeg":
+            samples = iter_ffmpeg_frames(
+                source,
+                width=width,
+                height=height,
+                native_fps=fps,
+                target_fps=fps_sampled,
+                start_frame=start_frame,
+                end_frame=end_frame,
+                threads=settings.ffmpeg_decode_threads,
+                # a frame is released once the encode stage is done with it; at
+                # most both queues, one batch and the frames each thread holds
+                # are in between, so the ring never overwrites a live frame
+                buffers=2 * max(1, settings.pipeline_queue_depth) + max(1, settings.track_batch_size) + 3,
+            )
+        else:
+            if start_frame > 0:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+            samples = iter_sampled_frames(
+                cap,
+                native_fps=fps,
+                target_fps=fps_sampled,
+                start_frame=start_frame,
+                end_frame=end_frame,
+            )
+
+        model_start = time.time()
+        cold_start = not model_is_cached()
+        model = get_model()
+        if model is None:
+            raise RuntimeError("YOLO model failed to load")
+        reset_tracker(model)
+
+        encoder = PreviewEncoder(
+            preview_path,
+            src_width=width,
+            src_height=height,
+            src_fps=output_fps,
+        )
+
+        roi = roi_pixels(parse_roi(settings.inference_roi), width, height)
+        resolution = AdaptiveResolution(
+            settings.yolo_imgsz,
+            settings.adaptive_imgsz_min,
+            window=settings.adaptive_window_frames,
+            min_detections=settings.adaptive_min_detections,
+        )
+
+        def detect(frames, timestamps):
+            tracks = track_batch_columnar(
+                model,
+                frames,
+                clip_id=clip_id,
+                timestamps_s=timestamps,
+                frame_width=width,
+                frame_height=height,
+                imgsz=resolution.imgsz,
+                roi=roi,
+            )
+            resolution.update([len(dets) for dets in tracks])
+            return tracks
+
+        keyframes = (
+            KeyframeTracker(
+                detect,
+                k_max=settings.keyframe_interval_max,
+                k_min=settings.keyframe_interval_min,
+                motion_high_px=settings.keyframe_motion_high_px,
+            )
+            if settings.keyframe_interval_max > 1
+            else None
+        )
+        if settings.preview_full_res_annotation:
+            # the preview is downscaled to encoder.size anyway, so blur at that scale
+            annotator = FrameAnnotator(blur_scale=encoder.size[1] / max(1, height))
+        else:
+            annotator = FrameAnnotator(output_size=encoder.size, src_size=(width, height))
+        recorder = ChunkTrackRecorder(start_s=start_s, end_s=end_s, tail_s=tail_s)
+        writer = AnalyticsWriter(SessionLocal, job_id=job_id, clip_id=clip_id, batch_rows=settings.analytics_flush_rows)
+        writer.clear(start_s, end_s)
+        candidates = 0
+
+        def on_event(track_id, event):
+            # early signal while the track is still open; the stored event comes with on_track
+            nonlocal candidates
+            if end_s is not None and event["timestamp"] >= end_s:
+                return  # chunk tail: the next chunk reports it
+            candidates += 1
+            logger.info("job.event_candidate", job_id=job_id, clip_id=clip_id, track_id=track_id, **event)
+
+        analytics = StreamingAnalytics(
+            frame_width=width,
+            on_window=writer.add_window,
+            on_track=writer.add_track,
+            on_event=on_event,
+            window_s=settings.analytics_window_s,
+            start_s=start_s,
+            idle_s=settings.analytics_track_idle_s,
+        )
+        # the keyframe tracker already estimates global motion on every frame
+        ego = None if keyframes else EgoMotionEstimator()
+        first_batch_done = False
+
+        def infer(batch):
+            nonlocal first_batch_done
+            frames = [frame for _, _, frame in batch]
+            timestamps = [t for _, t, _ in batch]
+            if keyframes:
+                tracks = keyframes.process_with_motion(frames, timestamps)
+            else:
+                tracks = [(dets, None) for dets in detect(frames, timestamps)]
+            if not first_batch_done:
+                first_batch_done = True
+                logger.info(
+                    "job.start_latency",
+                    job_id=job_id,
+                    cold=cold_start,
+                    seconds=round(time.time() - model_start, 3),
+                )
+            return tracks
+
+        def encode(sample, result):
+            tracks, motion = result
+            recorder.update(tracks)
+            if motion is None:
+                boxes = np.column_stack([tracks.xc, tracks.yc, tracks.w, tracks.h])
+                motion = ego.update(sample[2], boxes)
+            analytics.update(tracks, motion)
+            if sample[1] >= start_s and encoder.wants_frame():
+                encoder.write(annotator.draw(sample[2], tracks))
+            else:
+                # lead-in frames and frames off the preview timeline only advance trails
+                annotator.observe(tracks)
+                if sample[1] >= start_s:
+                    encoder.skip()
+
+        with encoder:
+            frames = run_pipeline(
+                samples,
+                infer,
+                encode,
+                batch_size=settings.track_batch_size,
+                queue_depth=settings.pipeline_queue_depth,
+            )
+        analytics.close()
+        writer.flush()
+    finally:
+        if samples is not None:
+            samples.close()
+        cap.release()
+
+    logger.info(
+        "job.analytics",
+        job_id=job_id,
+        clip_id=clip_id,
+        windows=writer.windows_written,
+        tracks=writer.tracks_written,
+        events=writer.events_written,
+        event_candidates=candidates,
+    )
+
+    if keyframes:
+        logger.info(
+            "job.keyframes",
+            job_id=job_id,
+            clip_id=clip_id,
+            detector_frames=keyframes.detector_frames,
+            predicted_frames=keyframes.predicted_frames,
+        )
+
+    return {
+        "output_fps": output_fps,
+        "frames": frames,
+        "tracks": recorder.to_dict(),
+        "windows": writer.windows_written,
+        "events": writer.events_written,
+    }
+
+
+def _merge_motion(a: dict, b: dict) -> dict:
+    n_a, n_b = a.get("samples", 0), b.get("samples", 0)
+    n = max(1, n_a + n_b)
+    return {
+        "samples": n_a + n_b,
+        **{
+            key: (a.get(key, 0.0) * n_a + b.get(key, 0.0) * n_b) / n
+            for key in ("avg_raw_speed", "avg_compensated_speed")
+        },
+    }
+
+
+def _stitch_tracks(db, job_id: int, results: list[dict], id_maps: dict[int, dict[str, int]]) -> int:
+    """
+    Fold the Track rows chunks wrote under local tracker ids into job-wide tracks.
+
+    A row belongs to the chunk whose range holds its `start_t`. Rows that map to
+    the same global id are merged into the earliest one and their events are
+    re-pointed to it. Returns the number of job-wide tracks.
+    """
+    rows = db.scalars(
+        select(Track).where(Track.job_id == job_id, Track.clip_id == "main").order_by(Track.start_t, Track.id)
+    ).all()
+    next_id = max((gid for m in id_maps.values() for gid in m.values()), default=0) + 1
+    merged: dict[int, Track] = {}
+
+    for row in rows:
+        chunk = next((r for r in reversed(results) if row.start_t >= r["start_s"]), results[0])
+        local_id = str((row.bbox_stats_json or {}).get("track_id"))
+        gid = id_maps[int(chunk["index"])].get(local_id)
+        if gid is None:
+            gid, next_id = next_id, next_id + 1
+
+        keep = merged.get(gid)
+        if keep is None:
+            row.bbox_stats_json = {**(row.bbox_stats_json or {}), "track_id": gid}
+            merged[gid] = row
+            continue
+
+        keep.start_t = min(keep.start_t, row.start_t)
+        keep.end_t = max(keep.end_t, row.end_t)
+        keep.bbox_stats_json = {
+            **keep.bbox_stats_json,
+            "detections": keep.bbox_stats_json.get("detections", 0) + (row.bbox_stats_json or {}).get("detections", 0),
+        }
+        keep.motion_stats_json = _merge_motion(keep.motion_stats_json or {}, row.motion_stats_json or {})
+        db.execute(update(Event).where(Event.track_id == row.id).values(track_id=keep.id))
+        db.delete(row)
+
+    db.flush()
+    return len(merged)
+
+
+def _reuse_cached_result(db, job: Job) -> bool:
+    """
+    Complete `job` from an earlier job with the same input bytes, if there is one.
+
+    Matches on the `pipeline_key` this worker stored in the job's settings:
+    only the worker knows the settings the job will really be processed with.
+    """
+    job_settings = job.settings_json or {}
+    digest = job_settings.get("input_sha256")
+    if not digest:
+        return False
+    source = lookup_result(db, digest, job_settings["pipeline_key"], org_id=job.org_id, exclude_job_id=job.id)
+    if job.org_id and not job_settings.get("cache_lookup_recorded"):
+        # process_job autoretries; count each job's lookup once
+        record_cache_lookup(db, job.org_id, hit=source is not None)
+        job.settings_json = {**job_settings, "cache_lookup_recorded": True}
+    if not source:
+        db.commit()
+        return False
+    reuse_result(db, source, job)
+    db.commit()
+    logger.info("job.result_reused", job_id=job.id, source_job_id=source.id)
+    return True
+
+
+def _complete_job(db, job: Job, *, started_at: float) -> None:
+    duration_s = time.time() - started_at
+
+    job.status = "completed"
+    job.duration_s = duration_s
+    remember_result(db, job)
+    if job.org_id:
+        record_job_processed(db, job.org_id, duration_s=duration_s)
+    # one commit with the caller's result writes (e.g. stitched tracks), so a
+    # retried merge finds either none of it or a completed job
+    db.commit()
+
+    logger.info(f"Job {job.id} completed successfully.")
 
 
 @celery_app.task(
@@ -65,74 +455,193 @@ def process_job(self, job_id: int):
             return
 
         job.status = "running"
+        job.settings_json = {**(job.settings_json or {}), "pipeline_key": pipeline_key(job.settings_json)}
         db.commit()
 
+        # Identical bytes processed with identical pipeline settings: reuse the results
+        if _reuse_cached_result(db, job):
+            return
+
         if cv2 is None:
             raise RuntimeError("OpenCV not available")
 
         logger.info(f"Processing job {job_id}")
         start_time = time.time()
 
+        if _is_zip_job(job):
+            clips = []
+            with tempfile.TemporaryDirectory() as tmpdir:
+                zip_path = Path(tmpdir) / "input.zip"
+                download_file(job.storage_key, str(zip_path))
+
+                for clip_id, clip_path in _extract_zip_inputs(str(zip_path), tmpdir):
+                    source_key = f"jobs/{job.id}/inputs/{clip_id}{Path(clip_path).suffix}"
+                    upload_file(source_key, clip_path, _video_content_type(clip_path))
+                    Path(clip_path).unlink()
+                    clips.append(
+                        {
+                            "index": len(clips),
+                            "clip_id": clip_id,
+                            "source_key": source_key,
+                            "preview_key": f"jobs/{job.id}/clips/{clip_id}/preview_tracking.mp4",
+                            "start_s": 0.0,
+                            "end_s": None,
+                            "overlap_s": 0.0,
+                            "tail_s": 0.0,
+                        }
+                    )
+
+            if not clips:
+                raise RuntimeError("ZIP contains no supported video clips")
+
+            job.settings_json = {**(job.settings_json or {}), "clips": [c["clip_id"] for c in clips]}
+            db.commit()
+
+            logger.info("job.batch", job_id=job_id, clips=len(clips))
+            chord(process_chunk.s(job_id, clip) for clip in clips)(
+                merge_clips.s(job_id, start_time).on_error(mark_job_failed.si(job_id))
+            )
+            return
+
+        if settings.chunk_duration_s > 0:
+            probe = _probe_video(signed_url(job.storage_key))
+            chunks = plan_chunks(
+                probe["duration_s"],
+                settings.chunk_duration_s,
+                settings.chunk_overlap_s,
+                align_s=settings.analytics_window_s,
+            )
+            if len(chunks) > 1:
+                logger.info("job.chunked", job_id=job_id, chunks=len(chunks), duration_s=probe["duration_s"])
+                chord(process_chunk.s(job_id, chunk) for chunk in chunks)(
+                    merge_chunks.s(job_id, start_time).on_error(mark_job_failed.si(job_id))
+                )
+                return
+
         with tempfile.TemporaryDirectory() as tmpdir:
 
             input_path = Path(tmpdir) / "input.mp4"
             download_file(job.storage_key, str(input_path))
 
-            cap = cv2.VideoCapture(str(input_path))
-            if not cap.isOpened():
-                raise RuntimeError("Failed to open video")
+            if not (job.settings_json or {}).get("input_sha256"):
+                # Direct uploads never pass through the API, so hash them here
+                digest = hash_file(str(input_path))
+                job.settings_json = {**(job.settings_json or {}), "input_sha256": digest}
+                if _reuse_cached_result(db, job):
+                    return
+
+            preview_path = Path(tmpdir) / "preview_tracking.mp4"
+            result = _process_segment(
+                str(input_path),
+                str(preview_path),
+                job_id=job_id,
+                clip_id="main",
+                fps_sampled=_fps_sampled(job),
+            )
+            job.fps_sampled = int(round(result["output_fps"]))
+
+            # ✅ FIXED HERE
+            with open(preview_path, "rb") as f:
+                upload_bytes(
+                    key=f"jobs/{job.id}/preview_tracking.mp4",
+                    payload=f.read(),
+                    content_type="video/mp4",
+                )
+
+        _complete_job(db, job, started_at=start_time)
+
+    except Exception as exc:
+        logger.exception(f"Job {job_id} failed: {exc}")
+        job.status = "failed"
+        db.commit()
+        raise
 
-            fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    finally:
+        db.close()
 
-            raw_output_path = Path(tmpdir) / "annotated_raw.mp4"
 
-            fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-            writer = cv2.VideoWriter(
-                str(raw_output_path),
-                fourcc,
-                fps,
-                (width, height),
-            )
+@celery_app.task(
+    bind=True,
+    name="app.workers.tasks.process_chunk",
+    queue="video",
+    autoretry_for=(Exception,),
+    retry_backoff=5,
+    retry_kwargs={"max_retries": 3},
+)
+def process_chunk(self, job_id: int, chunk: dict) -> dict:
+    """
+    Track one time range of a job's video (or one clip of a ZIP batch), reading
+    it straight from object storage.
+    """
+    db = SessionLocal()
 
-            model = load_yolo_model()
-            if model is None:
-                raise RuntimeError("YOLO model failed to load")
+    try:
+        job = db.get(Job, job_id)
+        if not job:
+            raise RuntimeError(f"Job {job_id} not found")
 
-            track_history = defaultdict(list)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            preview_path = Path(tmpdir) / "segment.mp4"
+            # OpenCV's FFmpeg backend seeks over HTTP range requests, so only
+            # this chunk's part of the input is fetched
+            result = _process_segment(
+                signed_url(chunk.get("source_key") or job.storage_key),
+                str(preview_path),
+                job_id=job_id,
+                clip_id=chunk.get("clip_id", "main"),
+                fps_sampled=_fps_sampled(job),
+                start_s=chunk["start_s"],
+                end_s=chunk["end_s"],
+                overlap_s=chunk["overlap_s"],
+                tail_s=chunk["tail_s"],
+            )
 
-            frame_index = 0
-            clip_id = "main"
+            preview_key = chunk.get("preview_key") or f"jobs/{job_id}/chunks/{int(chunk['index']):04d}.mp4"
+            with open(preview_path, "rb") as f:
+                upload_bytes(key=preview_key, payload=f.read(), content_type="video/mp4")
 
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
+        logger.info("job.chunk_done", job_id=job_id, chunk=chunk["index"], frames=result["frames"])
+        return {**chunk, **result, "preview_key": preview_key}
 
-                timestamp_s = frame_index / fps
+    finally:
+        db.close()
 
-                tracks = track_frame(
-                    model,
-                    frame,
-                    clip_id=clip_id,
-                    timestamp_s=timestamp_s,
-                    frame_width=width,
-                    frame_height=height,
-                )
 
-                annotated = annotate_frame(frame, tracks, track_history)
-                writer.write(annotated)
+@celery_app.task(
+    bind=True,
+    name="app.workers.tasks.merge_chunks",
+    queue="video",
+    autoretry_for=(Exception,),
+    retry_backoff=5,
+    retry_kwargs={"max_retries": 3},
+)
+def merge_chunks(self, results: list[dict], job_id: int, started_at: float):
+    """Stitch track ids across chunk boundaries and concatenate preview segments."""
+    db = SessionLocal()
+
+    try:
+        job = db.get(Job, job_id)
+        if not job:
+            logger.warning(f"Job {job_id} not found.")
+            return
+        if job.status == "completed":
+            # a retry after the merge committed; stitching again would corrupt track ids
+            logger.info("job.merge_skipped", job_id=job_id)
+            return
 
-                frame_index += 1
+        results = sorted(results, key=lambda r: int(r["index"]))
+        id_maps = stitch_track_ids(results)
 
-            cap.release()
-            writer.release()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            segment_paths = []
+            for r in results:
+                path = Path(tmpdir) / f"segment_{int(r['index']):04d}.mp4"
+                download_file(r["preview_key"], str(path))
+                segment_paths.append(str(path))
 
             preview_path = Path(tmpdir) / "preview_tracking.mp4"
-            _encode_preview_h264(str(raw_output_path), str(preview_path))
+            concat_segments(segment_paths, str(preview_path))
 
-            # ✅ FIXED HERE
             with open(preview_path, "rb") as f:
                 upload_bytes(
                     key=f"jobs/{job.id}/preview_tracking.mp4",
@@ -140,22 +649,92 @@ def process_job(self, job_id: int):
                     content_type="video/mp4",
                 )
 
-        duration_s = time.time() - start_time
+        job.fps_sampled = int(round(results[0]["output_fps"]))
+        job.artifacts_json = {
+            **(job.artifacts_json or {}),
+            "track_count": _stitch_tracks(db, job.id, results, id_maps),
+            "chunks": [
+                {
+                    "index": r["index"],
+                    "start_s": r["start_s"],
+                    "end_s": r["end_s"],
+                    "frames": r["frames"],
+                    "preview_key": r["preview_key"],
+                    "track_ids": id_maps[int(r["index"])],
+                }
+                for r in results
+            ],
+        }
+
+        _complete_job(db, job, started_at=started_at)
 
-        job.status = "completed"
-        job.duration_s = duration_s
-        db.commit()
+    except Exception as exc:
+        logger.exception(f"Job {job_id} merge failed: {exc}")
+        raise
+
+    finally:
+        db.close()
+
+
+@celery_app.task(
+    bind=True,
+    name="app.workers.tasks.merge_clips",
+    queue="video",
+    autoretry_for=(Exception,),
+    retry_backoff=5,
+    retry_kwargs={"max_retries": 3},
+)
+def merge_clips(self, results: list[dict], job_id: int, started_at: float):
+    """Aggregate per-clip results of a ZIP batch job; tracker state is per clip, so ids are not stitched."""
+    db = SessionLocal()
 
-        if job.org_id:
-            record_job_processed(db, job.org_id, duration_s=duration_s)
+    try:
+        job = db.get(Job, job_id)
+        if not job:
+            logger.warning(f"Job {job_id} not found.")
+            return
+        if job.status == "completed":
+            # a retry after the merge committed
+            logger.info("job.merge_skipped", job_id=job_id)
+            return
 
-        logger.info(f"Job {job_id} completed successfully.")
+        results = sorted(results, key=lambda r: int(r["index"]))
+
+        job.fps_sampled = int(round(results[0]["output_fps"]))
+        job.settings_json = {**(job.settings_json or {}), "preview_clip_key": results[0]["preview_key"]}
+        job.artifacts_json = {
+            **(job.artifacts_json or {}),
+            "clips": [
+                {
+                    "clip_id": r["clip_id"],
+                    "frames": r["frames"],
+                    "track_count": len(r["tracks"]),
+                    "windows": r["windows"],
+                    "events": r["events"],
+                    "input_key": r["source_key"],
+                    "preview_key": r["preview_key"],
+                }
+                for r in results
+            ],
+        }
+        _complete_job(db, job, started_at=started_at)
 
     except Exception as exc:
-        logger.exception(f"Job {job_id} failed: {exc}")
-        job.status = "failed"
-        db.commit()
+        logger.exception(f"Job {job_id} merge failed: {exc}")
         raise
 
     finally:
         db.close()
+
+
+@celery_app.task(name="app.workers.tasks.mark_job_failed", queue="video")
+def mark_job_failed(job_id: int):
+    db = SessionLocal()
+    try:
+        job = db.get(Job, job_id)
+        if job:
+            job.status = "failed"
+            db.commit()
+        logger.warning(f"Job {job_id} failed in a chunk task.")
+    finally:
+        db.close()
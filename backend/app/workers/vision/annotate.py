@@ -10,20 +10,30 @@ except Exception:  # pragma: no cover
 
 import numpy as np
 
+from app.workers.vision.detections import FrameDetections
+
+
+BOX_COLOR = (77, 255, 196)
+TRAIL_COLOR = (230, 230, 230)
+# Privacy blur covers this band of rows (fractions of frame height)
+BLUR_BAND = (0.2, 0.8)
+BLUR_KSIZE = 21
+BLUR_SIGMA = 20.0
+
 
 def blur_privacy(frame: np.ndarray) -> np.ndarray:
     if cv2 is None:
         return frame
 
     h, _ = frame.shape[:2]
-    roi = frame[int(h * 0.2): int(h * 0.8), :]
-    frame[int(h * 0.2): int(h * 0.8), :] = cv2.GaussianBlur(roi, (21, 21), 20)
+    roi = frame[int(h * BLUR_BAND[0]): int(h * BLUR_BAND[1]), :]
+    frame[int(h * BLUR_BAND[0]): int(h * BLUR_BAND[1]), :] = cv2.GaussianBlur(roi, (BLUR_KSIZE, BLUR_KSIZE), BLUR_SIGMA)
     return frame
 
 
 def annotate_frame(
     frame: np.ndarray,
-    detections: list[dict[str, Any]],
+    detections: FrameDetections | list[dict[str, Any]],
     track_history: dict[int, list[tuple[float, float]]],
     *,
     trail_length: int = 20,
@@ -35,29 +45,38 @@ def annotate_frame(
 
     annotated = frame.copy()
 
-    for det in detections:
-        x1 = int(det["xc"] - det["w"] / 2)
-        y1 = int(det["yc"] - det["h"] / 2)
-        x2 = int(det["xc"] + det["w"] / 2)
-        y2 = int(det["yc"] + det["h"] / 2)
+    if isinstance(detections, FrameDetections):
+        rows = detections.rows()
+    else:
+        rows = (
+            (int(d.get("track_id", -1)), d["class"], d["xc"], d["yc"], d["w"], d["h"], d["conf"])
+            for d in detections
+        )
 
-        cv2.rectangle(annotated, (x1, y1), (x2, y2), (77, 255, 196), 2)
+    for track_id, cls_name, xc, yc, w, h, conf in rows:
+        x1 = int(xc - w / 2)
+        y1 = int(yc - h / 2)
+        x2 = int(xc + w / 2)
+        y2 = int(yc + h / 2)
 
-        label = f"ID {det['track_id']} {det['class']} {det['conf']:.2f}"
+        cv2.rectangle(annotated, (x1, y1), (x2, y2), BOX_COLOR, 2)
+
+        label = f"ID {track_id} {cls_name} {conf:.2f}"
         cv2.putText(
             annotated,
             label,
             (x1, max(18, y1 - 6)),
             cv2.FONT_HERSHEY_SIMPLEX,
             0.5,
-            (77, 255, 196),
+            BOX_COLOR,
             2,
         )
 
-        track_id = int(det.get("track_id", -1))
         if track_id >= 0:
             history = track_history.setdefault(track_id, [])
-            history.append((float(det["xc"]), float(det["yc"])))
+            history.append((float(xc), float(yc)))
+            if len(history) > trail_length:
+                del history[:-trail_length]
 
             if len(history) >= 2:
                 pts = (
@@ -68,8 +87,175 @@ def annotate_frame(
                     annotated,
                     [pts],
                     isClosed=False,
-                    color=(230, 230, 230),
+                    color=TRAIL_COLOR,
                     thickness=2,
                 )
 
-    return blur_privacy(annotated)
\ No newline at end of file
+    return blur_privacy(annotated)
+
+
+class FrameAnnotator:
+    """
+    Reusable preview renderer: boxes, labels, track trails and privacy blur.
+
+    Unlike `annotate_frame`, nothing is allocated per frame once shapes
+    settle. The output goes into a preallocated buffer (the returned array
+    is only valid until the next `draw`). Trails live in one int32 array with
+    a fixed number of points per track, and tracks unseen for `evict_after`
+    frames give their slot back.
+
+    With `blur_scale` < 1 the blur band is downscaled (by the largest power
+    of two not beyond `blur_scale`), blurred with a proportionally smaller
+    kernel and upscaled back in place. This is meant for previews that are
+    downscaled by at least that factor anyway, so the result looks the same
+    at a fraction of the cost.
+
+    With `output_size` (w, h) set, frames are resized to that size first and
+    detection coordinates (in `src_size` pixels) are scaled to match, so boxes,
+    labels, trails and blur are all drawn at output resolution.
+    """
+
+    def __init__(
+        self,
+        *,
+        trail_length: int = 20,
+        evict_after: int = 20,
+        blur_scale: float = 1.0,
+        output_size: tuple[int, int] | None = None,
+        src_size: tuple[int, int] | None = None,
+        capacity: int = 64,
+    ):
+        self.trail_length = max(2, trail_length)
+        self.output_size = output_size
+        self._sx = self._sy = 1.0
+        if output_size and src_size:
+            self._sx, self._sy = output_size[0] / src_size[0], output_size[1] / src_size[1]
+        self.evict_after = max(1, evict_after)
+        # Rounded down to 1/2^k so the INTER_AREA downscale takes OpenCV's
+        # integer-factor fast path (a fractional factor costs more than the blur)
+        self.blur_scale = 1.0
+        while self.blur_scale > max(1 / 16, blur_scale) + 1e-9:
+            self.blur_scale /= 2
+        self.frame_index = 0
+
+        # Each slot holds 2 * trail_length points; the live trail is always the
+        # contiguous run ending at `_end`, and it is shifted to the front when
+        # the slot fills, so drawing never has to unroll a ring
+        self._points = np.zeros((capacity, 2 * self.trail_length, 2), dtype=np.int32)
+        self._end = np.zeros(capacity, dtype=np.int64)
+        self._count = np.zeros(capacity, dtype=np.int64)
+        self._last_seen = np.full(capacity, -1, dtype=np.int64)
+        self._slots: dict[int, int] = {}
+        self._free = list(range(capacity - 1, -1, -1))
+
+        self._out: np.ndarray | None = None
+        self._small: np.ndarray | None = None
+
+    @property
+    def live_trails(self) -> int:
+        return len(self._slots)
+
+    def observe(self, detections: FrameDetections) -> None:
+        """Advance trails by one frame without drawing (e.g. chunk lead-in frames)."""
+        sx, sy = self._sx, self._sy
+        for track_id, xc, yc in zip(detections.track_id.tolist(), detections.xc.tolist(), detections.yc.tolist()):
+            if track_id >= 0:
+                self._push(track_id, xc * sx, yc * sy)
+        self._evict()
+        self.frame_index += 1
+
+    def draw(self, frame: np.ndarray, detections: FrameDetections) -> np.ndarray:
+        if cv2 is None:
+            return frame.copy()
+
+        src_h, src_w = frame.shape[:2]
+        out_w, out_h = self.output_size or (src_w, src_h)
+        shape = (out_h, out_w) + frame.shape[2:]
+        if self._out is None or self._out.shape != shape:
+            self._out = np.empty(shape, dtype=frame.dtype)
+            self._small = None
+        out = self._out
+        if (out_w, out_h) == (src_w, src_h):
+            np.copyto(out, frame)
+        else:
+            cv2.resize(frame, (out_w, out_h), dst=out, interpolation=cv2.INTER_AREA)
+        sx, sy = self._sx, self._sy = out_w / src_w, out_h / src_h
+
+        for track_id, cls_name, xc, yc, w, h, conf in detections.rows():
+            xc, yc, w, h = xc * sx, yc * sy, w * sx, h * sy
+            x1, y1 = int(xc - w / 2), int(yc - h / 2)
+            cv2.rectangle(out, (x1, y1), (int(xc + w / 2), int(yc + h / 2)), BOX_COLOR, 2)
+            cv2.putText(
+                out,
+                f"ID {track_id} {cls_name} {conf:.2f}",
+                (x1, max(18, y1 - 6)),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                0.5,
+                BOX_COLOR,
+                2,
+            )
+            if track_id >= 0:
+                slot = self._push(track_id, xc, yc)
+                n = int(self._count[slot])
+                if n >= 2:
+                    end = int(self._end[slot])
+                    cv2.polylines(out, [self._points[slot, end - n:end].reshape(-1, 1, 2)], False, TRAIL_COLOR, 2)
+
+        self._evict()
+        self.frame_index += 1
+        self._blur(out)
+        return out
+
+    def _push(self, track_id: int, xc: float, yc: float) -> int:
+        slot = self._slots.get(track_id)
+        if slot is None:
+            if not self._free:
+                self._grow()
+            slot = self._slots[track_id] = self._free.pop()
+            self._end[slot] = 0
+            self._count[slot] = 0
+
+        end = int(self._end[slot])
+        if end == self._points.shape[1]:
+            keep = self.trail_length - 1
+            self._points[slot, :keep] = self._points[slot, end - keep:end]
+            end = keep
+        self._points[slot, end] = (int(xc), int(yc))
+        self._end[slot] = end + 1
+        self._count[slot] = min(self.trail_length, int(self._count[slot]) + 1)
+        self._last_seen[slot] = self.frame_index
+        return slot
+
+    def _evict(self) -> None:
+        if not self._slots:
+            return
+        cutoff = self.frame_index - self.evict_after
+        stale = [tid for tid, slot in self._slots.items() if self._last_seen[slot] < cutoff]
+        for tid in stale:
+            slot = self._slots.pop(tid)
+            self._last_seen[slot] = -1
+            self._free.append(slot)
+
+    def _grow(self) -> None:
+        old = len(self._end)
+        self._points = np.concatenate([self._points, np.zeros_like(self._points)])
+        self._end = np.concatenate([self._end, np.zeros(old, dtype=np.int64)])
+        self._count = np.concatenate([self._count, np.zeros(old, dtype=np.int64)])
+        self._last_seen = np.concatenate([self._last_seen, np.full(old, -1, dtype=np.int64)])
+        self._free.extend(range(2 * old - 1, old - 1, -1))
+
+    def _blur(self, out: np.ndarray) -> None:
+        h, w = out.shape[:2]
+        band = out[int(h * BLUR_BAND[0]): int(h * BLUR_BAND[1]), :]
+        if self.blur_scale >= 1.0:
+            cv2.GaussianBlur(band, (BLUR_KSIZE, BLUR_KSIZE), BLUR_SIGMA, dst=band)
+            return
+
+        size = (max(1, int(round(w * self.blur_scale))), max(1, int(round(band.shape[0] * self.blur_scale))))
+        if self._small is None or self._small.shape[:2] != (size[1], size[0]):
+            self._small = np.empty((size[1], size[0]) + out.shape[2:], dtype=out.dtype)
+        small = self._small
+        cv2.resize(band, size, dst=small, interpolation=cv2.INTER_AREA)
+        ksize = max(3, int(BLUR_KSIZE * self.blur_scale) | 1)
+        cv2.GaussianBlur(small, (ksize, ksize), BLUR_SIGMA * self.blur_scale, dst=small)
+        cv2.resize(small, (w, band.shape[0]), dst=band, interpolation=cv2.INTER_LINEAR)
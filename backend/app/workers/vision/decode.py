@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import collections
+import fcntl
+import queue
+import re
+import subprocess
+import threading
+from collections.abc import Iterator
+
+import numpy as np
+
+from app.workers.vision.frames import sample_step
+
+CHANNELS = {"bgr24": 3, "rgb24": 3, "gray": 1}
+# showinfo runs after select/scale, so one line per frame written to stdout
+_SHOWINFO = re.compile(r"Parsed_showinfo.*\bpts_time:(\S+)")
+_PIPE_BYTES = 1 << 20
+_PTS_TIMEOUT_S = 10.0
+
+
+class FFmpegFrameReader:
+    """
+    Decode frames with an ffmpeg subprocess and read them as NumPy arrays.
+
+    Same contract as `iter_sampled_frames`: iterating yields
+    (frame_index, timestamp_s, frame) on a `target_fps` grid aligned to frame 0,
+    starting at `start_frame` and stopping before `end_frame`. The difference is
+    where the work happens: the seek (`-ss` before `-i`: jump to the previous
+    keyframe, then decode up to the target), grid selection, optional scaling
+    to `size` and the pixel format conversion all run inside ffmpeg with its own
+    decoder threads, and only kept frames cross the pipe.
+
+    Timestamps are the decoded frames' pts (via `showinfo`), so they stay exact
+    for variable frame rate input; `frame_index` is the pts on the nominal
+    `native_fps` grid.
+
+    Frames are read straight from the pipe into their array. With `buffers` > 0
+    they go into a ring of that many preallocated frames instead, and each
+    yielded array is only valid until `buffers` more frames have been read;
+    the consumer must not hold more than that many at once.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        *,
+        width: int,
+        height: int,
+        native_fps: float,
+        target_fps: float | None = None,
+        start_frame: int = 0,
+        end_frame: int | None = None,
+        size: tuple[int, int] | None = None,
+        pix_fmt: str = "bgr24",
+        threads: int = 0,
+        buffers: int = 0,
+    ):
+        if pix_fmt not in CHANNELS:
+            raise ValueError(f"Unsupported pix_fmt: {pix_fmt}")
+        self.native_fps = native_fps
+        self.start_frame = start_frame
+        self.end_frame = end_frame
+        self.size = size or (width, height)
+        self.frames_read = 0
+
+        out_w, out_h = self.size
+        shape = (out_h, out_w) if CHANNELS[pix_fmt] == 1 else (out_h, out_w, CHANNELS[pix_fmt])
+        self._shape = shape
+        self._ring = np.empty((buffers,) + shape, dtype=np.uint8) if buffers > 0 else None
+        self._pts: queue.SimpleQueue = queue.SimpleQueue()
+        self._stderr_tail: collections.deque[str] = collections.deque(maxlen=20)
+
+        step = sample_step(native_fps, target_fps)
+        # frame i is on the grid iff a multiple of `step` falls in (i - 1, i]
+        # (what iter_sampled_frames' running counter selects); i from pts
+        index = f"({start_frame}+round(t*{native_fps:.6f}))"
+        filters = [f"select='gt(floor(({index}+1e-6)/{step:.9f}),floor(({index}-1+1e-6)/{step:.9f}))'"]
+        if size is not None and size != (width, height):
+            filters.append(f"scale={out_w}:{out_h}:flags=area")
+        filters.append("showinfo=checksum=0")
+
+        self._seek_s = start_frame / native_fps
+        cmd = ["ffmpeg", "-nostdin", "-hide_banner", "-nostats", "-threads", str(threads)]
+        if start_frame > 0:
+            cmd += ["-ss", f"{self._seek_s:.6f}"]
+        cmd += ["-i", source, "-an", "-sn", "-vf", ",".join(filters), "-fps_mode", "passthrough"]
+        if end_frame is not None:
+            # half a frame of slack; the exact cut is made on frame_index below
+            cmd += ["-t", f"{max(0.0, (end_frame - start_frame - 0.5) / native_fps):.6f}"]
+        cmd += ["-f", "rawvideo", "-pix_fmt", pix_fmt, "pipe:1"]
+
+        self._proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=0)
+        try:
+            fcntl.fcntl(self._proc.stdout.fileno(), fcntl.F_SETPIPE_SZ, _PIPE_BYTES)
+        except (AttributeError, OSError):
+            pass  # fewer, larger reads are an optimisation only
+        self._stderr_thread = threading.Thread(target=self._read_stderr, name="ffmpeg-decode-log", daemon=True)
+        self._stderr_thread.start()
+
+    def __iter__(self) -> Iterator[tuple[int, float, np.ndarray]]:
+        while True:
+            frame = self._next_buffer()
+            if not self._read_into(memoryview(frame).cast("B")):
+                break
+            try:
+                pts = self._pts.get(timeout=_PTS_TIMEOUT_S)
+            except queue.Empty:
+                pts = None
+            if pts is None:
+                self._fail("no timestamp for decoded frame")
+            t = self._seek_s + pts
+            frame_index = int(round(t * self.native_fps))
+            if self.end_frame is not None and frame_index >= self.end_frame:
+                break
+            self.frames_read += 1
+            yield frame_index, t, frame
+
+    def _next_buffer(self) -> np.ndarray:
+        if self._ring is None:
+            return np.empty(self._shape, dtype=np.uint8)
+        return self._ring[self.frames_read % len(self._ring)]
+
+    def _read_into(self, view: memoryview) -> bool:
+        filled = 0
+        while filled < len(view):
+            n = self._proc.stdout.readinto(view[filled:])
+            if not n:
+                if filled:
+                    self._fail("truncated frame")
+                self._proc.wait()
+                self._stderr_thread.join()
+                if self._proc.returncode != 0:
+                    self._fail()
+                return False
+            filled += n
+        return True
+
+    def _read_stderr(self) -> None:
+        for raw in self._proc.stderr:
+            line = raw.decode("utf-8", "replace").rstrip()
+            match = _SHOWINFO.search(line)
+            if match:
+                try:
+                    self._pts.put(float(match.group(1)))
+                except ValueError:  # NOPTS
+                    self._pts.put(None)
+            elif line:
+                self._stderr_tail.append(line)
+
+    def close(self) -> None:
+        if self._proc.poll() is None:
+            self._proc.kill()
+        self._proc.wait()
+        self._stderr_thread.join()
+        self._proc.stdout.close()
+
+    def _fail(self, reason: str | None = None) -> None:
+        self.close()
+        detail = reason or "\n".join(self._stderr_tail) or self._proc.returncode
+        raise RuntimeError(f"ffmpeg decode failed: {detail}")
+
+    def __enter__(self) -> FFmpegFrameReader:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def iter_ffmpeg_frames(source: str, **kwargs) -> Iterator[tuple[int, float, np.ndarray]]:
+    """`iter_sampled_frames` over an `FFmpegFrameReader`; the process is closed when iteration ends."""
+    with FFmpegFrameReader(source, **kwargs) as reader:
+        yield from reader
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+_FLOAT = np.float64
+_INT = np.int64
+
+# (names dict, class set) -> boolean mask over class indices; names dicts are
+# long-lived (one per model), so the identity check keeps this cheap per frame
+_CLASS_MASKS: dict[tuple[int, frozenset[str]], tuple[dict[int, str], np.ndarray]] = {}
+
+
+def class_index_mask(names: dict[int, str], classes: Iterable[str]) -> np.ndarray:
+    """Boolean array indexed by class id: True where the class name is in `classes`."""
+    wanted = classes if isinstance(classes, frozenset) else frozenset(classes)
+    key = (id(names), wanted)
+    cached = _CLASS_MASKS.get(key)
+    if cached is not None and cached[0] is names:
+        return cached[1]
+    if len(_CLASS_MASKS) >= 64:
+        _CLASS_MASKS.clear()
+
+    size = max((int(i) for i in names), default=-1) + 1
+    mask = np.zeros(size, dtype=bool)
+    for idx, name in names.items():
+        if name in wanted:
+            mask[int(idx)] = True
+    _CLASS_MASKS[key] = (names, mask)
+    return mask
+
+
+@dataclass
+class FrameDetections:
+    """
+    Tracked detections of one frame stored column-wise.
+
+    Every array has one entry per detection; `track_id` is -1 where the
+    tracker did not assign an id, and `predicted` marks boxes propagated
+    between detector runs rather than detected. `area` and `area_ratio` are derived once
+    from `w`/`h` and the frame size. Use `to_dicts` where the historical
+    per-detection dict format is still expected.
+    """
+
+    clip_id: str
+    t: float
+    xc: np.ndarray
+    yc: np.ndarray
+    w: np.ndarray
+    h: np.ndarray
+    conf: np.ndarray
+    class_id: np.ndarray
+    track_id: np.ndarray
+    names: dict[int, str] = field(default_factory=dict)
+    frame_area: float = 1.0
+    predicted: np.ndarray | None = None
+    area: np.ndarray = field(init=False)
+    area_ratio: np.ndarray = field(init=False)
+
+    def __post_init__(self) -> None:
+        if self.predicted is None:
+            self.predicted = np.zeros(len(self.class_id), dtype=bool)
+        self.area = np.maximum(1.0, self.w * self.h)
+        self.area_ratio = self.area / self.frame_area
+
+    @classmethod
+    def empty(cls, clip_id: str, t: float, *, frame_area: float = 1.0) -> FrameDetections:
+        f = np.empty(0, dtype=_FLOAT)
+        i = np.empty(0, dtype=_INT)
+        return cls(clip_id, float(t), f, f, f, f, f, i, i, frame_area=frame_area)
+
+    @classmethod
+    def from_arrays(
+        cls,
+        *,
+        clip_id: str,
+        t: float,
+        xywh: np.ndarray,
+        conf: np.ndarray,
+        class_id: np.ndarray,
+        track_id: np.ndarray,
+        names: dict[int, str],
+        frame_width: int,
+        frame_height: int,
+        class_mask: np.ndarray | None = None,
+    ) -> FrameDetections:
+        """Build from raw model outputs, keeping only rows whose class is set in `class_mask`."""
+        xywh = np.asarray(xywh, dtype=_FLOAT).reshape(-1, 4)
+        conf = np.asarray(conf, dtype=_FLOAT)
+        class_id = np.asarray(class_id, dtype=_INT)
+        track_id = np.asarray(track_id, dtype=_INT)
+
+        if class_mask is not None:
+            known = (class_id >= 0) & (class_id < len(class_mask))
+            keep = np.zeros(len(class_id), dtype=bool)
+            keep[known] = class_mask[class_id[known]]
+            xywh, conf, class_id, track_id = xywh[keep], conf[keep], class_id[keep], track_id[keep]
+
+        return cls(
+            clip_id=clip_id,
+            t=float(t),
+            xc=xywh[:, 0],
+            yc=xywh[:, 1],
+            w=xywh[:, 2],
+            h=xywh[:, 3],
+            conf=conf,
+            class_id=class_id,
+            track_id=track_id,
+            names=names,
+            frame_area=float(max(1, frame_width * frame_height)),
+        )
+
+    def __len__(self) -> int:
+        return len(self.class_id)
+
+    @property
+    def class_names(self) -> list[str]:
+        names = self.names
+        return [names.get(c, str(c)) for c in self.class_id.tolist()]
+
+    def rows(self) -> Iterator[tuple[int, str, float, float, float, float, float]]:
+        """Yield (track_id, class, xc, yc, w, h, conf) per detection as plain Python scalars."""
+        return zip(
+            self.track_id.tolist(),
+            self.class_names,
+            self.xc.tolist(),
+            self.yc.tolist(),
+            self.w.tolist(),
+            self.h.tolist(),
+            self.conf.tolist(),
+        )
+
+    def to_dicts(self) -> list[dict[str, Any]]:
+        """Per-detection dicts in the format `track_frame` has always returned."""
+        t = self.t
+        return [
+            {
+                "clip_id": self.clip_id,
+                "class": cls_name,
+                "track_id": tid,
+                "t": t,
+                "xc": xc,
+                "yc": yc,
+                "w": w,
+                "h": h,
+                "conf": conf,
+                "area": area,
+                "area_ratio": ratio,
+                "predicted": predicted,
+            }
+            for (tid, cls_name, xc, yc, w, h, conf), area, ratio, predicted in zip(
+                self.rows(), self.area.tolist(), self.area_ratio.tolist(), self.predicted.tolist()
+            )
+        ]
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import subprocess
+
+# Safe OpenCV import (worker-safe)
+try:
+    import cv2
+except Exception:  # pragma: no cover
+    cv2 = None
+
+import numpy as np
+
+from app.workers.vision.frames import sample_step
+
+PREVIEW_HEIGHT = 720
+PREVIEW_FPS = 15.0
+PREVIEW_BITRATE = "2200k"
+
+
+def preview_size(width: int, height: int, target_height: int = PREVIEW_HEIGHT) -> tuple[int, int]:
+    """Output size matching ffmpeg's `scale=-2:<target_height>` (even width, fixed height)."""
+    out_w = int(width * target_height / max(1, height) / 2.0 + 0.5) * 2
+    return max(2, out_w), target_height
+
+
+class PreviewEncoder:
+    """
+    Stream BGR frames into an ffmpeg H.264 encoder over stdin.
+
+    Frames are dropped to the preview rate and downscaled before they are
+    piped, so no intermediate full-resolution video is written to disk and the
+    preview is encoded exactly once.
+    """
+
+    def __init__(
+        self,
+        out_path: str,
+        *,
+        src_width: int,
+        src_height: int,
+        src_fps: float,
+        height: int = PREVIEW_HEIGHT,
+        fps: float = PREVIEW_FPS,
+        bitrate: str = PREVIEW_BITRATE,
+    ):
+        self.out_path = out_path
+        self.src_size = (src_width, src_height)
+        self.size = preview_size(src_width, src_height, height)
+        self.step = sample_step(src_fps, fps)
+        self.fps = src_fps / self.step
+        self.frames_in = 0
+        self.frames_out = 0
+        self._next_sample = 0.0
+
+        width_out, height_out = self.size
+        cmd = [
+            "ffmpeg",
+            "-y",
+            "-loglevel",
+            "error",
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            "bgr24",
+            "-s",
+            f"{width_out}x{height_out}",
+            "-r",
+            f"{self.fps:.6f}",
+            "-i",
+            "-",
+            "-c:v",
+            "libx264",
+            "-preset",
+            "veryfast",
+            "-b:v",
+            bitrate,
+            "-pix_fmt",
+            "yuv420p",
+            "-movflags",
+            "+faststart",
+            "-an",
+            out_path,
+        ]
+        self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    def wants_frame(self) -> bool:
+        """Whether the next frame passed to `write` lands on the preview timeline."""
+        return self.frames_in + 1e-6 >= self._next_sample
+
+    def skip(self) -> None:
+        """Consume the next input frame without rendering it (normally one `wants_frame` rejected)."""
+        if self.wants_frame():
+            self._next_sample += self.step
+        self.frames_in += 1
+
+    def write(self, frame: np.ndarray) -> None:
+        keep = self.wants_frame()
+        self.frames_in += 1
+        if not keep:
+            return
+        self._next_sample += self.step
+
+        if (frame.shape[1], frame.shape[0]) != self.size:
+            if cv2 is None:
+                raise RuntimeError("OpenCV not available")
+            frame = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+
+        try:
+            self._proc.stdin.write(np.ascontiguousarray(frame, dtype=np.uint8).data)
+        except BrokenPipeError:
+            self._fail()
+        self.frames_out += 1
+
+    def close(self) -> None:
+        if self._proc.stdin and not self._proc.stdin.closed:
+            try:
+                self._proc.stdin.close()
+            except BrokenPipeError:
+                pass
+        if self._proc.wait() != 0:
+            self._fail()
+
+    def abort(self) -> None:
+        self._proc.kill()
+        self._proc.wait()
+
+    def _fail(self) -> None:
+        self._proc.kill()
+        self._proc.wait()
+        stderr = self._proc.stderr.read().decode("utf-8", "replace").strip() if self._proc.stderr else ""
+        raise RuntimeError(f"ffmpeg preview encode failed: {stderr or self._proc.returncode}")
+
+    def __enter__(self) -> PreviewEncoder:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import math
+from collections.abc import Iterator
+from typing import Any
+
+import numpy as np
+
+
+def sample_step(native_fps: float, target_fps: float | None) -> float:
+    """Number of native frames between samples (1.0 means keep every frame)."""
+    if not target_fps or target_fps <= 0 or native_fps <= 0 or target_fps >= native_fps:
+        return 1.0
+    return native_fps / target_fps
+
+
+def iter_sampled_frames(
+    cap: Any,
+    *,
+    native_fps: float,
+    target_fps: float | None,
+    start_frame: int = 0,
+    end_frame: int | None = None,
+) -> Iterator[tuple[int, float, np.ndarray]]:
+    """
+    Yield (frame_index, timestamp_s, frame) on a `target_fps` sampling grid.
+
+    Every frame is advanced with `cap.grab()`, but only frames on the grid are
+    decoded with `cap.retrieve()`. Timestamps come from the true frame index, so
+    they stay exact for non-integer fps ratios (e.g. 29.97 -> 5).
+
+    `start_frame` must be the capture's current position (seek first); the grid
+    stays aligned to frame 0, so chunks of one video sample the same frames.
+    `end_frame` is exclusive.
+    """
+    step = sample_step(native_fps, target_fps)
+    # first grid point past frame start_frame - 1, so a chunk keeps the same
+    # frames a full run would (with a fractional step that point can lie
+    # before start_frame and still select it)
+    next_sample = (math.floor((start_frame - 1 + 1e-6) / step) + 1) * step
+    frame_index = start_frame
+
+    while (end_frame is None or frame_index < end_frame) and cap.grab():
+        if frame_index + 1e-6 >= next_sample:
+            next_sample += step
+            ok, frame = cap.retrieve()
+            if ok and frame is not None:
+                yield frame_index, frame_index / native_fps, frame
+        frame_index += 1
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import math
+from collections.abc import Callable
+
+# Safe OpenCV import (worker-safe)
+try:
+    import cv2
+except Exception:  # pragma: no cover
+    cv2 = None
+
+import numpy as np
+
+from app.ml.ego_motion import EgoMotionEstimator
+from app.workers.vision.detections import FrameDetections
+
+# Motion estimation and box propagation run on a downscaled gray copy
+WORK_WIDTH = 640
+# Points sampled per box (GRID x GRID over the central half of the box)
+GRID = 3
+_LK_PARAMS = {"winSize": (15, 15), "maxLevel": 2}
+
+
+def keyframe_interval(motion_px: float, *, k_max: int, k_min: int = 1, motion_high_px: float = 12.0) -> int:
+    """Detector interval for the current global motion: `k_max` when static, `k_min` at `motion_high_px` or more."""
+    if k_max <= k_min or motion_high_px <= 0:
+        return max(1, k_max)
+    ratio = min(1.0, max(0.0, motion_px / motion_high_px))
+    return max(1, int(round(k_max - (k_max - k_min) * ratio)))
+
+
+class KeyframeTracker:
+    """
+    Run the detector on keyframes only and propagate tracks in between.
+
+    `detect` is the batched tracker call (`track_batch_columnar` bound to a
+    model); it only sees keyframes, so the persisted tracker updates once per
+    keyframe. On other frames every tracked box is moved by the median
+    Lucas-Kanade flow of points inside it (falling back to the global motion
+    from an `EgoMotionEstimator`) and emitted with `predicted=True`.
+
+    The interval adapts per frame: global motion between consecutive frames
+    maps to K via `keyframe_interval`, so a turning or accelerating camera
+    gets the detector more often than a parked one.
+    """
+
+    def __init__(
+        self,
+        detect: Callable[[list[np.ndarray], list[float]], list[FrameDetections]],
+        *,
+        k_max: int,
+        k_min: int = 1,
+        motion_high_px: float = 12.0,
+    ):
+        self.detect = detect
+        self.k_max = max(1, k_max)
+        self.k_min = max(1, min(k_min, self.k_max))
+        self.motion_high_px = motion_high_px
+        self.detector_frames = 0
+        self.predicted_frames = 0
+
+        self._ego = EgoMotionEstimator()
+        self._prev_gray: np.ndarray | None = None
+        self._prev: FrameDetections | None = None
+        self._since_key = 0
+        self._scale = 1.0
+
+    def _work_gray(self, frame: np.ndarray) -> np.ndarray:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        h, w = gray.shape[:2]
+        if w > WORK_WIDTH:
+            self._scale = w / WORK_WIDTH
+            gray = cv2.resize(gray, (WORK_WIDTH, int(round(h / self._scale))), interpolation=cv2.INTER_AREA)
+        else:
+            self._scale = 1.0
+        return gray
+
+    def process(self, frames: list[np.ndarray], timestamps: list[float]) -> list[FrameDetections]:
+        return [dets for dets, _ in self.process_with_motion(frames, timestamps)]
+
+    def process_with_motion(
+        self, frames: list[np.ndarray], timestamps: list[float]
+    ) -> list[tuple[FrameDetections, tuple[float, float]]]:
+        """Like `process`, paired with each frame's global motion (dx, dy) in input-frame pixels."""
+        if cv2 is None:
+            return [(dets, (0.0, 0.0)) for dets in self.detect(frames, timestamps)]
+
+        grays = [self._work_gray(frame) for frame in frames]
+
+        # Decide keyframes first so all of them go to the detector in one batch
+        keys: list[bool] = []
+        motions: list[tuple[float, float]] = []
+        prev_gray = self._prev_gray
+        since_key = self._since_key
+        for gray in grays:
+            motion = self._ego.update(gray)
+            if prev_gray is None:
+                key = True
+            else:
+                k = keyframe_interval(
+                    math.hypot(*motion) * self._scale,
+                    k_max=self.k_max,
+                    k_min=self.k_min,
+                    motion_high_px=self.motion_high_px,
+                )
+                key = since_key + 1 >= k
+            since_key = 0 if key else since_key + 1
+            keys.append(key)
+            motions.append(motion)
+            prev_gray = gray
+        self._since_key = since_key
+
+        key_idx = [i for i, key in enumerate(keys) if key]
+        detected = dict(zip(key_idx, self.detect([frames[i] for i in key_idx], [timestamps[i] for i in key_idx])))
+
+        out: list[tuple[FrameDetections, tuple[float, float]]] = []
+        for i, gray in enumerate(grays):
+            if keys[i]:
+                dets = detected[i]
+                self.detector_frames += 1
+            else:
+                dets = self._propagate(self._prev, self._prev_gray, gray, timestamps[i], motions[i])
+                self.predicted_frames += 1
+            out.append((dets, (motions[i][0] * self._scale, motions[i][1] * self._scale)))
+            self._prev = dets
+            self._prev_gray = gray
+        return out
+
+    def _propagate(
+        self,
+        prev: FrameDetections | None,
+        prev_gray: np.ndarray | None,
+        gray: np.ndarray,
+        t: float,
+        motion: tuple[float, float],
+    ) -> FrameDetections:
+        if prev is None or prev_gray is None:
+            return FrameDetections.empty("", t)
+        if len(prev) == 0:
+            return FrameDetections.empty(prev.clip_id, t, frame_area=prev.frame_area)
+
+        scale = self._scale
+        keep = prev.track_id >= 0
+        xc, yc, w, h = prev.xc[keep], prev.yc[keep], prev.w[keep], prev.h[keep]
+        n = len(xc)
+
+        # GRID x GRID points over the central half of each box, in work-image pixels
+        offsets = (np.arange(GRID) + 0.5) / GRID - 0.5
+        ox, oy = np.meshgrid(offsets, offsets)
+        px = (xc[:, None] + 0.5 * w[:, None] * ox.reshape(1, -1)) / scale
+        py = (yc[:, None] + 0.5 * h[:, None] * oy.reshape(1, -1)) / scale
+        pts = np.stack([px, py], axis=-1).reshape(-1, 1, 2).astype(np.float32)
+
+        dx = np.full(n, motion[0] * scale)
+        dy = np.full(n, motion[1] * scale)
+        if len(pts):
+            new_pts, status, _ = cv2.calcOpticalFlowPyrLK(prev_gray, gray, pts, None, **_LK_PARAMS)
+            if new_pts is not None and status is not None:
+                deltas = (new_pts - pts).reshape(n, GRID * GRID, 2) * scale
+                valid = status.reshape(n, GRID * GRID) == 1
+                for j in range(n):
+                    if valid[j].sum() >= 3:
+                        dx[j], dy[j] = np.median(deltas[j][valid[j]], axis=0)
+
+        new_xc, new_yc = xc + dx, yc + dy
+        height, width = gray.shape[0] * scale, gray.shape[1] * scale
+        inside = (new_xc >= 0) & (new_xc < width) & (new_yc >= 0) & (new_yc < height)
+
+        return FrameDetections(
+            clip_id=prev.clip_id,
+            t=float(t),
+            xc=new_xc[inside],
+            yc=new_yc[inside],
+            w=w[inside],
+            h=h[inside],
+            conf=prev.conf[keep][inside],
+            class_id=prev.class_id[keep][inside],
+            track_id=prev.track_id[keep][inside],
+            names=prev.names,
+            frame_area=prev.frame_area,
+            predicted=np.ones(int(inside.sum()), dtype=bool),
+        )
@@ -0,0 +1,255 @@
+"""
+Offline INT8 calibration for the ONNX Runtime backend.
+
+    cd backend && python -m app.workers.vision.quantize \
+        --weights yolov8n.pt --frames-dir calib_frames/ --reference-clip reference.mp4
+
+Exports (or reuses) the FP32 ONNX model, statically quantizes its convolutions
+to INT8 using activation ranges observed on `--frames-dir`, then tracks
+`--reference-clip` with both models and writes a guardrail report next to the
+INT8 model. Workers only load it (`YOLO_BACKEND=onnx_int8`) when the report's
+drift is within `YOLO_INT8_MAX_DRIFT`.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import re
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+# Safe OpenCV import (worker-safe)
+try:
+    import cv2
+except Exception:  # pragma: no cover
+    cv2 = None
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.workers.vision.frames import iter_sampled_frames
+from app.workers.vision.tracking import (
+    exported_weights_path,
+    guardrail_report_path,
+    load_yolo_model,
+    resolve_backend_weights,
+    track_batch_columnar,
+)
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp"}
+
+
+def letterbox(image: np.ndarray, size: int) -> np.ndarray:
+    """Resize keeping aspect ratio and pad to size x size with gray, as Ultralytics preprocessing does."""
+    h, w = image.shape[:2]
+    scale = size / max(h, w)
+    nh, nw = int(round(h * scale)), int(round(w * scale))
+    out = np.full((size, size, 3), 114, dtype=np.uint8)
+    top, left = (size - nh) // 2, (size - nw) // 2
+    out[top:top + nh, left:left + nw] = cv2.resize(image, (nw, nh), interpolation=cv2.INTER_LINEAR)
+    return out
+
+
+def calibration_inputs(frames_dir: str, *, imgsz: int = 640, limit: int = 200) -> Iterator[np.ndarray]:
+    """Yield (1, 3, imgsz, imgsz) float32 RGB tensors in [0, 1] from the images in `frames_dir`."""
+    if cv2 is None:
+        raise RuntimeError("OpenCV not available")
+    paths = sorted(p for p in Path(frames_dir).iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)[:limit]
+    if not paths:
+        raise ValueError(f"no calibration images in {frames_dir}")
+    for path in paths:
+        image = cv2.imread(str(path))
+        if image is None:
+            continue
+        rgb = letterbox(image, imgsz)[:, :, ::-1]
+        yield np.ascontiguousarray(rgb.transpose(2, 0, 1)[None], dtype=np.float32) / 255.0
+
+
+def head_decode_nodes(model: Any) -> list[str]:
+    """
+    Names of the detection head's decode nodes (DFL, anchor math, final concat).
+
+    These turn logits into pixel coordinates and lose box precision when
+    quantized, so they stay FP32. The head's per-level conv branches (cv2/cv3)
+    are not included.
+    """
+    names = [node.name for node in model.graph.node]
+    dfl = next((name for name in names if "/dfl/" in name), None)
+    if dfl is None:
+        return []
+    prefix = dfl.split("dfl/")[0]
+    branch = re.compile(re.escape(prefix) + r"cv\d+\.")
+    return [name for name in names if name.startswith(prefix) and not branch.match(name)]
+
+
+def quantize_onnx(fp32_path: str, int8_path: str, frames_dir: str, *, imgsz: int = 640, limit: int = 200) -> str:
+    """
+    Statically quantize the backbone, neck and head branches to INT8 (QDQ, per-channel weights).
+
+    The head's decode nodes stay FP32, which keeps box coordinates precise.
+    Ultralytics metadata (class names, stride, task) is copied over so the
+    quantized model loads like the FP32 export.
+    """
+    import onnx
+    from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    fp32 = onnx.load(fp32_path)
+    input_name = fp32.graph.input[0].name
+
+    class _Reader(CalibrationDataReader):
+        def __init__(self) -> None:
+            self._inputs = calibration_inputs(frames_dir, imgsz=imgsz, limit=limit)
+
+        def get_next(self) -> dict[str, np.ndarray] | None:
+            tensor = next(self._inputs, None)
+            return None if tensor is None else {input_name: tensor}
+
+    # shape inference + graph optimization so the quantizer sees fused Conv/act patterns
+    prepared = f"{int8_path}.prep.onnx"
+    quant_pre_process(fp32_path, prepared, skip_symbolic_shape=True)
+
+    try:
+        quantize_static(
+            prepared,
+            int8_path,
+            _Reader(),
+            quant_format=QuantFormat.QDQ,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            per_channel=True,
+            nodes_to_exclude=head_decode_nodes(onnx.load(prepared)),
+        )
+    finally:
+        Path(prepared).unlink(missing_ok=True)
+
+    int8 = onnx.load(int8_path)
+    del int8.metadata_props[:]
+    int8.metadata_props.extend(fp32.metadata_props)
+    onnx.save(int8, int8_path)
+    return int8_path
+
+
+def _track_clip(
+    model: Any, clip: str, *, fps_sampled: float, batch_size: int, imgsz: int | None = None
+) -> list[tuple[int, np.ndarray]]:
+    frames: list[tuple[int, np.ndarray]] = []
+    batch: list[tuple[int, float, np.ndarray]] = []
+
+    def flush() -> None:
+        for dets in track_batch_columnar(
+            model,
+            [frame for _, _, frame in batch],
+            clip_id="reference",
+            timestamps_s=[t for _, t, _ in batch],
+            frame_width=width,
+            frame_height=height,
+            imgsz=imgsz,
+        ):
+            frames.append((len(dets), dets.track_id[dets.track_id >= 0]))
+        batch.clear()
+
+    # decoded frames are held one batch at a time, however long the clip
+    cap = cv2.VideoCapture(clip)
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        for sample in iter_sampled_frames(cap, native_fps=fps, target_fps=fps_sampled):
+            batch.append(sample)
+            if len(batch) == batch_size:
+                flush()
+        if batch:
+            flush()
+    finally:
+        cap.release()
+    return frames
+
+
+def continuity(frames: list[tuple[int, np.ndarray]]) -> float:
+    """Mean number of frames each track id survives (drops when tracks fragment)."""
+    ids = np.concatenate([tids for _, tids in frames]) if frames else np.empty(0, dtype=np.int64)
+    if len(ids) == 0:
+        return 0.0
+    return float(len(ids) / len(np.unique(ids)))
+
+
+def compare_to_fp32(
+    fp32_model: Any,
+    int8_model: Any,
+    reference_clip: str,
+    *,
+    fps_sampled: float = 5.0,
+    batch_size: int = 8,
+    imgsz: int | None = None,
+) -> dict[str, float]:
+    """
+    Track `reference_clip` with both models at input size `imgsz` and measure INT8 drift.
+
+    count_drift is the summed per-frame detection-count difference relative to
+    the FP32 detection total; continuity_drift is the relative change in mean
+    track length.
+    """
+    fp32 = _track_clip(fp32_model, reference_clip, fps_sampled=fps_sampled, batch_size=batch_size, imgsz=imgsz)
+    int8 = _track_clip(int8_model, reference_clip, fps_sampled=fps_sampled, batch_size=batch_size, imgsz=imgsz)
+
+    fp32_counts = np.array([n for n, _ in fp32])
+    int8_counts = np.array([n for n, _ in int8])
+    total = max(1, int(fp32_counts.sum()))
+    count_drift = float(np.abs(int8_counts - fp32_counts).sum() / total)
+
+    fp32_cont, int8_cont = continuity(fp32), continuity(int8)
+    continuity_drift = abs(int8_cont - fp32_cont) / fp32_cont if fp32_cont > 0 else float(int8_cont > 0)
+
+    return {
+        "frames": len(fp32),
+        "fp32_detections": int(fp32_counts.sum()),
+        "int8_detections": int(int8_counts.sum()),
+        "fp32_continuity": round(fp32_cont, 4),
+        "int8_continuity": round(int8_cont, 4),
+        "count_drift": round(count_drift, 4),
+        "continuity_drift": round(continuity_drift, 4),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--weights", default=settings.yolo_weights)
+    parser.add_argument("--frames-dir", required=True, help="folder of representative frames (jpg/png)")
+    parser.add_argument("--reference-clip", required=True, help="clip used for the FP32 vs INT8 guardrail")
+    parser.add_argument("--export-dir", default=settings.yolo_export_dir)
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--max-frames", type=int, default=200)
+    parser.add_argument("--max-drift", type=float, default=settings.yolo_int8_max_drift)
+    args = parser.parse_args(argv)
+
+    fp32_path = resolve_backend_weights(args.weights, "onnx", args.export_dir or None)
+    if fp32_path is None:
+        raise SystemExit("FP32 ONNX export failed")
+    int8_path = str(exported_weights_path(args.weights, "onnx_int8", args.export_dir or None))
+
+    quantize_onnx(fp32_path, int8_path, args.frames_dir, imgsz=args.imgsz, limit=args.max_frames)
+
+    report = compare_to_fp32(
+        load_yolo_model(fp32_path),
+        load_yolo_model(int8_path),
+        args.reference_clip,
+        fps_sampled=settings.fps_sampled,
+        batch_size=settings.track_batch_size,
+        imgsz=args.imgsz,
+    )
+    report["max_drift"] = args.max_drift
+    # a reference clip without detections proves nothing about accuracy
+    report["passed"] = report["fp32_detections"] > 0 and (
+        max(report["count_drift"], report["continuity_drift"]) <= args.max_drift
+    )
+    guardrail_report_path(int8_path).write_text(json.dumps(report, indent=2))
+
+    logger.info("yolo.int8_calibrated", path=int8_path, **report)
+    return 0 if report["passed"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,9 +1,17 @@
 from __future__ import annotations
 
+import fcntl
+import json
+import shutil
+import threading
+import weakref
+from pathlib import Path
 from typing import Any
 
 import numpy as np
+from app.core.config import settings
 from app.core.logging import logger
+from app.workers.vision.detections import FrameDetections, class_index_mask
 
 # Optional import: allows app to run even if ultralytics is unavailable
 try:
@@ -38,6 +46,267 @@ def load_yolo_model(weights: str = "/app/backend/yolov8n.pt") -> Any | None:
         return None
 
 
+# Inference backends: "torch" runs the .pt weights directly; the others run an
+# exported copy of the same weights through Ultralytics' AutoBackend.
+# "onnx_int8" is produced offline by `python -m app.workers.vision.quantize`.
+INFERENCE_BACKENDS = ("torch", "onnx", "openvino", "onnx_int8")
+
+
+def exported_weights_path(weights: str, backend: str, export_dir: str | None = None) -> Path:
+    """Where the `backend` export of `weights` is cached (the weights' own directory by default)."""
+    src = Path(weights)
+    root = Path(export_dir) if export_dir else src.parent
+    if backend == "onnx":
+        return root / f"{src.stem}.onnx"
+    if backend == "openvino":
+        return root / f"{src.stem}_openvino_model"
+    if backend == "onnx_int8":
+        return root / f"{src.stem}_int8.onnx"
+    return src
+
+
+def guardrail_report_path(model_path: str | Path) -> Path:
+    return Path(f"{model_path}.guardrail.json")
+
+
+def int8_guardrail_error(model_path: str | Path, max_drift: float | None = None) -> str | None:
+    """
+    Why the quantized model at `model_path` must not be used, or None if it passed.
+
+    The calibration command writes a report of detection-count and
+    track-continuity drift against FP32; the model is refused when the report is
+    missing or either drift exceeds `max_drift` (`YOLO_INT8_MAX_DRIFT`).
+    """
+    max_drift = settings.yolo_int8_max_drift if max_drift is None else max_drift
+    if not Path(model_path).exists():
+        return "quantized model not found; run `python -m app.workers.vision.quantize`"
+    try:
+        report = json.loads(guardrail_report_path(model_path).read_text())
+    except (OSError, ValueError):
+        return "guardrail report missing"
+    if not report.get("fp32_detections"):
+        return "reference clip produced no FP32 detections"
+    drift = max(float(report.get("count_drift", 1.0)), float(report.get("continuity_drift", 1.0)))
+    if drift > max_drift:
+        return f"drift {drift:.3f} exceeds {max_drift:.3f}"
+    return None
+
+
+def resolve_backend_weights(weights: str, backend: str, export_dir: str | None = None) -> str | None:
+    """
+    Return a loadable model path for `backend`, exporting `weights` on first use.
+
+    Exports use dynamic input shapes so batched tracking and any frame size work
+    with one file. A file lock keeps concurrent worker processes from exporting
+    the same model twice. Returns None if the export fails, or if the INT8 model
+    has not been calibrated or failed its accuracy guardrail.
+    """
+    if backend not in INFERENCE_BACKENDS:
+        raise ValueError(f"unknown inference backend {backend!r}; expected one of {INFERENCE_BACKENDS}")
+
+    target = exported_weights_path(weights, backend, export_dir)
+    if backend == "onnx_int8":
+        error = int8_guardrail_error(target)
+        if error:
+            logger.warning("yolo.int8_rejected", path=str(target), reason=error)
+            return None
+        return str(target)
+    if backend == "torch" or target.exists():
+        return str(target)
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with open(target.parent / f".{target.name}.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        if target.exists():
+            return str(target)
+
+        model = load_yolo_model(weights)
+        if model is None:
+            return None
+        try:
+            exported = Path(model.export(format=backend, dynamic=True, imgsz=640, verbose=False))
+        except Exception as exc:
+            logger.warning("yolo.export_failed", backend=backend, reason=str(exc))
+            return None
+        if exported.resolve() != target.resolve():
+            shutil.move(str(exported), str(target))
+        logger.info("yolo.exported", backend=backend, path=str(target))
+        return str(target)
+
+
+def configure_threads(intra_op: int | None = None, inter_op: int | None = None) -> None:
+    """Apply PyTorch intra/inter-op thread counts (0 keeps the library default)."""
+    intra_op = settings.yolo_intra_op_threads if intra_op is None else intra_op
+    inter_op = settings.yolo_inter_op_threads if inter_op is None else inter_op
+    try:
+        import torch
+    except Exception:  # pragma: no cover
+        return
+    if intra_op > 0:
+        torch.set_num_threads(intra_op)
+    if inter_op > 0:
+        try:
+            torch.set_num_interop_threads(inter_op)
+        except RuntimeError:
+            # Only settable before the first parallel op in this process
+            pass
+
+
+def _runtime_backend(model: Any) -> Any | None:
+    autobackend = getattr(getattr(model, "predictor", None), "model", None)
+    return getattr(autobackend, "backend", autobackend)
+
+
+def apply_runtime_threads(model: Any | None, backend: str, model_path: str, intra_op: int, inter_op: int) -> None:
+    """
+    Rebuild the exported model's runtime session with explicit thread counts.
+
+    Ultralytics creates ONNX Runtime sessions and OpenVINO compiled models with
+    library defaults (all cores); workers sharing a host need them capped. Must
+    run after the predictor exists (i.e. after `warm_up`).
+    """
+    if model is None or (intra_op <= 0 and inter_op <= 0):
+        return
+    runtime = _runtime_backend(model)
+
+    try:
+        if backend in ("onnx", "onnx_int8") and getattr(runtime, "session", None) is not None:
+            import onnxruntime
+
+            options = onnxruntime.SessionOptions()
+            if intra_op > 0:
+                options.intra_op_num_threads = intra_op
+            if inter_op > 0:
+                options.inter_op_num_threads = inter_op
+                if inter_op > 1:
+                    options.execution_mode = onnxruntime.ExecutionMode.ORT_PARALLEL
+            runtime.session = onnxruntime.InferenceSession(
+                model_path, options, providers=runtime.session.get_providers()
+            )
+        elif backend == "openvino" and getattr(runtime, "ov_compiled_model", None) is not None:
+            import openvino as ov
+
+            config: dict[str, Any] = {"PERFORMANCE_HINT": "LATENCY"}
+            if intra_op > 0:
+                config["INFERENCE_NUM_THREADS"] = intra_op
+            if inter_op > 0:
+                config["NUM_STREAMS"] = inter_op
+            xml = next(Path(model_path).glob("*.xml"))
+            runtime.ov_compiled_model = ov.Core().compile_model(str(xml), "CPU", config)
+    except Exception as exc:  # pragma: no cover
+        logger.warning("yolo.threads_failed", backend=backend, reason=str(exc))
+
+
+_MODEL_CACHE: dict[tuple[str, str, str], Any] = {}
+_MODEL_CACHE_LOCK = threading.Lock()
+
+
+def _cache_key(weights: str | None, device: str | None, backend: str | None) -> tuple[str, str, str]:
+    return (weights or settings.yolo_weights, device or settings.yolo_device, backend or settings.yolo_backend)
+
+
+def model_is_cached(weights: str | None = None, device: str | None = None, backend: str | None = None) -> bool:
+    return _cache_key(weights, device, backend) in _MODEL_CACHE
+
+
+def get_model(
+    weights: str | None = None,
+    device: str | None = None,
+    *,
+    backend: str | None = None,
+    warm: bool = True,
+) -> Any | None:
+    """
+    Return the process-wide model for (weights, device, backend), loading it on first use.
+
+    Non-torch backends load the exported copy of `weights` (exporting it once if
+    needed) and fall back to the .pt weights if the export is unavailable.
+    The cached instance is shared by every job in this worker process; call
+    `reset_tracker` before each clip so track ids do not leak between jobs.
+    """
+    key = _cache_key(weights, device, backend)
+    weights, device, backend = key
+
+    with _MODEL_CACHE_LOCK:
+        model = _MODEL_CACHE.get(key)
+        if model is not None:
+            return model
+
+        configure_threads()
+
+        path = resolve_backend_weights(weights, backend, settings.yolo_export_dir or None)
+        if path is None:
+            logger.warning("yolo.backend_fallback", backend=backend, fallback="torch")
+            path, backend = weights, "torch"
+
+        model = load_yolo_model(path)
+        if model is None:
+            return None
+
+        if backend == "torch":
+            try:
+                model.to(device)
+            except Exception as exc:  # pragma: no cover
+                logger.warning("yolo.device_failed", device=device, reason=str(exc))
+
+        if warm:
+            warm_up(model)
+            apply_runtime_threads(model, backend, path, settings.yolo_intra_op_threads, settings.yolo_inter_op_threads)
+
+        _MODEL_CACHE[key] = model
+        return model
+
+
+def warm_up(model: Any | None, *, width: int = 640, height: int = 384) -> None:
+    """Run one dummy inference so lazy setup (predictor, fused layers) happens before the first job."""
+    if model is None:
+        return
+    try:
+        model.predict(np.zeros((height, width, 3), dtype=np.uint8), verbose=False)
+    except Exception as exc:  # pragma: no cover
+        logger.warning("yolo.warmup_failed", reason=str(exc))
+
+
+def reset_tracker(model: Any | None) -> None:
+    """Clear persisted tracker state (tracks and the id counter) before a new clip."""
+    predictor = getattr(model, "predictor", None)
+    for tracker in getattr(predictor, "trackers", None) or []:
+        tracker.reset()
+
+
+def clear_model_cache() -> None:
+    with _MODEL_CACHE_LOCK:
+        _MODEL_CACHE.clear()
+        _CLASS_INDEX_CACHE.clear()
+
+
+# model -> {class name set -> class indices}; weak so dropped models are not kept alive
+_CLASS_INDEX_CACHE: weakref.WeakKeyDictionary[Any, dict[frozenset[str], list[int] | None]] = weakref.WeakKeyDictionary()
+
+
+def target_class_indices(model: Any | None, classes: frozenset[str]) -> list[int] | None:
+    """
+    Class indices of `classes` in the model's label map, resolved once per model.
+
+    Passed as `model.track(classes=...)` so non-target boxes are dropped inside
+    NMS and never reach the tracker. Returns None (no detector-side filter) when
+    the model has no label map or none of the classes are in it.
+    """
+    if model is None:
+        return None
+    try:
+        per_model = _CLASS_INDEX_CACHE.setdefault(model, {})
+    except TypeError:  # not weak-referenceable
+        per_model = {}
+    if classes in per_model:
+        return per_model[classes]
+
+    names = getattr(model, "names", None)
+    indices = sorted(int(i) for i, name in names.items() if name in classes) if isinstance(names, dict) else []
+    per_model[classes] = indices or None
+    return per_model[classes]
+
+
 def track_frame(
     model: Any | None,
     frame: np.ndarray,
@@ -47,96 +316,272 @@ def track_frame(
     frame_width: int,
     frame_height: int,
     target_classes: set[str] | None = None,
+    imgsz: int | None = None,
+    roi: tuple[int, int, int, int] | None = None,
 ) -> list[dict[str, Any]]:
     """
     Run tracking on a frame and return normalized detections with track ids (if available).
     """
+    return track_frame_columnar(
+        model,
+        frame,
+        clip_id=clip_id,
+        timestamp_s=timestamp_s,
+        frame_width=frame_width,
+        frame_height=frame_height,
+        target_classes=target_classes,
+        imgsz=imgsz,
+        roi=roi,
+    ).to_dicts()
 
-    if model is None:
-        return []
 
-    classes = target_classes or DEFAULT_TARGET_CLASSES
+def track_batch(
+    model: Any | None,
+    frames: list[np.ndarray],
+    *,
+    clip_id: str,
+    timestamps_s: list[float],
+    frame_width: int,
+    frame_height: int,
+    target_classes: set[str] | None = None,
+    imgsz: int | None = None,
+    roi: tuple[int, int, int, int] | None = None,
+) -> list[list[dict[str, Any]]]:
+    """
+    Run tracking on consecutive frames with a single batched detector call.
+
+    Ultralytics runs one forward pass over the whole list and then updates the
+    (persisted) tracker once per image in list order, so track ids match what
+    repeated `track_frame` calls would produce.
+    """
+    return [
+        dets.to_dicts()
+        for dets in track_batch_columnar(
+            model,
+            frames,
+            clip_id=clip_id,
+            timestamps_s=timestamps_s,
+            frame_width=frame_width,
+            frame_height=frame_height,
+            target_classes=target_classes,
+            imgsz=imgsz,
+            roi=roi,
+        )
+    ]
+
+
+def track_frame_columnar(
+    model: Any | None,
+    frame: np.ndarray,
+    *,
+    clip_id: str,
+    timestamp_s: float,
+    frame_width: int,
+    frame_height: int,
+    target_classes: set[str] | None = None,
+    imgsz: int | None = None,
+    roi: tuple[int, int, int, int] | None = None,
+) -> FrameDetections:
+    """Like `track_frame`, but return the detections as one `FrameDetections`."""
+    return track_batch_columnar(
+        model,
+        [frame],
+        clip_id=clip_id,
+        timestamps_s=[timestamp_s],
+        frame_width=frame_width,
+        frame_height=frame_height,
+        target_classes=target_classes,
+        imgsz=imgsz,
+        roi=roi,
+    )[0]
+
 
+def track_batch_columnar(
+    model: Any | None,
+    frames: list[np.ndarray],
+    *,
+    clip_id: str,
+    timestamps_s: list[float],
+    frame_width: int,
+    frame_height: int,
+    target_classes: set[str] | None = None,
+    imgsz: int | None = None,
+    roi: tuple[int, int, int, int] | None = None,
+) -> list[FrameDetections]:
+    """
+    Like `track_batch`, but return one `FrameDetections` per frame.
+
+    `imgsz` is the detector's input size (long side, default `YOLO_IMGSZ`).
+    `roi` is a pixel (x1, y1, x2, y2) region each frame is cropped to before
+    inference; boxes are shifted back so coordinates and `area_ratio` stay in
+    full-frame terms.
+    """
+    frame_area = max(1, frame_width * frame_height)
+
+    def empty() -> list[FrameDetections]:
+        return [FrameDetections.empty(clip_id, t, frame_area=frame_area) for t in timestamps_s[: len(frames)]]
+
+    if model is None or not frames:
+        return empty()
+
+    offset = (0.0, 0.0)
+    if roi is not None:
+        x1, y1, x2, y2 = roi
+        frames = [frame[y1:y2, x1:x2] for frame in frames]
+        offset = (float(x1), float(y1))
+
+    classes = _class_set(target_classes)
     try:
-        results = model.track(frame, persist=True, verbose=False)
-        if not results:
-            return []
-        result = results[0]
+        results = model.track(
+            list(frames),
+            persist=True,
+            verbose=False,
+            classes=target_class_indices(model, classes),
+            imgsz=stride_multiple(imgsz or settings.yolo_imgsz),
+        )
     except Exception as exc:  # pragma: no cover
         logger.warning("yolo.track_failed", reason=str(exc))
-        return []
+        return empty()
+
+    if not results:
+        return empty()
+
+    return [
+        _result_to_frame(
+            results[i],
+            clip_id=clip_id,
+            timestamp_s=timestamps_s[i],
+            frame_width=frame_width,
+            frame_height=frame_height,
+            classes=classes,
+            offset=offset,
+        )
+        if i < len(results)
+        else FrameDetections.empty(clip_id, timestamps_s[i], frame_area=frame_area)
+        for i in range(len(frames))
+    ]
+
+
+def stride_multiple(imgsz: int, stride: int = 32) -> int:
+    """Round an inference size up to the model stride (what Ultralytics would do, minus the warning)."""
+    return max(stride, -(-int(imgsz) // stride) * stride)
+
+
+def parse_roi(spec: str | None) -> tuple[float, float, float, float] | None:
+    """
+    Parse an "x1,y1,x2,y2" region given as fractions of the frame (e.g. "0,0.15,1,0.85").
+    Empty means no ROI.
+    """
+    if not spec or not spec.strip():
+        return None
+    try:
+        x1, y1, x2, y2 = (float(v) for v in spec.split(","))
+    except ValueError as exc:
+        raise ValueError(f"invalid ROI {spec!r}; expected x1,y1,x2,y2 fractions") from exc
+    if not (0.0 <= x1 < x2 <= 1.0 and 0.0 <= y1 < y2 <= 1.0):
+        raise ValueError(f"invalid ROI {spec!r}; need 0 <= x1 < x2 <= 1 and 0 <= y1 < y2 <= 1")
+    return x1, y1, x2, y2
+
+
+def roi_pixels(roi: tuple[float, float, float, float] | None, width: int, height: int) -> tuple[int, int, int, int] | None:
+    """Fractional ROI -> pixel (x1, y1, x2, y2) for a frame size; None when it covers the whole frame."""
+    if roi is None:
+        return None
+    x1, y1 = int(round(roi[0] * width)), int(round(roi[1] * height))
+    x2, y2 = int(round(roi[2] * width)), int(round(roi[3] * height))
+    if (x1, y1, x2, y2) == (0, 0, width, height):
+        return None
+    return x1, y1, x2, y2
+
+
+class AdaptiveResolution:
+    """
+    Per-clip inference size that drops to `low` after `window` consecutive frames
+    with fewer than `min_detections` detections (e.g. empty highway) and returns
+    to `full` as soon as a frame reaches `min_detections` again.
+    """
+
+    def __init__(self, full: int, low: int = 0, *, window: int = 10, min_detections: int = 1):
+        self.full = stride_multiple(full)
+        self.low = stride_multiple(low) if 0 < low < full else self.full
+        self.window = max(1, window)
+        self.min_detections = min_detections
+        self._sparse_frames = 0
+
+    @property
+    def imgsz(self) -> int:
+        return self.low if self._sparse_frames >= self.window else self.full
+
+    def update(self, counts: list[int]) -> None:
+        for count in counts:
+            self._sparse_frames = self._sparse_frames + 1 if count < self.min_detections else 0
+
+
+_DEFAULT_CLASS_SET = frozenset(DEFAULT_TARGET_CLASSES)
+
+
+def _class_set(target_classes: set[str] | None) -> frozenset[str]:
+    return frozenset(target_classes) if target_classes else _DEFAULT_CLASS_SET
+
+
+def _result_to_frame(
+    result: Any,
+    *,
+    clip_id: str,
+    timestamp_s: float,
+    frame_width: int,
+    frame_height: int,
+    classes: frozenset[str],
+    offset: tuple[float, float] = (0.0, 0.0),
+) -> FrameDetections:
+    empty = FrameDetections.empty(clip_id, timestamp_s, frame_area=max(1, frame_width * frame_height))
 
     boxes = getattr(result, "boxes", None)
     if boxes is None:
-        return []
+        return empty
 
     try:
         n = len(boxes)
     except Exception:
-        return []
+        return empty
 
     if n == 0:
-        return []
+        return empty
 
     try:
-        xys = boxes.xywh.cpu().numpy()
+        xywh = boxes.xywh.cpu().numpy()
+        clses = boxes.cls.cpu().numpy()
     except Exception:
-        return []
+        return empty
 
     try:
-        confs = (
-            boxes.conf.cpu().tolist()
-            if getattr(boxes, "conf", None) is not None
-            else [0.0] * n
-        )
+        confs = boxes.conf.cpu().numpy() if getattr(boxes, "conf", None) is not None else np.zeros(n)
     except Exception:
-        confs = [0.0] * n
-
-    try:
-        clses = boxes.cls.cpu().numpy().astype(int)
-    except Exception:
-        return []
+        confs = np.zeros(n)
 
+    ids = np.full(n, -1, dtype=np.int64)
     ids_tensor = getattr(boxes, "id", None)
     if ids_tensor is not None:
         try:
-            ids = ids_tensor.int().cpu().tolist()
+            raw = np.asarray(ids_tensor.int().cpu().numpy()).reshape(-1)[:n]
+            ids[: len(raw)] = raw
         except Exception:
-            ids = [None] * n
-    else:
-        ids = [None] * n
-
-    names = getattr(result, "names", {}) or {}
-
-    detections: list[dict[str, Any]] = []
-    img_area = float(max(1, frame_width * frame_height))
-
-    for i in range(n):
-        cls_idx = int(clses[i])
-        cls_name = names.get(cls_idx, str(cls_idx))
-
-        if cls_name not in classes:
-            continue
-
-        tid = ids[i] if i < len(ids) else None
-        x, y, w, h = xys[i]
-
-        area = float(max(1.0, float(w) * float(h)))
-
-        detections.append(
-            {
-                "clip_id": clip_id,
-                "class": cls_name,
-                "track_id": int(tid) if tid is not None else -1,
-                "t": float(timestamp_s),
-                "xc": float(x),
-                "yc": float(y),
-                "w": float(w),
-                "h": float(h),
-                "conf": float(confs[i]) if i < len(confs) else 0.0,
-                "area": area,
-                "area_ratio": area / img_area,
-            }
-        )
+            pass
+
+    if offset != (0.0, 0.0):
+        xywh = np.asarray(xywh, dtype=np.float64) + np.array([offset[0], offset[1], 0.0, 0.0])
+
+    names = getattr(result, "names", None) or {}
 
-    return detections
\ No newline at end of file
+    return FrameDetections.from_arrays(
+        clip_id=clip_id,
+        t=timestamp_s,
+        xywh=xywh,
+        conf=confs,
+        class_id=clses,
+        track_id=ids,
+        names=names,
+        frame_width=frame_width,
+        frame_height=frame_height,
+        class_mask=class_index_mask(names, classes),
+    )
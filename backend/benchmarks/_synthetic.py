@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+
+import numpy as np
+
+
+def synthetic_frames(
+    count: int,
+    *,
+    width: int = 1280,
+    height: int = 720,
+    objects: int = 12,
+    seed: int = 0,
+) -> Iterator[np.ndarray]:
+    """Yield a deterministic dashcam-like clip: textured road plus moving boxes."""
+    for frame, _ in synthetic_scene(count, width=width, height=height, objects=objects, seed=seed):
+        yield frame
+
+
+def synthetic_scene(
+    count: int,
+    *,
+    width: int = 1280,
+    height: int = 720,
+    objects: int = 12,
+    seed: int = 0,
+    bounce: bool = False,
+    textured: bool = False,
+    pan: Callable[[int], float] | None = None,
+) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """
+    Yield (frame, boxes) where boxes is an (objects, 4) xywh array of ground truth.
+
+    `bounce` reflects objects at the frame edges instead of wrapping them around
+    (no teleports, so track ids can be scored); `textured` fills objects with a
+    fixed noise pattern so optical flow has something to lock on to; `pan(i)`
+    shifts the background horizontally by that many pixels at frame i
+    (simulated camera motion).
+    """
+    rng = np.random.default_rng(seed)
+    background = rng.integers(40, 90, size=(height, width, 3), dtype=np.uint8)
+    background[int(height * 0.55):, :] = 70
+    if pan is not None:
+        background = rng.integers(30, 110, size=(height, width, 3), dtype=np.uint8)
+
+    pos = rng.uniform([0, height * 0.4], [width, height * 0.9], size=(objects, 2))
+    vel = rng.uniform(-6.0, 6.0, size=(objects, 2))
+    size = rng.uniform([40, 30], [160, 110], size=(objects, 2))
+    color = rng.integers(0, 255, size=(objects, 3))
+    textures = [rng.integers(0, 255, size=(int(h) + 1, int(w) + 1, 3), dtype=np.uint8) for w, h in size] if textured else None
+
+    offset = 0.0
+    for i in range(count):
+        if pan is not None:
+            offset += pan(i)
+            frame = np.roll(background, int(round(offset)), axis=1)
+        else:
+            frame = background.copy()
+        if bounce:
+            pos = pos + vel
+            for axis, limit in ((0, width), (1, height)):
+                low, high = size[:, axis] / 2, limit - size[:, axis] / 2
+                out = (pos[:, axis] < low) | (pos[:, axis] > high)
+                vel[out, axis] *= -1
+                pos[:, axis] = np.clip(pos[:, axis], low, high)
+        else:
+            pos = (pos + vel) % [width, height]
+
+        boxes = np.zeros((objects, 4))
+        for j, ((x, y), (w, h), c) in enumerate(zip(pos, size, color)):
+            x1, y1 = int(max(0, x - w / 2)), int(max(0, y - h / 2))
+            x2, y2 = int(min(width, x + w / 2)), int(min(height, y + h / 2))
+            if textures is not None:
+                frame[y1:y2, x1:x2] = textures[j][: y2 - y1, : x2 - x1]
+            else:
+                frame[y1:y2, x1:x2] = c
+            boxes[j] = ((x1 + x2) / 2, (y1 + y2) / 2, x2 - x1, y2 - y1)
+        yield frame, boxes
+
+
+def write_synthetic_clip(path: str, count: int, *, fps: float = 30.0, width: int = 1280, height: int = 720) -> str:
+    import cv2
+
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    try:
+        for frame in synthetic_frames(count, width=width, height=height):
+            writer.write(frame)
+    finally:
+        writer.release()
+    return path
@@ -0,0 +1,93 @@
+"""
+Streaming analytics stage: throughput and peak memory as the clip gets longer.
+
+Feeds synthetic per-frame detections (tracks continuously entering and
+leaving) through `StreamingAnalytics` with counting sinks, so only the stage's
+own state is measured. Peak traced memory should not grow with frame count.
+
+    cd backend && python -m benchmarks.bench_analytics
+"""
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from app.workers.analytics import StreamingAnalytics
+from app.workers.vision.detections import FrameDetections
+
+NAMES = {1: "bicycle", 2: "car", 7: "truck"}
+
+
+def synthetic_detections(frames: int, *, live: int, lifetime: int, seed: int = 0):
+    """Yield FrameDetections with `live` concurrent tracks, each living `lifetime` frames."""
+    rng = np.random.default_rng(seed)
+    births = np.arange(live) * (lifetime // live)
+    ids = np.arange(live)
+    start = rng.uniform(100, 1800, size=(live, 2))
+    vel = rng.uniform(-6, 6, size=(live, 2))
+    cls = rng.choice([1, 2, 2, 2, 7], size=live).astype(float)
+    next_id = live
+    for i in range(frames):
+        expired = i - births >= lifetime
+        for j in np.flatnonzero(expired):
+            births[j], ids[j], next_id = i, next_id, next_id + 1
+            start[j] = rng.uniform(100, 1800, size=2)
+        age = (i - births)[:, None]
+        xy = start + vel * age
+        wh = np.full((live, 2), 80.0) + age
+        yield FrameDetections.from_arrays(
+            clip_id="bench",
+            t=i / 5.0,
+            xywh=np.column_stack([xy, wh]),
+            conf=np.full(live, 0.9),
+            class_id=cls,
+            track_id=ids.copy(),
+            names=NAMES,
+            frame_width=1920,
+            frame_height=1080,
+        )
+
+
+def run(frames: int, *, live: int, lifetime: int) -> dict:
+    counts = {"windows": 0, "tracks": 0, "events": 0}
+
+    def on_window(_window):
+        counts["windows"] += 1
+
+    def on_track(track):
+        counts["tracks"] += 1
+        counts["events"] += len(track["events"])
+
+    stage = StreamingAnalytics(frame_width=1920, on_window=on_window, on_track=on_track)
+    source = synthetic_detections(frames, live=live, lifetime=lifetime)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    for dets in source:
+        stage.update(dets, (1.5, 0.0))
+    stage.close()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"fps": frames / elapsed, "peak_kb": peak / 1024, **counts}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--live", type=int, default=20, help="concurrent tracks per frame")
+    parser.add_argument("--lifetime", type=int, default=200, help="frames each track lives")
+    args = parser.parse_args()
+
+    for frames in (1_000, 10_000, 50_000):
+        r = run(frames, live=args.live, lifetime=args.lifetime)
+        print(
+            f"frames={frames:<7d} fps={r['fps']:8.0f} peak_kb={r['peak_kb']:8.1f} "
+            f"windows={r['windows']:<6d} tracks={r['tracks']:<6d} events={r['events']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
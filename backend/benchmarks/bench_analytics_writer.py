@@ -0,0 +1,111 @@
+"""
+Rows/s persisting analytics output: per-object ORM `add_all` + flush (the
+previous `AnalyticsWriter.flush`) vs the bulk executemany writer.
+
+Uses a fresh SQLite file by default; pass `--url postgresql+psycopg2://...`
+to run against Postgres (tables are created and dropped).
+
+    cd backend && python -m benchmarks.bench_analytics_writer --tracks 20000
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session import Base
+from app.models.entities import AnalyticsWindow, Event, Job, Track
+from app.workers.analytics import AnalyticsWriter
+
+
+def workload(tracks: int):
+    windows = [
+        {
+            "t_start": 5.0 * i, "t_end": 5.0 * i + 5, "active_tracks": 12, "density_index": 0.4,
+            "stopped_ratio": 0.1, "avg_raw_speed": 3.2, "avg_compensated_speed": 1.1, "avg_speed_proxy": 1.1,
+        }
+        for i in range(tracks // 10)
+    ]
+    items = [
+        {
+            "track_id": i, "class": "car", "start_t": 0.5 * i, "end_t": 0.5 * i + 4.0, "detections": 20,
+            "motion": {"samples": 19, "avg_raw_speed": 3.0, "avg_compensated_speed": 1.0},
+            "events": [{"type": "cut_in", "timestamp": 0.5 * i + 1.0, "confidence": 0.6}] * (i % 2),
+        }
+        for i in range(tracks)
+    ]
+    return windows, items
+
+
+class OrmWriter(AnalyticsWriter):
+    """The per-object flush this writer replaced."""
+
+    def flush(self) -> None:
+        windows, tracks = self._windows, self._tracks
+        self._windows, self._tracks = [], []
+        with self.session_factory() as db:
+            db.add_all(AnalyticsWindow(**self._window_row(w)) for w in windows)
+            rows = [Track(**self._track_row(t)) for t in tracks]
+            db.add_all(rows)
+            db.flush()
+            db.add_all(
+                Event(
+                    job_id=self.job_id, clip_id=self.clip_id, track_id=row.id, type=e["type"],
+                    timestamp=e["timestamp"], confidence=e["confidence"],
+                    details_json={"track_id": t["track_id"], "class": t["class"]},
+                )
+                for t, row in zip(tracks, rows)
+                for e in t["events"]
+            )
+            db.commit()
+
+
+def run(label: str, cls, factory, windows, tracks, batch_rows: int) -> None:
+    writer = cls(factory, job_id=1, clip_id="main", batch_rows=batch_rows)
+    writer.clear(0.0, None)
+    writer.flush()
+    start = time.perf_counter()
+    for w in windows:
+        writer.add_window(w)
+    for t in tracks:
+        writer.add_track(t)
+    writer.flush()
+    elapsed = time.perf_counter() - start
+
+    with factory() as db:
+        rows = sum(db.scalar(select(func.count()).select_from(m)) for m in (AnalyticsWindow, Track, Event))
+    print(f"{label:<8} rows={rows:<7d} {elapsed:6.2f} s  {rows / elapsed:9.0f} rows/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tracks", type=int, default=20_000)
+    parser.add_argument("--batch-rows", type=int, default=500)
+    parser.add_argument("--url", default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = create_engine(args.url or f"sqlite:///{Path(tmpdir) / 'bench.db'}")
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        factory = sessionmaker(bind=engine)
+        with factory() as db:
+            db.add(Job(id=1, filename="bench.mp4", storage_key="jobs/raw/bench.mp4"))
+            db.commit()
+
+        windows, tracks = workload(args.tracks)
+        print(f"{engine.dialect.name}: {len(windows)} windows, {len(tracks)} tracks, batch_rows={args.batch_rows}")
+        for label, cls in (("orm", OrmWriter), ("bulk", AnalyticsWriter)):
+            run(label, cls, factory, windows, tracks, args.batch_rows)
+
+        if args.url:
+            Base.metadata.drop_all(engine)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
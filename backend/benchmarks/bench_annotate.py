@@ -0,0 +1,91 @@
+"""
+Preview annotation over a long synthetic run: `annotate_frame` with a
+track-history dict vs the reusable `FrameAnnotator`.
+
+Tracks are continuously replaced by new ids (as in real traffic), so anything
+kept per track id grows with video length unless it is evicted. Reports
+per-frame time (mean / p95) and RSS growth.
+
+    cd backend && python -m benchmarks.bench_annotate --frames 3000
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from app.workers.vision.annotate import FrameAnnotator, annotate_frame
+from app.workers.vision.detections import FrameDetections
+
+WIDTH, HEIGHT = 1920, 1080
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[1])
+    return pages * 4096 / 1e6
+
+
+def detections(frames: int, *, live: int, lifetime: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    pos = rng.uniform([100, 300], [WIDTH - 100, HEIGHT - 100], size=(live, 2))
+    vel = rng.uniform(-5, 5, size=(live, 2))
+    ids = np.arange(live)
+    next_id = live
+    for i in range(frames):
+        respawn = (i + np.arange(live) * (lifetime // live)) % lifetime == 0
+        ids = ids.copy()
+        for j in np.flatnonzero(respawn):
+            ids[j], next_id = next_id, next_id + 1
+        pos = np.clip(pos + vel, 50, [WIDTH - 50, HEIGHT - 50])
+        yield FrameDetections.from_arrays(
+            clip_id="bench",
+            t=i / 5.0,
+            xywh=np.column_stack([pos, np.full((live, 2), 90.0)]),
+            conf=np.full(live, 0.9),
+            class_id=np.full(live, 2),
+            track_id=ids,
+            names={2: "car"},
+            frame_width=WIDTH,
+            frame_height=HEIGHT,
+        )
+
+
+def run(label: str, draw, frames: int, frame: np.ndarray, *, live: int, lifetime: int) -> None:
+    times = []
+    rss_start = None
+    for i, dets in enumerate(detections(frames, live=live, lifetime=lifetime)):
+        start = time.perf_counter()
+        draw(frame, dets)
+        times.append(time.perf_counter() - start)
+        if i == 50:
+            rss_start = rss_mb()
+    ms = np.array(times[50:]) * 1000
+    print(
+        f"{label:<26} mean={ms.mean():6.2f} ms p95={np.percentile(ms, 95):6.2f} ms "
+        f"rss_growth={rss_mb() - rss_start:6.1f} MB"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=3000)
+    parser.add_argument("--live", type=int, default=30)
+    parser.add_argument("--lifetime", type=int, default=60)
+    args = parser.parse_args()
+
+    frame = np.random.default_rng(0).integers(0, 255, size=(HEIGHT, WIDTH, 3), dtype=np.uint8)
+    history: dict = {}
+    configs = [
+        ("annotate_frame", lambda f, d: annotate_frame(f, d, history)),
+        ("FrameAnnotator", FrameAnnotator().draw),
+        ("FrameAnnotator blur@720p", FrameAnnotator(blur_scale=720 / HEIGHT).draw),
+    ]
+    for label, draw in configs:
+        run(label, draw, args.frames, frame, live=args.live, lifetime=args.lifetime)
+    print(f"annotate_frame history entries after run: {len(history)}")
+
+
+if __name__ == "__main__":
+    main()
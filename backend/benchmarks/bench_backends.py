@@ -0,0 +1,75 @@
+"""
+Tracking throughput per inference backend (PyTorch, ONNX Runtime, OpenVINO) on
+the synthetic benchmark clip. Exported models are cached next to the weights
+(or in --export-dir) the same way workers cache them.
+
+    cd backend && python -m benchmarks.bench_backends --weights yolov8n.pt --backends torch,onnx,openvino
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+
+from app.core.config import settings
+from app.workers.vision.frames import iter_sampled_frames
+from app.workers.vision.tracking import clear_model_cache, get_model, reset_tracker, track_batch_columnar
+from benchmarks._synthetic import write_synthetic_clip
+
+
+def run(clip: str, backend: str, weights: str, batch_size: int, fps_sampled: float) -> tuple[int, float]:
+    model = get_model(weights, "cpu", backend=backend)
+    if model is None:
+        raise SystemExit("ultralytics/weights unavailable; cannot benchmark")
+    reset_tracker(model)
+
+    cap = cv2.VideoCapture(clip)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    samples = list(iter_sampled_frames(cap, native_fps=fps, target_fps=fps_sampled))
+    cap.release()
+
+    start = time.perf_counter()
+    for i in range(0, len(samples), batch_size):
+        batch = samples[i:i + batch_size]
+        track_batch_columnar(
+            model,
+            [frame for _, _, frame in batch],
+            clip_id="bench",
+            timestamps_s=[t for _, t, _ in batch],
+            frame_width=width,
+            frame_height=height,
+        )
+    return len(samples), time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--weights", default="yolov8n.pt")
+    parser.add_argument("--backends", default="torch,onnx,openvino")
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--fps-sampled", type=float, default=5.0)
+    parser.add_argument("--batch-size", type=int, default=settings.track_batch_size)
+    parser.add_argument("--intra-op-threads", type=int, default=0)
+    parser.add_argument("--inter-op-threads", type=int, default=0)
+    parser.add_argument("--export-dir", default="")
+    args = parser.parse_args()
+
+    settings.yolo_intra_op_threads = args.intra_op_threads
+    settings.yolo_inter_op_threads = args.inter_op_threads
+    settings.yolo_export_dir = args.export_dir
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        clip = write_synthetic_clip(str(Path(tmpdir) / "clip.mp4"), int(args.seconds * 30))
+        for backend in args.backends.split(","):
+            clear_model_cache()
+            frames, elapsed = run(clip, backend, args.weights, args.batch_size, args.fps_sampled)
+            print(f"{backend:<9} frames={frames:<4d} wall={elapsed:6.2f}s fps={frames / elapsed:6.1f}")
+
+
+if __name__ == "__main__":
+    main()
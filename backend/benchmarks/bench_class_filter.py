@@ -0,0 +1,97 @@
+"""
+NMS + ByteTrack association cost with and without detector-side class filtering.
+
+Feeds a synthetic busy-street detection head (many COCO classes besides
+vehicles/people: lights, signs, bags, benches...) through Ultralytics'
+`non_max_suppression` and `BYTETracker.update`, once keeping every class
+(then dropping non-targets afterwards, as `track_frame` used to) and once
+with `classes=` set to the target class indices.
+
+    cd backend && python -m benchmarks.bench_class_filter --objects 200
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+try:
+    import torch
+    from ultralytics.engine.results import Boxes
+    from ultralytics.trackers.byte_tracker import BYTETracker
+    from ultralytics.utils import YAML, IterableSimpleNamespace
+    from ultralytics.utils.checks import check_yaml
+    from ultralytics.utils.nms import non_max_suppression
+except Exception as exc:  # pragma: no cover
+    raise SystemExit(f"ultralytics/torch unavailable; cannot benchmark ({exc})")
+
+# COCO ids of DEFAULT_TARGET_CLASSES and of "street clutter" classes
+TARGET_IDS = [0, 1, 2, 3, 5, 7]
+CLUTTER_IDS = [9, 11, 12, 13, 24, 26, 28, 56, 58, 60]
+NUM_CLASSES = 80
+ANCHORS = 8400
+SIZE = 640
+
+
+def busy_scene(frames: int, objects: int, target_share: float, seed: int = 0) -> list[torch.Tensor]:
+    """Raw (1, 4 + 80, 8400) head outputs: each object fires on several anchors with jittered boxes."""
+    rng = np.random.default_rng(seed)
+    n_target = int(objects * target_share)
+    cls = np.concatenate([rng.choice(TARGET_IDS, n_target), rng.choice(CLUTTER_IDS, objects - n_target)])
+    pos = rng.uniform(40, SIZE - 40, size=(objects, 2))
+    vel = rng.uniform(-3, 3, size=(objects, 2))
+    wh = rng.uniform(12, 60, size=(objects, 2))
+    anchors_per_obj = 4
+
+    out = []
+    for _ in range(frames):
+        pos = np.clip(pos + vel, 20, SIZE - 20)
+        pred = np.zeros((4 + NUM_CLASSES, ANCHORS), dtype=np.float32)
+        pred[:4] = rng.uniform(0, SIZE, size=(4, ANCHORS))
+        pred[4:] = rng.uniform(0, 0.05, size=(NUM_CLASSES, ANCHORS))
+        slots = rng.choice(ANCHORS, size=objects * anchors_per_obj, replace=False).reshape(objects, anchors_per_obj)
+        for j in range(objects):
+            for k, a in enumerate(slots[j]):
+                pred[0:2, a] = pos[j] + rng.normal(0, 1.5, 2)
+                pred[2:4, a] = wh[j] * rng.uniform(0.95, 1.05, 2)
+                pred[4 + cls[j], a] = 0.9 - 0.1 * k
+        out.append(torch.from_numpy(pred)[None])
+    return out
+
+
+def run(preds: list[torch.Tensor], classes: list[int] | None) -> tuple[float, float, int]:
+    cfg = IterableSimpleNamespace(**YAML.load(check_yaml("bytetrack.yaml")))
+    tracker = BYTETracker(cfg)
+    nms_s = track_s = 0.0
+    kept = 0
+    target = np.array(TARGET_IDS)
+    for pred in preds:
+        start = time.perf_counter()
+        det = non_max_suppression(pred, conf_thres=0.25, iou_thres=0.7, classes=classes, max_det=300)[0]
+        mid = time.perf_counter()
+        tracks = tracker.update(Boxes(det, (SIZE, SIZE)).cpu().numpy())
+        end = time.perf_counter()
+        nms_s += mid - start
+        track_s += end - mid
+        if len(tracks):
+            kept += int(np.isin(tracks[:, 6], target).sum())
+    return nms_s / len(preds) * 1e3, track_s / len(preds) * 1e3, kept
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=150)
+    parser.add_argument("--objects", type=int, default=200)
+    parser.add_argument("--target-share", type=float, default=0.4)
+    args = parser.parse_args()
+
+    preds = busy_scene(args.frames, args.objects, args.target_share)
+
+    for label, classes in (("all classes", None), ("target classes", TARGET_IDS)):
+        nms_ms, track_ms, kept = run(preds, classes)
+        print(f"{label:<15} nms={nms_ms:6.2f} ms/frame  tracker={track_ms:6.2f} ms/frame  target_track_rows={kept}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Decode throughput: `cv2.VideoCapture` + `iter_sampled_frames` vs `FFmpegFrameReader`.
+
+Encodes an H.264 test clip with ffmpeg (keyframe every 2 s, like typical
+dashcam files), then reads it every-frame and sampled, and measures the time to
+the first frame of a chunk that starts late in the clip (seek cost).
+
+    cd backend && python -m benchmarks.bench_decode --seconds 20 --height 1080
+"""
+from __future__ import annotations
+
+import argparse
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+
+from app.workers.vision.decode import iter_ffmpeg_frames
+from app.workers.vision.frames import iter_sampled_frames
+
+FPS = 30.0
+
+
+def write_clip(path: str, seconds: float, width: int, height: int) -> str:
+    subprocess.run(
+        [
+            "ffmpeg", "-y", "-loglevel", "error",
+            "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}:rate={FPS:g}",
+            "-t", f"{seconds}", "-c:v", "libx264", "-preset", "veryfast",
+            "-g", f"{int(2 * FPS)}", "-pix_fmt", "yuv420p", path,
+        ],
+        check=True,
+    )
+    return path
+
+
+def opencv_frames(path: str, **kwargs):
+    cap = cv2.VideoCapture(path)
+    try:
+        if kwargs.get("start_frame"):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, kwargs["start_frame"])
+        yield from iter_sampled_frames(cap, native_fps=FPS, **kwargs)
+    finally:
+        cap.release()
+
+
+def run(label: str, frames, *, first_only: bool = False) -> None:
+    start = time.perf_counter()
+    n = 0
+    for _ in frames:
+        n += 1
+        if first_only:
+            break
+    elapsed = time.perf_counter() - start
+    if first_only:
+        print(f"{label:<34} first frame after {elapsed * 1000:7.1f} ms")
+    else:
+        print(f"{label:<34} frames={n:<5d} {n / elapsed:7.1f} frames/s")
+    if hasattr(frames, "close"):
+        frames.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--fps-sampled", type=float, default=5.0)
+    parser.add_argument("--threads", type=int, default=0, help="ffmpeg decoder threads (0 = auto)")
+    args = parser.parse_args()
+
+    width = args.height * 16 // 9
+    ff = {"width": width, "height": args.height, "native_fps": FPS, "threads": args.threads}
+    late = int(args.seconds * FPS * 0.75)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        clip = write_clip(str(Path(tmpdir) / "clip.mp4"), args.seconds, width, args.height)
+
+        for label, target in (("all frames", None), (f"sampled@{args.fps_sampled:g}", args.fps_sampled)):
+            run(f"opencv  {label}", opencv_frames(clip, target_fps=target))
+            run(f"ffmpeg  {label}", iter_ffmpeg_frames(clip, target_fps=target, **ff))
+        run(
+            f"ffmpeg  sampled@{args.fps_sampled:g} scaled to 720p",
+            iter_ffmpeg_frames(clip, target_fps=args.fps_sampled, size=(1280, 720), **ff),
+        )
+        run(
+            f"ffmpeg  sampled@{args.fps_sampled:g} ring buffer",
+            iter_ffmpeg_frames(clip, target_fps=args.fps_sampled, buffers=8, **ff),
+        )
+        run(f"opencv  seek to frame {late}", opencv_frames(clip, target_fps=None, start_frame=late), first_only=True)
+        run(f"ffmpeg  seek to frame {late}", iter_ffmpeg_frames(clip, start_frame=late, **ff), first_only=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Per-frame cost of turning a tracker result into detections: the original
+per-box dict loop vs the columnar `FrameDetections` path (and its dict adapter).
+
+    cd backend && python -m benchmarks.bench_detections --boxes 50,200,500
+"""
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from app.workers.vision.tracking import DEFAULT_TARGET_CLASSES, _class_set, _result_to_frame
+
+# COCO-sized class table; only a handful are target classes
+NAMES = {i: f"class{i}" for i in range(80)}
+NAMES.update({0: "person", 1: "bicycle", 2: "car", 3: "motorcycle", 5: "bus", 7: "truck"})
+
+
+class _Tensor:
+    def __init__(self, values: np.ndarray):
+        self._values = values
+
+    def cpu(self):
+        return self
+
+    def int(self):
+        return _Tensor(self._values.astype(np.int32))
+
+    def numpy(self):
+        return self._values
+
+    def tolist(self):
+        return self._values.tolist()
+
+
+class _Boxes:
+    def __init__(self, n: int, rng: np.random.Generator):
+        self.xywh = _Tensor(rng.uniform(10, 600, size=(n, 4)).astype(np.float32))
+        self.conf = _Tensor(rng.uniform(0.25, 1.0, size=n).astype(np.float32))
+        # ~75% of boxes belong to target classes
+        self.cls = _Tensor(rng.choice([0, 1, 2, 2, 2, 3, 5, 7, 9, 11, 13, 56], size=n).astype(np.float32))
+        self.id = _Tensor(np.arange(1, n + 1, dtype=np.float32))
+        self._n = n
+
+    def __len__(self):
+        return self._n
+
+
+class _Result:
+    def __init__(self, n: int, rng: np.random.Generator):
+        self.boxes = _Boxes(n, rng)
+        self.names = NAMES
+
+
+def legacy_result_to_detections(result, *, clip_id, timestamp_s, frame_width, frame_height, classes):
+    """The per-detection dict loop `track_frame` used before `FrameDetections`."""
+    boxes = result.boxes
+    n = len(boxes)
+    xys = boxes.xywh.cpu().numpy()
+    confs = boxes.conf.cpu().tolist()
+    clses = boxes.cls.cpu().numpy().astype(int)
+    ids = boxes.id.int().cpu().tolist()
+    names = result.names
+    img_area = float(max(1, frame_width * frame_height))
+    detections = []
+    for i in range(n):
+        cls_idx = int(clses[i])
+        cls_name = names.get(cls_idx, str(cls_idx))
+        if cls_name not in classes:
+            continue
+        x, y, w, h = xys[i]
+        area = float(max(1.0, float(w) * float(h)))
+        detections.append(
+            {
+                "clip_id": clip_id,
+                "class": cls_name,
+                "track_id": int(ids[i]),
+                "t": float(timestamp_s),
+                "xc": float(x),
+                "yc": float(y),
+                "w": float(w),
+                "h": float(h),
+                "conf": float(confs[i]),
+                "area": area,
+                "area_ratio": area / img_area,
+            }
+        )
+    return detections
+
+
+def measure(fn, results) -> tuple[float, float]:
+    """Return (microseconds per frame, peak KiB allocated per frame)."""
+    start = time.perf_counter()
+    for r in results:
+        fn(r)
+    per_frame_us = (time.perf_counter() - start) / len(results) * 1e6
+
+    tracemalloc.start()
+    peak = 0
+    for r in results[:50]:
+        tracemalloc.reset_peak()
+        out = fn(r)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        del out
+    tracemalloc.stop()
+    return per_frame_us, peak / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--boxes", default="50,200,500")
+    parser.add_argument("--frames", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    kwargs = {"clip_id": "bench", "timestamp_s": 1.0, "frame_width": 1280, "frame_height": 720}
+    classes = _class_set(None)
+
+    paths = {
+        "legacy dicts": lambda r: legacy_result_to_detections(r, classes=DEFAULT_TARGET_CLASSES, **kwargs),
+        "columnar": lambda r: _result_to_frame(r, classes=classes, **kwargs),
+        "columnar+to_dicts": lambda r: _result_to_frame(r, classes=classes, **kwargs).to_dicts(),
+    }
+
+    for n in (int(b) for b in args.boxes.split(",")):
+        results = [_Result(n, rng) for _ in range(args.frames)]
+        for label, fn in paths.items():
+            us, kib = measure(fn, results)
+            print(f"boxes={n:<4d} {label:<18} {us:8.1f} us/frame  peak={kib:7.1f} KiB/frame")
+
+
+if __name__ == "__main__":
+    main()
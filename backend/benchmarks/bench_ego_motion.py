@@ -0,0 +1,110 @@
+"""
+Global-motion estimation: pairwise `estimate_global_motion` vs the stateful
+`EgoMotionEstimator`, on synthetic frames with a known camera shift.
+
+The background is a smooth texture shifted by a sub-pixel random walk; textured
+"vehicles" move independently on top of it, so unmasked estimators get pulled
+towards traffic motion when it covers enough of the frame.
+
+    cd backend && python -m benchmarks.bench_ego_motion
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from app.ml.ego_motion import EgoMotionEstimator, estimate_global_motion
+
+WIDTH, HEIGHT = 1280, 720
+
+
+def shifted_scene(count: int, *, objects: int, seed: int = 0):
+    """Yield (frame, true (dx, dy) since previous frame, vehicle boxes xywh)."""
+    rng = np.random.default_rng(seed)
+    pad = 200
+    noise = rng.integers(0, 255, size=((HEIGHT + 2 * pad) // 8, (WIDTH + 2 * pad) // 8), dtype=np.uint8)
+    world = cv2.GaussianBlur(cv2.resize(noise, (WIDTH + 2 * pad, HEIGHT + 2 * pad), interpolation=cv2.INTER_NEAREST), (7, 7), 0)
+    world = cv2.cvtColor(world, cv2.COLOR_GRAY2BGR)
+
+    pos = rng.uniform([200, 250], [WIDTH - 200, HEIGHT - 150], size=(objects, 2))
+    vel = rng.uniform(-8.0, 8.0, size=(objects, 2))
+    size = rng.uniform([120, 80], [320, 200], size=(objects, 2))
+    textures = [rng.integers(0, 255, size=(int(h) + 1, int(w) + 1, 3), dtype=np.uint8) for w, h in size]
+    textures = [cv2.GaussianBlur(cv2.resize(t[::6, ::6], (t.shape[1], t.shape[0]), interpolation=cv2.INTER_NEAREST), (5, 5), 0) for t in textures]
+
+    offset = np.zeros(2)
+    step = np.zeros(2)
+    for i in range(count):
+        prev_offset = offset
+        if i:
+            # random-walk velocity, pulled back towards the centre of the padded world
+            step = np.clip(step + rng.normal(0, 1.5, 2) - 0.02 * offset, -12, 12)
+            offset = np.clip(offset + step, -pad + 1, pad - 1)
+            pos = np.clip(pos + vel, size / 2, [WIDTH, HEIGHT] - size / 2)
+        M = np.float32([[1, 0, -pad + offset[0]], [0, 1, -pad + offset[1]]])
+        frame = cv2.warpAffine(world, M, (WIDTH, HEIGHT), flags=cv2.INTER_LINEAR)
+
+        boxes = np.zeros((objects, 4), dtype=np.float32)
+        for j, ((x, y), (w, h)) in enumerate(zip(pos, size)):
+            x1, y1 = int(x - w / 2), int(y - h / 2)
+            x2, y2 = x1 + int(w), y1 + int(h)
+            frame[y1:y2, x1:x2] = textures[j][: y2 - y1, : x2 - x1]
+            boxes[j] = ((x1 + x2) / 2, (y1 + y2) / 2, x2 - x1, y2 - y1)
+        delta = offset - prev_offset
+        yield frame, (float(delta[0]), float(delta[1])), boxes
+
+
+def run(scene, estimate) -> tuple[float, float]:
+    errors = []
+    start = time.perf_counter()
+    for i, (frame, truth, boxes) in enumerate(scene):
+        dx, dy = estimate(frame, boxes)
+        if i:
+            errors.append(np.hypot(dx - truth[0], dy - truth[1]))
+    elapsed = time.perf_counter() - start
+    return len(scene) / elapsed, float(np.mean(errors))
+
+
+def pairwise():
+    prev = None
+
+    def estimate(frame, boxes):
+        nonlocal prev
+        motion = estimate_global_motion(prev, frame) if prev is not None else (0.0, 0.0)
+        prev = frame
+        return motion
+
+    return estimate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=120)
+    args = parser.parse_args()
+
+    for objects in (3, 8):
+        scene = list(shifted_scene(args.frames, objects=objects))
+        stateful = {
+            "estimator w=640": EgoMotionEstimator(width=640),
+            "estimator w=320": EgoMotionEstimator(width=320),
+            "estimator w=320 masked": EgoMotionEstimator(width=320),
+        }
+        rows = [("pairwise full-res", pairwise())]
+        for label, estimator in stateful.items():
+            masked = label.endswith("masked")
+            rows.append((label, lambda f, b, e=estimator, m=masked: e.update(f, b if m else None)))
+
+        print(f"-- {objects} vehicles, {len(scene)} frames {WIDTH}x{HEIGHT}")
+        for label, estimate in rows:
+            rate, error = run(scene, estimate)
+            redetect = ""
+            if label in stateful:
+                redetect = f" redetections={stateful[label].redetections}"
+            print(f"{label:<24} estimates/s={rate:7.1f} mean_error_px={error:6.2f}{redetect}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Decode (and optionally decode+track) cost of reading every frame vs sampling at FPS_SAMPLED.
+
+    cd backend && python -m benchmarks.bench_frame_sampling --seconds 10 [--weights yolov8n.pt]
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+
+from app.workers.vision.frames import iter_sampled_frames
+from app.workers.vision.tracking import load_yolo_model, track_frame
+from benchmarks._synthetic import write_synthetic_clip
+
+
+def run(path: str, target_fps: float | None, model) -> tuple[int, float]:
+    cap = cv2.VideoCapture(path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+    frames = 0
+    start = time.perf_counter()
+    for _, t, frame in iter_sampled_frames(cap, native_fps=fps, target_fps=target_fps):
+        if model is not None:
+            track_frame(model, frame, clip_id="bench", timestamp_s=t, frame_width=width, frame_height=height)
+        frames += 1
+    elapsed = time.perf_counter() - start
+    cap.release()
+    return frames, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--native-fps", type=float, default=30.0)
+    parser.add_argument("--fps-sampled", type=float, default=5.0)
+    parser.add_argument("--weights", default=None, help="also run YOLO tracking on each kept frame")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        clip = write_synthetic_clip(
+            str(Path(tmpdir) / "clip.mp4"),
+            int(args.seconds * args.native_fps),
+            fps=args.native_fps,
+        )
+
+        results = {}
+        for label, target in (("all frames", None), (f"sampled@{args.fps_sampled:g}", args.fps_sampled)):
+            model = load_yolo_model(args.weights) if args.weights else None
+            frames, elapsed = run(clip, target, model)
+            results[label] = elapsed
+            print(f"{label:<14} frames={frames:<5d} wall={elapsed:.2f}s")
+
+        base, sampled = results.values()
+        print(f"speedup={base / max(sampled, 1e-9):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
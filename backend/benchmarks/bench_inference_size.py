@@ -0,0 +1,78 @@
+"""
+Tracking throughput for inference size, static ROI crop and adaptive resolution
+on a synthetic 1080p clip.
+
+    cd backend && python -m benchmarks.bench_inference_size --weights yolov8n.pt
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from app.workers.vision.tracking import (
+    AdaptiveResolution,
+    get_model,
+    parse_roi,
+    reset_tracker,
+    roi_pixels,
+    track_batch_columnar,
+)
+from benchmarks._synthetic import synthetic_frames
+
+WIDTH, HEIGHT = 1920, 1080
+
+
+def run(model, frames, *, imgsz: int, roi: str, adaptive_min: int, batch_size: int) -> tuple[float, float]:
+    reset_tracker(model)
+    pixels = roi_pixels(parse_roi(roi), WIDTH, HEIGHT)
+    resolution = AdaptiveResolution(imgsz, adaptive_min, window=10)
+    detections = 0
+
+    start = time.perf_counter()
+    for i in range(0, len(frames), batch_size):
+        batch = frames[i:i + batch_size]
+        dets = track_batch_columnar(
+            model,
+            batch,
+            clip_id="bench",
+            timestamps_s=[(i + j) / 5.0 for j in range(len(batch))],
+            frame_width=WIDTH,
+            frame_height=HEIGHT,
+            imgsz=resolution.imgsz,
+            roi=pixels,
+        )
+        resolution.update([len(d) for d in dets])
+        detections += sum(len(d) for d in dets)
+    elapsed = time.perf_counter() - start
+    return len(frames) / elapsed, detections / len(frames)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--weights", default="yolov8n.pt")
+    parser.add_argument("--backend", default="torch")
+    parser.add_argument("--frames", type=int, default=96)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--roi", default="0,0.15,1,0.8", help="hood/sky crop used for the ROI rows")
+    args = parser.parse_args()
+
+    model = get_model(args.weights, "cpu", backend=args.backend)
+    if model is None:
+        raise SystemExit("ultralytics/weights unavailable; cannot benchmark")
+    frames = list(synthetic_frames(args.frames, width=WIDTH, height=HEIGHT))
+
+    configs = [
+        ("imgsz=640", 640, "", 0),
+        ("imgsz=480", 480, "", 0),
+        ("imgsz=320", 320, "", 0),
+        ("imgsz=640 roi", 640, args.roi, 0),
+        ("adaptive 640->320", 640, "", 320),
+        ("adaptive 640->320 roi", 640, args.roi, 320),
+    ]
+    for label, imgsz, roi, adaptive_min in configs:
+        fps, per_frame = run(model, frames, imgsz=imgsz, roi=roi, adaptive_min=adaptive_min, batch_size=args.batch_size)
+        print(f"{label:<22} fps={fps:6.1f} detections/frame={per_frame:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
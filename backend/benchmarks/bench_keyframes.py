@@ -0,0 +1,174 @@
+"""
+Keyframe-skipping detection vs running the detector on every frame.
+
+The synthetic scene has ground-truth boxes, so track-id switches can be
+scored. Detector cost is real (a YOLO forward pass on every frame it sees);
+its boxes come from the ground truth (jittered) and go through Ultralytics'
+ByteTrack, so association behaves like production even with untrained weights.
+
+    cd backend && python -m benchmarks.bench_keyframes --weights yolov8n.pt
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import time
+
+import numpy as np
+
+try:
+    from ultralytics.engine.results import Boxes
+    from ultralytics.trackers.byte_tracker import BYTETracker
+    from ultralytics.utils import YAML, IterableSimpleNamespace
+    from ultralytics.utils.checks import check_yaml
+except Exception as exc:  # pragma: no cover
+    raise SystemExit(f"ultralytics unavailable; cannot benchmark ({exc})")
+
+from app.workers.chunking import box_iou
+from app.workers.vision.keyframes import KeyframeTracker
+from app.workers.vision.tracking import load_yolo_model, track_batch_columnar
+from benchmarks._synthetic import synthetic_scene
+
+WIDTH, HEIGHT = 1280, 720
+
+
+class _Array:
+    def __init__(self, values):
+        self._values = np.asarray(values)
+
+    def cpu(self):
+        return self
+
+    def int(self):
+        return _Array(self._values.astype(np.int64))
+
+    def numpy(self):
+        return self._values
+
+
+class _Boxes:
+    def __init__(self, tracks: np.ndarray):
+        xyxy = tracks[:, :4]
+        self.xywh = _Array(np.column_stack([(xyxy[:, 0] + xyxy[:, 2]) / 2, (xyxy[:, 1] + xyxy[:, 3]) / 2, xyxy[:, 2] - xyxy[:, 0], xyxy[:, 3] - xyxy[:, 1]]))
+        self.id = _Array(tracks[:, 4])
+        self.conf = _Array(tracks[:, 5])
+        self.cls = _Array(tracks[:, 6])
+        self._n = len(tracks)
+
+    def __len__(self):
+        return self._n
+
+
+class _Result:
+    names = {2: "car"}
+
+    def __init__(self, tracks: np.ndarray):
+        self.boxes = _Boxes(tracks)
+
+
+class OracleModel:
+    """Real detector forward pass for timing; ground-truth boxes + real ByteTrack for ids."""
+
+    def __init__(self, detector, truth: dict[int, np.ndarray], seed: int = 0):
+        self.detector = detector
+        self.truth = truth
+        self.tracker = BYTETracker(IterableSimpleNamespace(**YAML.load(check_yaml("bytetrack.yaml"))))
+        self.rng = np.random.default_rng(seed)
+
+    def track(self, frames, **kwargs):
+        if self.detector is not None:
+            self.detector.predict(list(frames), verbose=False, imgsz=kwargs.get("imgsz", 640))
+        results = []
+        for frame in frames:
+            gt = self.truth[id(frame)]
+            jitter = self.rng.normal(0, 1.5, size=gt.shape)
+            xywh = gt + jitter
+            xyxy = np.column_stack([xywh[:, 0] - xywh[:, 2] / 2, xywh[:, 1] - xywh[:, 3] / 2, xywh[:, 0] + xywh[:, 2] / 2, xywh[:, 1] + xywh[:, 3] / 2])
+            dets = np.column_stack([xyxy, np.full(len(gt), 0.9), np.full(len(gt), 2.0)])
+            tracks = self.tracker.update(Boxes(dets, (HEIGHT, WIDTH)).cpu().numpy())
+            results.append(_Result(tracks if len(tracks) else np.zeros((0, 8))))
+        return results
+
+
+def id_switches(outputs, truth_seq, min_iou: float = 0.3) -> tuple[int, float]:
+    """(id switches, fraction of ground-truth boxes covered by an output box)."""
+    last_id: dict[int, int] = {}
+    switches = matched = total = 0
+    for dets, gt in zip(outputs, truth_seq):
+        boxes = np.column_stack([dets.xc, dets.yc, dets.w, dets.h]) if len(dets) else np.zeros((0, 4))
+        used: set[int] = set()
+        for j, g in enumerate(gt):
+            total += 1
+            best, best_iou = None, min_iou
+            for k, b in enumerate(boxes):
+                if k in used:
+                    continue
+                iou = box_iou(list(g), list(b))
+                if iou >= best_iou:
+                    best, best_iou = k, iou
+            if best is None:
+                continue
+            used.add(best)
+            matched += 1
+            tid = int(dets.track_id[best])
+            if j in last_id and last_id[j] != tid:
+                switches += 1
+            last_id[j] = tid
+    return switches, matched / max(1, total)
+
+
+def run(detector, frames, truth_seq, *, k_max: int, k_min: int, batch_size: int) -> dict:
+    truth = {id(f): g for f, g in zip(frames, truth_seq)}
+    model = OracleModel(detector, truth)
+
+    def detect(batch, timestamps):
+        return track_batch_columnar(
+            model, batch, clip_id="bench", timestamps_s=timestamps, frame_width=WIDTH, frame_height=HEIGHT
+        )
+
+    keyframes = KeyframeTracker(detect, k_max=k_max, k_min=k_min) if k_max > 1 else None
+    outputs = []
+    start = time.perf_counter()
+    for i in range(0, len(frames), batch_size):
+        batch = frames[i:i + batch_size]
+        times = [(i + j) / 5.0 for j in range(len(batch))]
+        outputs.extend(keyframes.process(batch, times) if keyframes else detect(batch, times))
+    elapsed = time.perf_counter() - start
+
+    switches, coverage = id_switches(outputs, truth_seq)
+    return {
+        "fps": len(frames) / elapsed,
+        "detector_frames": keyframes.detector_frames if keyframes else len(frames),
+        "id_switches": switches,
+        "coverage": coverage,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--weights", default="yolov8n.pt", help="detector used for timing ('none' to skip)")
+    parser.add_argument("--frames", type=int, default=150)
+    parser.add_argument("--objects", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=8)
+    args = parser.parse_args()
+
+    detector = None if args.weights == "none" else load_yolo_model(args.weights)
+
+    # camera pans in bursts: still, then a turn, then still again
+    def pan(i: int) -> float:
+        return 18.0 * max(0.0, math.sin(i / 12.0)) ** 4
+
+    scene = list(synthetic_scene(args.frames, width=WIDTH, height=HEIGHT, objects=args.objects, bounce=True, textured=True, pan=pan))
+    frames = [f for f, _ in scene]
+    truth_seq = [g for _, g in scene]
+
+    for label, k_max, k_min in (("every frame", 1, 1), ("K=2", 2, 2), ("K=3", 3, 3), ("adaptive K 1..3", 3, 1), ("adaptive K 1..4", 4, 1)):
+        r = run(detector, frames, truth_seq, k_max=k_max, k_min=k_min, batch_size=args.batch_size)
+        print(
+            f"{label:<16} fps={r['fps']:6.1f} detector_frames={r['detector_frames']:<4d} "
+            f"id_switches={r['id_switches']:<3d} coverage={r['coverage']:.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
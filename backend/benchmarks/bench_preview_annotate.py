@@ -0,0 +1,87 @@
+"""
+Preview annotation cost on 4K input, per frame that reaches the encoder.
+
+The 4K -> 720p INTER_AREA downscale is paid either way (the encoder needs
+720p frames), so the annotation overhead is reported on top of it.
+
+"full-res" is the opt-in path: annotate the 3840x2160 frame (blur already at
+preview scale) and let the encoder downscale it. "preview-res" resizes to the
+720p preview first and draws scaled detections there.
+
+    cd backend && python -m benchmarks.bench_preview_annotate --frames 300
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from app.workers.vision.annotate import FrameAnnotator
+from app.workers.vision.detections import FrameDetections
+from app.workers.vision.encode import preview_size
+
+WIDTH, HEIGHT = 3840, 2160
+
+
+def detections(frames: int, *, live: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    pos = rng.uniform([200, 600], [WIDTH - 200, HEIGHT - 200], size=(live, 2))
+    vel = rng.uniform(-10, 10, size=(live, 2))
+    for i in range(frames):
+        pos = np.clip(pos + vel, 100, [WIDTH - 100, HEIGHT - 100])
+        yield FrameDetections.from_arrays(
+            clip_id="bench",
+            t=i / 5.0,
+            xywh=np.column_stack([pos, np.full((live, 2), 180.0)]),
+            conf=np.full(live, 0.9),
+            class_id=np.full(live, 2),
+            track_id=np.arange(live),
+            names={2: "car"},
+            frame_width=WIDTH,
+            frame_height=HEIGHT,
+        )
+
+
+def run(label: str, render, frames: int, frame: np.ndarray, *, live: int) -> float:
+    times = []
+    for dets in detections(frames, live=live):
+        start = time.perf_counter()
+        render(frame, dets)
+        times.append(time.perf_counter() - start)
+    ms = np.array(times[10:]) * 1000
+    print(f"{label:<12} mean={ms.mean():7.2f} ms p95={np.percentile(ms, 95):7.2f} ms")
+    return float(ms.mean())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--live", type=int, default=30)
+    args = parser.parse_args()
+
+    size = preview_size(WIDTH, HEIGHT)
+    frame = np.random.default_rng(0).integers(0, 255, size=(HEIGHT, WIDTH, 3), dtype=np.uint8)
+    full = FrameAnnotator(blur_scale=size[1] / HEIGHT)
+    preview = FrameAnnotator(output_size=size, src_size=(WIDTH, HEIGHT))
+
+    def full_res(f, d):
+        # what PreviewEncoder.write does with a full-resolution frame
+        return cv2.resize(full.draw(f, d), size, interpolation=cv2.INTER_AREA)
+
+    out = np.empty((size[1], size[0], 3), dtype=np.uint8)
+    def resize_only(f, d):
+        return cv2.resize(f, size, dst=out, interpolation=cv2.INTER_AREA)
+
+    base = run("resize only", resize_only, args.frames, frame, live=args.live)
+    slow = run("full-res", full_res, args.frames, frame, live=args.live)
+    fast = run("preview-res", preview.draw, args.frames, frame, live=args.live)
+    print(
+        f"annotation overhead: full-res={slow - base:.2f} ms preview-res={fast - base:.2f} ms "
+        f"({(slow - base) / max(fast - base, 1e-3):.1f}x); end to end {slow / fast:.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
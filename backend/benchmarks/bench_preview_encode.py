@@ -0,0 +1,87 @@
+"""
+Preview encoding: mp4v intermediate + ffmpeg re-encode vs streaming frames into ffmpeg.
+
+Reports wall time and peak temp-dir size for each path.
+
+    cd backend && python -m benchmarks.bench_preview_encode --frames 300 --width 1920 --height 1080
+"""
+from __future__ import annotations
+
+import argparse
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import cv2
+
+from app.workers.vision.encode import PreviewEncoder
+from benchmarks._synthetic import synthetic_frames
+
+
+class _DirSizeSampler(threading.Thread):
+    def __init__(self, path: Path):
+        super().__init__(daemon=True)
+        self.path = path
+        self.peak = 0
+        self._done = threading.Event()
+
+    def run(self) -> None:
+        while not self._done.is_set():
+            size = sum(p.stat().st_size for p in self.path.glob("*") if p.is_file())
+            self.peak = max(self.peak, size)
+            time.sleep(0.02)
+
+    def stop(self) -> int:
+        self._done.set()
+        self.join()
+        return self.peak
+
+
+def legacy(tmpdir: Path, frames: list, fps: float) -> None:
+    h, w = frames[0].shape[:2]
+    raw = tmpdir / "annotated_raw.mp4"
+    writer = cv2.VideoWriter(str(raw), cv2.VideoWriter_fourcc(*"mp4v"), fps, (w, h))
+    for frame in frames:
+        writer.write(frame)
+    writer.release()
+    subprocess.run(
+        [
+            "ffmpeg", "-y", "-loglevel", "error", "-i", str(raw), "-vf", "scale=-2:720,fps=15",
+            "-c:v", "libx264", "-preset", "veryfast", "-b:v", "2200k", "-movflags", "+faststart",
+            "-an", str(tmpdir / "preview_tracking.mp4"),
+        ],
+        check=True,
+    )
+
+
+def streaming(tmpdir: Path, frames: list, fps: float) -> None:
+    h, w = frames[0].shape[:2]
+    with PreviewEncoder(str(tmpdir / "preview_tracking.mp4"), src_width=w, src_height=h, src_fps=fps) as enc:
+        for frame in frames:
+            enc.write(frame)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    args = parser.parse_args()
+
+    frames = list(synthetic_frames(args.frames, width=args.width, height=args.height))
+    for name, fn in (("mp4v+reencode", legacy), ("streaming", streaming)):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            sampler = _DirSizeSampler(Path(tmpdir))
+            sampler.start()
+            start = time.perf_counter()
+            fn(Path(tmpdir), frames, args.fps)
+            elapsed = time.perf_counter() - start
+            peak = sampler.stop()
+        print(f"{name:<14} wall={elapsed:.2f}s peak_tmp={peak / 1e6:.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Latency of GET /jobs/{id}/events on a job with many events: the previous
+handler (all rows as ORM objects through `EventOut`) vs keyset pages with a
+column projection, on SQLite.
+
+"before" runs without the composite indexes, "after" with them (migration
+0006). Pages start at random depths via their cursor, as a client paging
+through a long job would.
+
+    cd backend && python -m benchmarks.bench_results_api --events 500000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert, select, text
+from sqlalchemy.orm import sessionmaker
+
+from app.api.routes import events
+from app.db.session import Base
+from app.models.entities import Event, Job, Organization
+from app.schemas.api import EventOut
+from app.services.auth import AuthContext
+
+AUTH = AuthContext(user_id=1, org_id=1, auth_type="jwt")
+INDEXES = ("ix_events_job_timestamp", "ix_events_job_clip_timestamp")
+
+
+def populate(factory, n: int) -> None:
+    rng = np.random.default_rng(0)
+    with factory() as db:
+        db.add(Organization(id=1, name="Org"))
+        for job_id in (1, 2):
+            db.add(Job(id=job_id, org_id=1, filename="drive.mp4", storage_key=f"jobs/raw/{job_id}.mp4"))
+        db.commit()
+        # the measured job plus an equally large neighbour sharing the table
+        for job_id in (1, 2):
+            t = np.sort(rng.uniform(0, 3600, n))
+            rows = [
+                {
+                    "job_id": job_id, "clip_id": f"clip{i % 4}", "track_id": None, "type": "cut_in",
+                    "timestamp": float(ts), "confidence": 0.7, "details_json": {"track_id": i, "class": "car"},
+                }
+                for i, ts in enumerate(t)
+            ]
+            for start in range(0, n, 50_000):
+                db.execute(insert(Event.__table__), rows[start:start + 50_000])
+        db.commit()
+
+
+def legacy(db, job_id: int) -> bytes:
+    rows = db.scalars(select(Event).where(Event.job_id == job_id).order_by(Event.timestamp)).all()
+    return TypeAdapter(list[EventOut]).dump_json(rows)
+
+
+def timed(label: str, fn, runs: int) -> None:
+    ms = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        ms.append((time.perf_counter() - start) * 1000)
+    ms = np.array(ms)
+    print(f"{label:<44} runs={runs:<4d} p50={np.percentile(ms, 50):9.1f} ms p99={np.percentile(ms, 99):9.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=500_000)
+    parser.add_argument("--page", type=int, default=500)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--legacy-runs", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = create_engine(f"sqlite:///{Path(tmpdir) / 'bench.db'}")
+        Base.metadata.create_all(engine)
+        factory = sessionmaker(bind=engine)
+        populate(factory, args.events)
+
+        with factory() as db:
+            keys = db.execute(select(Event.timestamp, Event.id).where(Event.job_id == 1)).all()
+            for name in INDEXES:
+                db.execute(text(f"DROP INDEX {name}"))
+            db.commit()
+
+            rng = random.Random(0)
+
+            def page(fields=None, clip_id=None):
+                ts, row_id = rng.choice(keys)
+                return events(
+                    1, clip_id=clip_id, fields=fields, t_from=None, t_to=None, cursor=f"{ts!r}:{row_id}",
+                    limit=args.page, db=db, auth=AUTH,
+                )
+
+            print(f"job with {args.events} events, page={args.page}")
+            timed("before: full list, ORM + EventOut", lambda: legacy(db, 1), args.legacy_runs)
+            timed("before indexes: keyset page, all fields", page, args.runs)
+
+            for name, cols in (
+                ("ix_events_job_timestamp", "job_id, timestamp, id"),
+                ("ix_events_job_clip_timestamp", "job_id, clip_id, timestamp, id"),
+            ):
+                db.execute(text(f"CREATE INDEX {name} ON events ({cols})"))
+            db.commit()
+
+            timed("after: keyset page, all fields", page, args.runs)
+            timed("after: keyset page, fields=id,type,timestamp", lambda: page("id,type,timestamp"), args.runs)
+            timed("after: keyset page, clip_id filter", lambda: page(clip_id="clip1"), args.runs)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Throughput of per-frame vs batched YOLO tracking.
+
+    cd backend && python -m benchmarks.bench_track_batch --weights yolov8n.pt
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from app.workers.vision.tracking import load_yolo_model, track_batch
+from benchmarks._synthetic import synthetic_frames
+
+
+def run(weights: str, batch_size: int, frames: list) -> float:
+    model = load_yolo_model(weights)
+    if model is None:
+        raise SystemExit("ultralytics/weights unavailable; cannot benchmark")
+
+    # warm-up outside the timed region
+    track_batch(model, frames[:1], clip_id="bench", timestamps_s=[0.0], frame_width=1, frame_height=1)
+
+    h, w = frames[0].shape[:2]
+    start = time.perf_counter()
+    for i in range(0, len(frames), batch_size):
+        chunk = frames[i:i + batch_size]
+        track_batch(
+            model,
+            chunk,
+            clip_id="bench",
+            timestamps_s=[(i + j) / 30.0 for j in range(len(chunk))],
+            frame_width=w,
+            frame_height=h,
+        )
+    return len(frames) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--weights", default="yolov8n.pt")
+    parser.add_argument("--frames", type=int, default=160)
+    parser.add_argument("--batch-sizes", default="1,4,8,16")
+    args = parser.parse_args()
+
+    frames = list(synthetic_frames(args.frames))
+    for bs in (int(b) for b in args.batch_sizes.split(",")):
+        print(f"batch_size={bs:<3d} fps={run(args.weights, bs, frames):.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Peak RSS of the upload path: read-whole-file (old) vs chunked multipart streaming.
+
+Object storage is replaced by a sink that discards parts, so only the API
+process's own buffering is measured. Each mode runs in a fresh subprocess.
+
+    cd backend && python -m benchmarks.bench_upload_memory --mb 512
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+
+class _SinkS3:
+    def list_buckets(self):
+        from app.core.config import settings
+
+        return {"Buckets": [{"Name": settings.s3_bucket}]}
+
+    def create_multipart_upload(self, **_kwargs):
+        return {"UploadId": "bench"}
+
+    def upload_part(self, **_kwargs):
+        return {"ETag": "etag"}
+
+    def upload_fileobj(self, fileobj, *_args, **_kwargs):
+        while fileobj.read(8 * 1024 * 1024):
+            pass
+
+    def complete_multipart_upload(self, **_kwargs):
+        pass
+
+    def abort_multipart_upload(self, **_kwargs):
+        pass
+
+    def copy(self, *_args, **_kwargs):
+        pass
+
+    def delete_object(self, **_kwargs):
+        pass
+
+
+class _DiskUploadFile:
+    """Stands in for Starlette's UploadFile, which spools large bodies to disk."""
+
+    def __init__(self, path: str):
+        self._f = open(path, "rb")
+        self.content_type = "video/mp4"
+
+    async def read(self, size: int = -1) -> bytes:
+        return self._f.read(size)
+
+
+def _peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def _child(mode: str, path: str) -> None:
+    import app.services.storage as storage
+    from app.api import routes
+
+    storage.s3 = _SinkS3()
+    baseline = _peak_rss_mb()
+    upload = _DiskUploadFile(path)
+
+    if mode == "buffered":
+        payload = asyncio.run(upload.read())
+        storage.upload_bytes("jobs/raw/bench.mp4", payload, "video/mp4")
+    else:
+        asyncio.run(routes.stream_upload_to_storage(upload, "mp4", 1 << 40))
+
+    print(f"{mode:<10} peak_rss_delta={_peak_rss_mb() - baseline:.1f}MB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mb", type=int, default=512)
+    parser.add_argument("--child", default=None)
+    parser.add_argument("--path", default=None)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child, args.path)
+        return
+
+    with tempfile.NamedTemporaryFile(suffix=".mp4") as f:
+        block = os.urandom(1024 * 1024)
+        for _ in range(args.mb):
+            f.write(block)
+        f.flush()
+        print(f"payload={args.mb}MB")
+        for mode in ("buffered", "streaming"):
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_upload_memory", "--child", mode, "--path", f.name],
+                check=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Window aggregation: dict-based `build_windows` (+ per-window `congestion_score`)
+vs columnar `build_windows_arrays`, from 10^4 to 10^7 samples.
+
+The dict path is skipped above `--legacy-max` samples (10^7 sample dicts alone
+need several GB).
+
+    cd backend && python -m benchmarks.bench_windows
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from app.ml.heuristics import build_windows, build_windows_arrays, congestion_score
+
+
+def columns(n: int, *, clips: int = 20, seed: int = 0) -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    per_clip = max(1, n // clips)
+    return {
+        # each clip is a 5 fps recording, so windows hold ~25 samples
+        "t": np.tile(np.arange(per_clip) / 5.0, clips)[:n],
+        "raw_motion": rng.uniform(0, 6, n),
+        "comp_motion": rng.uniform(0, 3, n),
+        "active_tracks": rng.integers(0, 30, n),
+        "clip_id": np.repeat(np.array([f"clip{i:03d}" for i in range(clips)]), per_clip)[:n],
+    }
+
+
+def legacy(cols: dict[str, np.ndarray]) -> int:
+    by_clip: dict[str, list[dict]] = {}
+    for t, r, c, a, clip in zip(
+        cols["t"].tolist(),
+        cols["raw_motion"].tolist(),
+        cols["comp_motion"].tolist(),
+        cols["active_tracks"].tolist(),
+        cols["clip_id"].tolist(),
+    ):
+        by_clip.setdefault(clip, []).append({"t": t, "raw_motion": r, "comp_motion": c, "active_tracks": a})
+
+    start = time.perf_counter()
+    windows = 0
+    for samples in by_clip.values():
+        for w in build_windows(samples):
+            congestion_score(w["active_tracks"], w["avg_compensated_speed"], w["stopped_ratio"], w["density_index"])
+            windows += 1
+    legacy.elapsed = time.perf_counter() - start
+    return windows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--legacy-max", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    for n in (10**4, 10**5, 10**6, 10**7):
+        cols = columns(n)
+
+        start = time.perf_counter()
+        out = build_windows_arrays(cols["t"], cols["raw_motion"], cols["comp_motion"], cols["active_tracks"], cols["clip_id"])
+        vectorized = time.perf_counter() - start
+
+        line = f"samples={n:<9d} windows={len(out['t_start']):<7d} arrays={vectorized * 1000:9.1f} ms"
+        if n <= args.legacy_max:
+            legacy(cols)
+            line += f"  dicts={legacy.elapsed * 1000:9.1f} ms  speedup={legacy.elapsed / vectorized:5.1f}x"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import pytest
+
+
+@pytest.fixture
+def api_session():
+    """Session factory for an in-memory database (shared across threads) holding organization 1."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    from app.db.session import Base
+    from app.models.entities import Organization
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    TestSession = sessionmaker(bind=engine)
+    with TestSession() as db:
+        db.add(Organization(id=1, name="Org"))
+        db.commit()
+    return TestSession
+
+
+@pytest.fixture
+def api_client(api_session):
+    """TestClient on `api_session`, authenticated as a user of organization 1."""
+    from fastapi.testclient import TestClient
+
+    from app.db.session import get_db
+    from app.main import app
+    from app.services.auth import AuthContext, require_user
+
+    def _db():
+        db = api_session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = _db
+    app.dependency_overrides[require_user] = lambda: AuthContext(user_id=1, org_id=1, auth_type="jwt")
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
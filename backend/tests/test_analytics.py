@@ -0,0 +1,221 @@
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session import Base
+from app.ml.heuristics import build_windows
+from app.models.entities import AnalyticsWindow, Event, Job, Track
+from app.workers.analytics import AnalyticsWriter, StreamingAnalytics, WindowAccumulator
+from app.workers.vision.detections import FrameDetections
+
+NAMES = {0: "person", 1: "bicycle", 2: "car"}
+
+
+def _frame(t, boxes):
+    """boxes: list of (track_id, class_id, xc, yc, w, h)."""
+    arr = np.array(boxes, dtype=np.float64).reshape(-1, 6)
+    return FrameDetections.from_arrays(
+        clip_id="main",
+        t=t,
+        xywh=arr[:, 2:6],
+        conf=np.full(len(arr), 0.9),
+        class_id=arr[:, 1],
+        track_id=arr[:, 0].astype(int),
+        names=NAMES,
+        frame_width=1000,
+        frame_height=600,
+    )
+
+
+def test_window_accumulator_matches_build_windows():
+    rng = np.random.default_rng(0)
+    t = np.sort(rng.uniform(0, 60, 500))
+    samples = [
+        {"t": float(ti), "raw_motion": float(r), "comp_motion": float(c), "active_tracks": int(a)}
+        for ti, r, c, a in zip(t, rng.uniform(0, 6, 500), rng.uniform(0, 3, 500), rng.integers(0, 30, 500))
+    ]
+
+    acc = WindowAccumulator(5)
+    streamed = [w for w in (acc.add(s) for s in samples) if w is not None]
+    streamed.append(acc.close())
+
+    assert streamed == build_windows(samples, window_s=5)
+
+
+def test_stream_emits_windows_and_closed_tracks_incrementally():
+    windows, tracks = [], []
+    stage = StreamingAnalytics(frame_width=1000, on_window=windows.append, on_track=tracks.append, idle_s=1.0)
+
+    for i in range(30):
+        t = i * 0.2
+        # camera pans 3 px/frame; the parked car moves with the background,
+        # the cutting-in car drifts from the left lane to the centre and grows
+        frame = [(1, 2, 100 + 3 * i, 300, 60, 40)]
+        if i < 12:
+            frame.append((2, 2, 200 + 25 * i, 320, 80 + 10 * i, 60 + 8 * i))
+        stage.update(_frame(t, frame), (3.0, 0.0))
+
+    assert len(windows) == 1 and windows[0]["t_start"] == 0
+    assert [t["track_id"] for t in tracks] == [2]
+    cut_in = tracks[0]
+    assert cut_in["start_t"] == 0.0 and cut_in["detections"] == 12
+    assert [e["type"] for e in cut_in["events"]] == ["cut_in"]
+
+    stage.close()
+    assert len(windows) == 2
+    parked = tracks[-1]
+    assert parked["track_id"] == 1
+    assert parked["motion"]["avg_raw_speed"] == pytest.approx(3.0)
+    assert parked["motion"]["avg_compensated_speed"] == pytest.approx(0.0)
+    assert windows[1]["stopped_ratio"] == 1.0
+
+
+def test_stream_ignores_chunk_lead_in():
+    windows, tracks = [], []
+    stage = StreamingAnalytics(frame_width=1000, on_window=windows.append, on_track=tracks.append, start_s=10.0)
+    for i in range(10):
+        stage.update(_frame(9.0 + i * 0.2, [(5, 2, 500 + i, 300, 50, 40)]))
+    stage.close()
+    assert tracks[0]["start_t"] == 10.0
+    assert windows[0]["t_start"] == 10.0
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'analytics.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        db.add(Job(id=1, filename="drive.mp4", storage_key="jobs/raw/drive.mp4"))
+        db.commit()
+    return factory
+
+
+def _run_stage(writer, start_s=0.0):
+    stage = StreamingAnalytics(
+        frame_width=1000, on_window=writer.add_window, on_track=writer.add_track, idle_s=1.0, start_s=start_s
+    )
+    for i in range(12):
+        stage.update(_frame(start_s + i * 0.2, [(2, 2, 200 + 25 * i, 320, 80 + 10 * i, 60 + 8 * i)]))
+    stage.close()
+    writer.flush()
+
+
+def test_writer_persists_rows_and_retries_are_idempotent(session_factory):
+    for _ in range(2):
+        writer = AnalyticsWriter(session_factory, job_id=1, clip_id="main", batch_rows=1)
+        writer.clear(0.0, None)
+        _run_stage(writer)
+
+    with session_factory() as db:
+        track = db.scalars(select(Track)).one()
+        event = db.scalars(select(Event)).one()
+        window = db.scalars(select(AnalyticsWindow)).one()
+    assert track.bbox_stats_json == {"track_id": 2, "detections": 12}
+    assert event.track_id == track.id and event.type == "cut_in"
+    assert window.counts_json["active_tracks"] == 1
+    assert 0.0 <= window.congestion_score <= 100.0
+    assert writer.events_written == 1
+
+
+def _track(i):
+    return {
+        "track_id": i,
+        "class": "car",
+        "start_t": float(i),
+        "end_t": float(i) + 1.0,
+        "detections": 5,
+        "motion": {"samples": 4},
+        "events": [{"type": "cut_in", "timestamp": float(i) + 0.5, "confidence": 0.1 * (i % 10)}] * (i % 3),
+    }
+
+
+def test_writer_bulk_batches_keep_events_on_their_tracks(session_factory):
+    writer = AnalyticsWriter(session_factory, job_id=1, clip_id="main", batch_rows=64)
+    for i in range(1000):
+        writer.add_track(_track(i))
+    writer.flush()
+
+    with session_factory() as db:
+        tracks = {t.id: t for t in db.scalars(select(Track))}
+        events = db.scalars(select(Event)).all()
+    assert writer.tracks_written == len(tracks) == 1000
+    assert writer.events_written == len(events) == sum(i % 3 for i in range(1000))
+    for e in events:
+        source = tracks[e.track_id].bbox_stats_json["track_id"]
+        assert e.details_json["track_id"] == source and e.timestamp == source + 0.5
+        assert e.review_status == "pending"
+
+
+def test_writer_clear_waits_for_first_flush(session_factory):
+    writer = AnalyticsWriter(session_factory, job_id=1, clip_id="main")
+    writer.clear(0.0, None)
+    _run_stage(writer)
+
+    retry = AnalyticsWriter(session_factory, job_id=1, clip_id="main")
+    retry.clear(0.0, None)
+    # a retry that dies before its first flush leaves the previous rows alone
+    with session_factory() as db:
+        assert len(db.scalars(select(Track)).all()) == 1
+    retry.flush()
+    with session_factory() as db:
+        assert db.scalars(select(Track)).all() == []
+        assert db.scalars(select(AnalyticsWindow)).all() == []
+
+
+def test_stitch_tracks_merges_chunk_rows(session_factory):
+    pytest.importorskip("cv2")
+    pytest.importorskip("celery")
+    from app.workers.tasks import _stitch_tracks
+
+    for start_s in (0.0, 10.0):
+        writer = AnalyticsWriter(session_factory, job_id=1, clip_id="main")
+        writer.clear(start_s, start_s + 10.0)
+        _run_stage(writer, start_s)
+
+    results = [{"index": 0, "start_s": 0.0}, {"index": 1, "start_s": 10.0}]
+    with session_factory() as db:
+        assert _stitch_tracks(db, 1, results, {0: {"2": 1}, 1: {"2": 1}}) == 1
+        db.commit()
+        track = db.scalars(select(Track)).one()
+        events = db.scalars(select(Event)).all()
+    assert (track.start_t, track.end_t) == (0.0, pytest.approx(12.2))
+    assert track.bbox_stats_json == {"track_id": 1, "detections": 24}
+    assert track.motion_stats_json["samples"] == 22
+    assert {e.track_id for e in events} == {track.id}
+
+
+def test_merge_chunks_retry_does_not_restitch(monkeypatch, session_factory):
+    pytest.importorskip("cv2")
+    pytest.importorskip("celery")
+    from app.workers import tasks
+
+    for start_s in (0.0, 10.0):
+        writer = AnalyticsWriter(session_factory, job_id=1, clip_id="main")
+        writer.clear(start_s, start_s + 10.0)
+        _run_stage(writer, start_s)
+
+    monkeypatch.setattr(tasks, "SessionLocal", session_factory)
+    monkeypatch.setattr(tasks, "download_file", lambda key, path: None)
+    monkeypatch.setattr(tasks, "concat_segments", lambda paths, out: Path(out).write_bytes(b"preview"))
+    monkeypatch.setattr(tasks, "upload_bytes", lambda key, payload, content_type: None)
+    monkeypatch.setattr(tasks, "stitch_track_ids", lambda results: {0: {"2": 1}, 1: {"2": 1}})
+
+    results = [
+        {"index": i, "start_s": start_s, "end_s": end_s, "frames": 12, "output_fps": 5.0, "preview_key": f"chunks/{i}.mp4"}
+        for i, (start_s, end_s) in enumerate(((0.0, 10.0), (10.0, None)))
+    ]
+    for _ in range(2):
+        tasks.merge_chunks.run(results, 1, 0.0)
+
+    with session_factory() as db:
+        job = db.get(Job, 1)
+        track = db.scalars(select(Track)).one()
+    assert job.status == "completed" and job.artifacts_json["track_count"] == 1
+    assert track.bbox_stats_json == {"track_id": 1, "detections": 24}
@@ -1,3 +1,4 @@
+import shutil
 import zipfile
 from pathlib import Path
 
@@ -38,3 +39,93 @@ def test_clip_windows_aggregation_preserves_clip_id():
     assert set(by_clip.keys()) == {"a", "b"}
     assert len(by_clip["a"]) == 2
     assert len(by_clip["b"]) == 1
+
+
+def test_extract_zip_inputs_streams_and_dedupes_clip_ids(tmp_path: Path):
+    pytest.importorskip("cv2")
+    from app.workers.tasks import _extract_zip_inputs
+
+    zip_path = tmp_path / "clips.zip"
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        zf.writestr("day1/cam.mp4", b"one")
+        zf.writestr("day2/cam.mp4", b"two")
+
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    clips = _extract_zip_inputs(str(zip_path), str(out_dir))
+
+    clip_id, path = next(clips)
+    assert clip_id == "cam"
+    assert sorted(p.name for p in out_dir.iterdir()) == ["cam.mp4"]
+
+    rest = list(clips)
+    assert [c[0] for c in rest] == ["cam_2"]
+    assert Path(rest[0][1]).read_bytes() == b"two"
+
+
+def test_zip_job_dispatches_clip_chord_and_merges(monkeypatch, tmp_path: Path, api_session):
+    pytest.importorskip("cv2")
+    pytest.importorskip("celery")
+    from app.models.entities import Job
+    from app.workers import tasks
+
+    zip_path = tmp_path / "clips.zip"
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        zf.writestr("a/front.mp4", b"one")
+        zf.writestr("b/rear.MOV", b"two")
+        zf.writestr("c/side.mkv", b"three")
+
+    uploads, sources = [], []
+    monkeypatch.setattr(tasks, "SessionLocal", api_session)
+    monkeypatch.setattr(tasks, "download_file", lambda key, path: shutil.copyfile(zip_path, path))
+    monkeypatch.setattr(tasks, "upload_file", lambda key, path, content_type: uploads.append((key, content_type)))
+    monkeypatch.setattr(tasks, "upload_bytes", lambda key, payload, content_type: None)
+    monkeypatch.setattr(tasks, "signed_url", lambda key: f"https://storage/{key}")
+
+    def fake_segment(source, preview_path, *, clip_id, **kwargs):
+        sources.append(source)
+        Path(preview_path).write_bytes(b"preview")
+        return {"output_fps": 5.0, "frames": 10, "tracks": {"1": {}}, "windows": 2, "events": 1}
+
+    def inline_chord(header):
+        # run the clip subtasks in order, then the merge callback, like a chord would
+        def apply(body):
+            assert body.task == "app.workers.tasks.merge_clips"
+            results = [tasks.process_chunk.run(*sig.args) for sig in header]
+            return tasks.merge_clips.run(results[::-1], *body.args)
+
+        return apply
+
+    monkeypatch.setattr(tasks, "_process_segment", fake_segment)
+    monkeypatch.setattr(tasks, "chord", inline_chord)
+
+    with api_session() as db:
+        job = Job(org_id=1, filename="clips.zip", status="queued", storage_key="jobs/raw/clips.zip")
+        db.add(job)
+        db.commit()
+        job_id = job.id
+
+    tasks.process_job.run(job_id)
+
+    assert uploads == [
+        (f"jobs/{job_id}/inputs/front.mp4", "video/mp4"),
+        (f"jobs/{job_id}/inputs/rear.mov", "video/quicktime"),
+        (f"jobs/{job_id}/inputs/side.mkv", "video/x-matroska"),
+    ]
+    assert sources == [f"https://storage/{key}" for key, _ in uploads]
+    with api_session() as db:
+        job = db.get(Job, job_id)
+        assert job.status == "completed"
+        assert job.settings_json["clips"] == ["front", "rear", "side"]
+        assert job.settings_json["preview_clip_key"] == f"jobs/{job_id}/clips/front/preview_tracking.mp4"
+        clips = job.artifacts_json["clips"]
+    assert [c["clip_id"] for c in clips] == ["front", "rear", "side"]
+    assert clips[1] == {
+        "clip_id": "rear",
+        "frames": 10,
+        "track_count": 1,
+        "windows": 2,
+        "events": 1,
+        "input_key": f"jobs/{job_id}/inputs/rear.mov",
+        "preview_key": f"jobs/{job_id}/clips/rear/preview_tracking.mp4",
+    }
@@ -0,0 +1,100 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from app.workers.chunking import ChunkTrackRecorder, concat_segments, plan_chunks, stitch_track_ids
+
+
+def _det(tid, t, xc, cls="car"):
+    return {"track_id": tid, "class": cls, "t": t, "xc": xc, "yc": 100.0, "w": 40.0, "h": 30.0}
+
+
+def test_plan_chunks_covers_duration_with_overlap():
+    chunks = plan_chunks(3600.0, 300.0, 2.0)
+
+    assert len(chunks) == 12
+    assert chunks[0]["start_s"] == 0.0 and chunks[0]["overlap_s"] == 0.0
+    assert chunks[-1]["end_s"] is None and chunks[-1]["tail_s"] == 0.0
+    for prev, nxt in zip(chunks, chunks[1:]):
+        assert prev["end_s"] == nxt["start_s"]
+        assert nxt["overlap_s"] == 2.0 and prev["tail_s"] == 2.0
+
+
+def test_plan_chunks_folds_short_remainder_and_short_videos():
+    assert len(plan_chunks(620.0, 300.0)) == 2
+    assert plan_chunks(120.0, 300.0) == [{"index": 0, "start_s": 0.0, "end_s": None, "overlap_s": 0.0, "tail_s": 0.0}]
+
+
+def test_plan_chunks_aligns_boundaries_to_analytics_windows():
+    np = pytest.importorskip("numpy")
+    from app.workers.analytics import StreamingAnalytics
+    from app.workers.vision.detections import FrameDetections
+
+    chunks = plan_chunks(30.0, 6.0, 1.0, align_s=5.0)
+    assert [c["start_s"] for c in chunks] == [0.0, 5.0, 10.0, 15.0, 20.0, 25.0]
+    assert [c["start_s"] for c in plan_chunks(3600.0, 290.0, align_s=5.0)][:3] == [0.0, 290.0, 580.0]
+    assert plan_chunks(30.0, 2.0, align_s=5.0)[1]["start_s"] == 5.0
+
+    # each chunk emits only windows starting in its range, none twice
+    windows = []
+    for c in chunks:
+        end_s = 30.0 if c["end_s"] is None else c["end_s"]
+        emitted = []
+        stage = StreamingAnalytics(frame_width=1000, on_window=emitted.append, on_track=lambda t: None, start_s=c["start_s"])
+        for t in np.arange(c["start_s"] - c["overlap_s"], end_s, 0.2):
+            stage.update(
+                FrameDetections.from_arrays(
+                    clip_id="main", t=float(t), xywh=np.array([[500.0, 300.0, 50.0, 40.0]]), conf=np.array([0.9]),
+                    class_id=np.array([2]), track_id=np.array([1]), names={2: "car"}, frame_width=1000, frame_height=600,
+                )
+            )
+        stage.close()
+        assert all(c["start_s"] <= w["t_start"] < end_s for w in emitted)
+        windows += emitted
+    assert [w["t_start"] for w in windows] == [0.0, 5.0, 10.0, 15.0, 20.0, 25.0]
+
+
+def test_stitch_track_ids_links_tracks_across_boundary():
+    first = ChunkTrackRecorder(start_s=0.0, end_s=10.0, tail_s=1.0)
+    second = ChunkTrackRecorder(start_s=10.0, end_s=None, tail_s=0.0)
+
+    for t in (8.0, 9.0, 9.2, 9.4, 9.6, 9.8):
+        first.update([_det(3, t, 100.0 + t), _det(4, t, 400.0 + t)])
+    for t in (9.0, 9.2, 9.4, 9.6, 9.8, 10.0, 11.0):
+        # local ids differ, boxes coincide in the overlap; id 9 is a new object
+        second.update([_det(1, t, 400.0 + t), _det(2, t, 100.0 + t), _det(9, t, 700.0)])
+
+    id_maps = stitch_track_ids(
+        [
+            {"index": 0, "tracks": first.to_dict()},
+            {"index": 1, "tracks": second.to_dict()},
+        ]
+    )
+
+    assert id_maps[1]["2"] == id_maps[0]["3"]
+    assert id_maps[1]["1"] == id_maps[0]["4"]
+    assert id_maps[1]["9"] not in id_maps[0].values()
+
+
+def test_concat_segments_joins_preview_segments(tmp_path: Path):
+    if shutil.which("ffmpeg") is None:
+        pytest.skip("ffmpeg not installed")
+    np = pytest.importorskip("numpy")
+    cv2 = pytest.importorskip("cv2")
+    from app.workers.vision.encode import PreviewEncoder
+
+    paths = []
+    for i in range(2):
+        path = tmp_path / f"seg{i}.mp4"
+        with PreviewEncoder(str(path), src_width=320, src_height=240, src_fps=5.0) as enc:
+            for _ in range(5):
+                enc.write(np.full((240, 320, 3), 40 * i, dtype=np.uint8))
+        paths.append(str(path))
+
+    out = tmp_path / "preview_tracking.mp4"
+    concat_segments(paths, str(out))
+
+    cap = cv2.VideoCapture(str(out))
+    assert int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == 10
+    cap.release()
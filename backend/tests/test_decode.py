@@ -0,0 +1,72 @@
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2", exc_type=ImportError)
+
+from app.workers.vision.decode import FFmpegFrameReader, iter_ffmpeg_frames
+from app.workers.vision.frames import iter_sampled_frames
+
+pytestmark = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+
+
+@pytest.fixture(scope="module")
+def clip(tmp_path_factory) -> str:
+    path = tmp_path_factory.mktemp("decode") / "clip.mp4"
+    subprocess.run(
+        [
+            "ffmpeg", "-y", "-loglevel", "error", "-f", "lavfi", "-i", "testsrc2=size=320x240:rate=30",
+            "-t", "10", "-c:v", "libx264", "-g", "60", "-pix_fmt", "yuv420p", str(path),
+        ],
+        check=True,
+    )
+    return str(path)
+
+
+def _opencv(clip, **kwargs):
+    cap = cv2.VideoCapture(clip)
+    if kwargs.get("start_frame"):
+        cap.set(cv2.CAP_PROP_POS_FRAMES, kwargs["start_frame"])
+    try:
+        return list(iter_sampled_frames(cap, native_fps=30.0, **kwargs))
+    finally:
+        cap.release()
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"target_fps": 5},
+        # fractional step, chunk starting between grid points, after a keyframe
+        {"target_fps": 7, "start_frame": 95, "end_frame": 200},
+    ],
+)
+def test_ffmpeg_reader_matches_opencv_sampling(clip, kwargs):
+    expected = _opencv(clip, **kwargs)
+    frames = list(iter_ffmpeg_frames(clip, width=320, height=240, native_fps=30.0, **kwargs))
+
+    assert [idx for idx, _, _ in frames] == [idx for idx, _, _ in expected]
+    for (_, t, frame), (_, t_cv, frame_cv) in zip(frames, expected):
+        assert t == pytest.approx(t_cv, abs=1e-4)
+        assert frame.shape == frame_cv.shape
+        assert np.abs(frame.astype(int) - frame_cv).mean() < 1.0
+
+
+def test_ffmpeg_reader_scales_converts_and_reuses_buffers(clip):
+    with FFmpegFrameReader(
+        clip, width=320, height=240, native_fps=30.0, target_fps=5, size=(160, 120), pix_fmt="gray", buffers=3
+    ) as reader:
+        frames = [frame for _, _, frame in reader]
+
+    assert len(frames) == reader.frames_read == 50
+    assert frames[0].shape == (120, 160)
+    assert np.shares_memory(frames[0], frames[3])
+    assert not np.shares_memory(frames[0], frames[1])
+
+
+def test_ffmpeg_reader_reports_decode_errors(tmp_path: Path):
+    with pytest.raises(RuntimeError, match="ffmpeg decode failed"):
+        list(iter_ffmpeg_frames(str(tmp_path / "missing.mp4"), width=320, height=240, native_fps=30.0))
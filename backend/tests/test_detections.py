@@ -0,0 +1,63 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.workers.vision.detections import FrameDetections, class_index_mask
+
+
+def _frame(**overrides):
+    kwargs = {
+        "clip_id": "clipA",
+        "t": 0.4,
+        "xywh": np.array([[100.0, 80.0, 40.0, 30.0], [10.0, 10.0, 5.0, 5.0], [180.0, 90.0, 42.0, 32.0]], dtype=np.float32),
+        "conf": np.array([0.9, 0.5, 0.85], dtype=np.float32),
+        "class_id": np.array([2.0, 56.0, 0.0], dtype=np.float32),
+        "track_id": np.array([4, 5, -1]),
+        "names": {0: "person", 2: "car", 56: "chair"},
+        "frame_width": 320,
+        "frame_height": 240,
+    }
+    kwargs.update(overrides)
+    return FrameDetections.from_arrays(**kwargs)
+
+
+def test_class_mask_filters_by_class_index():
+    names = {0: "person", 2: "car", 56: "chair"}
+    mask = class_index_mask(names, {"car", "person"})
+    assert mask.tolist()[:3] == [True, False, True]
+    assert not mask[56]
+    assert class_index_mask(names, {"car", "person"}) is mask
+
+    dets = _frame(class_mask=mask)
+    assert len(dets) == 2
+    assert dets.class_names == ["car", "person"]
+    assert dets.track_id.tolist() == [4, -1]
+
+
+def test_area_columns_match_dict_adapter():
+    dets = _frame()
+    assert dets.area.tolist() == [1200.0, 25.0, 1344.0]
+    assert dets.area_ratio[0] == pytest.approx(1200.0 / (320 * 240))
+
+    first = dets.to_dicts()[0]
+    assert first == {
+        "clip_id": "clipA",
+        "class": "car",
+        "track_id": 4,
+        "t": 0.4,
+        "xc": 100.0,
+        "yc": 80.0,
+        "w": 40.0,
+        "h": 30.0,
+        "conf": pytest.approx(0.9),
+        "area": 1200.0,
+        "area_ratio": pytest.approx(1200.0 / (320 * 240)),
+        "predicted": False,
+    }
+
+
+def test_empty_frame_has_no_rows():
+    dets = FrameDetections.empty("clipA", 1.0)
+    assert len(dets) == 0
+    assert dets.to_dicts() == []
+    assert list(dets.rows()) == []
@@ -0,0 +1,121 @@
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("boto3")
+
+import app.services.storage as storage
+from app.api import routes
+from app.models.entities import Job
+
+
+class _FakeS3:
+    def __init__(self):
+        self.completed = {}
+        self.deleted = []
+        self.size = 0
+
+    def list_buckets(self):
+        return {"Buckets": [{"Name": storage.settings.s3_bucket}]}
+
+    def create_multipart_upload(self, Bucket, Key, ContentType):
+        return {"UploadId": "upload-1"}
+
+    def generate_presigned_url(self, op, Params, ExpiresIn):
+        return f"http://minio/{Params['Key']}?op={op}&part={Params.get('PartNumber')}"
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.completed[Key] = MultipartUpload["Parts"]
+
+    def head_object(self, Bucket, Key):
+        return {"ContentLength": self.size}
+
+    def delete_object(self, Bucket, Key):
+        self.deleted.append(Key)
+
+
+@pytest.fixture
+def client(monkeypatch, api_client, api_session):
+    fake = _FakeS3()
+    enqueued = []
+    monkeypatch.setattr(storage, "s3", fake)
+    monkeypatch.setattr(routes, "enqueue_job", enqueued.append)
+    return api_client, fake, enqueued, api_session
+
+
+def test_direct_upload_flow_enqueues_job(client):
+    c, fake, enqueued, TestSession = client
+    size = 20 * 1024 * 1024
+
+    r = c.post("/api/videos/uploads", json={"filename": "drive.mp4", "size_bytes": size})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["part_size"] == storage.MULTIPART_PART_SIZE
+    assert [p["part_number"] for p in body["parts"]] == [1, 2, 3]
+    assert "op=upload_part" in body["parts"][0]["url"]
+
+    fake.size = size
+    parts = [{"part_number": n, "etag": f"e{n}"} for n in (2, 1, 3)]
+    r = c.post(f"/api/videos/uploads/{body['job_id']}/complete", json={"parts": parts})
+    assert r.status_code == 200
+    assert r.json()["status"] == "queued"
+    assert enqueued == [body["job_id"]]
+
+    with TestSession() as db:
+        job = db.get(Job, body["job_id"])
+        assert [p["PartNumber"] for p in fake.completed[job.storage_key]] == [1, 2, 3]
+        assert "upload_id" not in job.settings_json
+
+    r = c.post(f"/api/videos/uploads/{body['job_id']}/complete", json={"parts": parts})
+    assert r.status_code == 409
+
+
+def test_direct_upload_rejects_oversized_object(client):
+    c, fake, enqueued, _ = client
+
+    r = c.post("/api/videos/uploads", json={"filename": "drive.mp4", "size_bytes": 1024})
+    job_id = r.json()["job_id"]
+
+    fake.size = (storage.settings.upload_max_mb + 1) * 1024 * 1024
+    r = c.post(f"/api/videos/uploads/{job_id}/complete", json={"parts": [{"part_number": 1, "etag": "e1"}]})
+
+    assert r.status_code == 400
+    assert fake.deleted and not enqueued
+
+
+def test_run_rejects_job_still_uploading(client):
+    c, fake, enqueued, TestSession = client
+
+    job_id = c.post("/api/videos/uploads", json={"filename": "drive.mp4", "size_bytes": 1024}).json()["job_id"]
+    r = c.post(f"/api/jobs/{job_id}/run")
+
+    assert r.status_code == 409
+    assert not enqueued
+    with TestSession() as db:
+        assert db.get(Job, job_id).status == "uploading"
+
+    fake.size = 1024
+    r = c.post(f"/api/videos/uploads/{job_id}/complete", json={"parts": [{"part_number": 1, "etag": "e1"}]})
+    assert r.status_code == 200 and enqueued == [job_id]
+
+
+def test_complete_maps_rejected_parts_to_400_and_storage_outages_to_5xx(client, monkeypatch):
+    from botocore.exceptions import ClientError, EndpointConnectionError
+
+    c, fake, enqueued, _ = client
+    job_id = c.post("/api/videos/uploads", json={"filename": "drive.mp4", "size_bytes": 1024}).json()["job_id"]
+    parts = {"parts": [{"part_number": 1, "etag": "e1"}]}
+
+    def invalid_part(**kwargs):
+        raise ClientError({"Error": {"Code": "InvalidPart", "Message": "bad etag"}}, "CompleteMultipartUpload")
+
+    monkeypatch.setattr(fake, "complete_multipart_upload", invalid_part)
+    assert c.post(f"/api/videos/uploads/{job_id}/complete", json=parts).status_code == 400
+
+    def outage(**kwargs):
+        raise EndpointConnectionError(endpoint_url="http://minio")
+
+    monkeypatch.setattr(fake, "complete_multipart_upload", outage)
+    # TestClient re-raises what the app would answer with a 500
+    with pytest.raises(EndpointConnectionError):
+        c.post(f"/api/videos/uploads/{job_id}/complete", json=parts)
+    assert not enqueued
@@ -3,7 +3,7 @@ import pytest
 cv2 = pytest.importorskip("cv2")
 import numpy as np
 
-from app.ml.ego_motion import estimate_global_motion
+from app.ml.ego_motion import EgoMotionEstimator, estimate_global_motion
 
 
 def test_estimate_global_motion_on_synthetic_shift():
@@ -18,3 +18,46 @@ def test_estimate_global_motion_on_synthetic_shift():
     est_dx, est_dy = estimate_global_motion(base, shifted)
     assert abs(est_dx - dx) < 1.5
     assert abs(est_dy - dy) < 1.5
+
+
+def _textured(height=360, width=640, seed=0):
+    rng = np.random.default_rng(seed)
+    noise = rng.integers(0, 255, size=(height // 8, width // 8), dtype=np.uint8)
+    return cv2.GaussianBlur(cv2.resize(noise, (width, height), interpolation=cv2.INTER_NEAREST), (5, 5), 0)
+
+
+def _shift(image, dx, dy):
+    M = np.float32([[1, 0, dx], [0, 1, dy]])
+    return cv2.warpAffine(image, M, (image.shape[1], image.shape[0]), borderMode=cv2.BORDER_REFLECT)
+
+
+def test_estimator_tracks_sequence_and_reuses_features():
+    base = _textured()
+    estimator = EgoMotionEstimator(width=320)
+
+    assert estimator.update(base) == (0.0, 0.0)
+    for i in range(1, 8):
+        est_dx, est_dy = estimator.update(_shift(base, 4 * i, -2 * i))
+        assert est_dx == pytest.approx(4, abs=1.0)
+        assert est_dy == pytest.approx(-2, abs=1.0)
+    assert estimator.redetections == 1
+
+
+def test_estimator_ignores_features_inside_masked_boxes():
+    base = _textured()
+    vehicle = _textured(300, 560, seed=1)
+    box = np.array([[320.0, 180.0, 560.0, 300.0]])
+
+    def frame(i):
+        out = _shift(base, 2 * i, 0)
+        # the "vehicle" covers most of the frame and moves the other way
+        out[30:330, 40 - 10 * i:600 - 10 * i] = vehicle
+        return out
+
+    masked, unmasked = EgoMotionEstimator(width=320), EgoMotionEstimator(width=320)
+    masked.update(frame(0), box)
+    unmasked.update(frame(0))
+    box[0, 0] -= 10
+    dx, _ = masked.update(frame(1), box)
+    assert dx == pytest.approx(2, abs=1.0)
+    assert unmasked.update(frame(1))[0] < 0
@@ -0,0 +1,52 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2", exc_type=ImportError)
+
+from app.workers.vision.encode import PreviewEncoder, preview_size
+
+
+def test_preview_size_matches_ffmpeg_scale_rule():
+    assert preview_size(1920, 1080) == (1280, 720)
+    assert preview_size(3840, 2160) == (1280, 720)
+    assert preview_size(1080, 1920) == (406, 720)
+
+
+def test_preview_encoder_streams_sampled_downscaled_frames(tmp_path: Path):
+    if shutil.which("ffmpeg") is None:
+        pytest.skip("ffmpeg not installed")
+
+    out_path = tmp_path / "preview_tracking.mp4"
+    frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+
+    with PreviewEncoder(str(out_path), src_width=1920, src_height=1080, src_fps=30.0) as encoder:
+        for _ in range(30):
+            encoder.write(frame)
+
+    assert encoder.frames_in == 30
+    assert encoder.frames_out == 15
+    assert out_path.stat().st_size > 0
+
+    cv2 = pytest.importorskip("cv2")
+    cap = cv2.VideoCapture(str(out_path))
+    assert int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) == 720
+    cap.release()
+
+
+def test_preview_encoder_skip_keeps_the_sample_timeline(tmp_path: Path):
+    if shutil.which("ffmpeg") is None:
+        pytest.skip("ffmpeg not installed")
+
+    frame = np.zeros((216, 384, 3), dtype=np.uint8)
+    with PreviewEncoder(str(tmp_path / "p.mp4"), src_width=384, src_height=216, src_fps=30.0) as encoder:
+        for _ in range(30):
+            if encoder.wants_frame():
+                encoder.write(frame)
+            else:
+                encoder.skip()
+
+    assert encoder.frames_in == 30
+    assert encoder.frames_out == 15
@@ -0,0 +1,52 @@
+import random
+
+from app.ml.events import EventEngine
+from app.ml.heuristics import bike_proximity_confidence, close_following_confidence, cut_in_confidence
+
+
+def _trajectory(rng, n):
+    t, xc, area = 0.0, rng.uniform(0, 1000), rng.uniform(500, 5000)
+    points = []
+    for _ in range(n):
+        t += rng.choice([0.2, 0.4, 1.0])
+        xc = min(1000.0, max(0.0, xc + rng.uniform(-80, 80)))
+        area = max(1.0, area * rng.uniform(0.9, 1.3))
+        points.append({"t": t, "xc": xc, "area": area, "area_ratio": rng.uniform(0.0, 0.2)})
+    return points
+
+
+def test_final_confidences_match_batch_heuristics():
+    rng = random.Random(0)
+    engine = EventEngine(1000)
+    checked = 0
+    for tid in range(400):
+        cls = rng.choice(["car", "truck", "bicycle"])
+        points = _trajectory(rng, rng.randint(1, 40))
+        for p in points:
+            engine.update(tid, cls, p["t"], p["xc"], p["area"], p["area_ratio"])
+        final = {e["type"]: e["confidence"] for e in engine.finish(tid)}
+
+        if cls == "bicycle":
+            expected = {"bike_proximity": bike_proximity_confidence(points, 1000)}
+        else:
+            expected = {
+                "cut_in": cut_in_confidence(points, 1000),
+                "close_following": close_following_confidence(points, 1000),
+            }
+        assert final == {k: v for k, v in expected.items() if v > 0}
+        checked += len(final)
+    assert checked > 50
+    assert engine.tracks == {}
+
+
+def test_candidates_fire_once_when_threshold_is_crossed():
+    engine = EventEngine(1000)
+    fired = []
+    for i in range(20):
+        # centred and close from t=0; close-following needs 2 s of it
+        fired.append([e["type"] for e in engine.update(1, "car", i * 0.5, 500.0, 9000.0, 0.1)])
+    assert fired.index(["close_following"]) == 4
+    assert sum(len(f) for f in fired) == 1
+    assert engine.finish(1)[0]["confidence"] == close_following_confidence(
+        [{"t": i * 0.5, "xc": 500.0, "area_ratio": 0.1} for i in range(20)], 1000
+    )
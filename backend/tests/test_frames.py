@@ -0,0 +1,67 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.workers.vision.frames import iter_sampled_frames, sample_step
+
+
+class _FakeCapture:
+    def __init__(self, n_frames: int):
+        self.n_frames = n_frames
+        self.pos = -1
+        self.retrieved = 0
+
+    def grab(self):
+        if self.pos + 1 >= self.n_frames:
+            return False
+        self.pos += 1
+        return True
+
+    def retrieve(self):
+        self.retrieved += 1
+        return True, np.full((4, 4, 3), self.pos, dtype=np.uint8)
+
+
+def test_sampling_decodes_only_grid_frames():
+    cap = _FakeCapture(60)
+    samples = list(iter_sampled_frames(cap, native_fps=30.0, target_fps=5))
+
+    assert [idx for idx, _, _ in samples] == list(range(0, 60, 6))
+    assert cap.retrieved == len(samples) == 10
+    assert all(int(frame[0, 0, 0]) == idx for idx, _, frame in samples)
+
+
+def test_sampling_timestamps_follow_true_frame_index():
+    cap = _FakeCapture(90)
+    samples = list(iter_sampled_frames(cap, native_fps=29.97, target_fps=5))
+
+    for idx, t, _ in samples:
+        assert t == pytest.approx(idx / 29.97)
+    gaps = {b[0] - a[0] for a, b in zip(samples, samples[1:])}
+    assert gaps <= {5, 6}
+
+
+def test_sample_step_keeps_every_frame_when_target_exceeds_native():
+    assert sample_step(10.0, 15) == 1.0
+    assert sample_step(30.0, None) == 1.0
+    assert sample_step(30.0, 5) == pytest.approx(6.0)
+
+
+def test_sampling_range_stays_on_global_grid():
+    full = [idx for idx, _, _ in iter_sampled_frames(_FakeCapture(120), native_fps=30.0, target_fps=5)]
+
+    cap = _FakeCapture(120)
+    cap.pos = 44
+    part = [idx for idx, _, _ in iter_sampled_frames(cap, native_fps=30.0, target_fps=5, start_frame=45, end_frame=90)]
+
+    assert part == [idx for idx in full if 45 <= idx < 90]
+
+
+def test_sampling_range_stays_on_global_grid_with_fractional_step():
+    full = [idx for idx, _, _ in iter_sampled_frames(_FakeCapture(240), native_fps=30.0, target_fps=7)]
+
+    for start in (95, 96, 99):
+        cap = _FakeCapture(240)
+        cap.pos = start - 1
+        part = [idx for idx, _, _ in iter_sampled_frames(cap, native_fps=30.0, target_fps=7, start_frame=start)]
+        assert part == [idx for idx in full if idx >= start]
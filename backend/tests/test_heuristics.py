@@ -24,3 +24,57 @@ def test_congestion_score_monotonicity():
     freer = congestion_score(4, avg_compensated_speed=6.0, stopped_ratio=0.1, density_index=0.2)
     congested = congestion_score(18, avg_compensated_speed=0.8, stopped_ratio=0.9, density_index=0.9)
     assert congested > freer
+
+
+def test_build_windows_arrays_matches_build_windows():
+    import numpy as np
+
+    from app.ml.heuristics import build_windows, build_windows_arrays
+
+    rng = np.random.default_rng(0)
+    n = 3000
+    t = rng.uniform(0, 120, n)
+    raw = rng.uniform(0, 6, n)
+    comp = rng.uniform(0, 3, n)
+    active = rng.integers(0, 30, n)
+    clip = rng.choice(["a", "b", "c"], n)
+
+    out = build_windows_arrays(t, raw, comp, active, clip, window_s=5)
+
+    rows = 0
+    for clip_id in ("a", "b", "c"):
+        sel = clip == clip_id
+        samples = [
+            {"t": float(ti), "raw_motion": float(r), "comp_motion": float(c), "active_tracks": int(a)}
+            for ti, r, c, a in zip(t[sel], raw[sel], comp[sel], active[sel])
+        ]
+        expected = build_windows(samples, window_s=5)
+        mine = np.flatnonzero(out["clip_id"] == clip_id)
+        assert len(mine) == len(expected)
+        for i, w in zip(mine, expected):
+            assert {key: out[key][i] for key in w} == w
+            assert out["congestion_score"][i] == congestion_score(
+                w["active_tracks"], w["avg_compensated_speed"], w["stopped_ratio"], w["density_index"]
+            )
+        rows += len(expected)
+    assert rows == len(out["t_start"])
+
+
+def test_congestion_scores_match_scalar_rounding():
+    import numpy as np
+
+    from app.ml.heuristics import _round2, congestion_scores
+
+    ties = np.arange(0, 20000) / 1000.0 + 0.0005
+    assert _round2(ties).tolist() == [round(float(v), 2) for v in ties]
+
+    rng = np.random.default_rng(1)
+    active = rng.integers(0, 40, 20000)
+    # coarse grids hit .xx5 rounding ties often
+    speed = rng.integers(0, 100, 20000) / 8.0
+    stopped = rng.integers(0, 41, 20000) / 40.0
+    density = np.minimum(1.0, active / 20.0)
+
+    scores = congestion_scores(active, speed, stopped, density)
+    expected = [congestion_score(int(a), float(s), float(r), float(d)) for a, s, r, d in zip(active, speed, stopped, density)]
+    assert scores.tolist() == expected
@@ -0,0 +1,89 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2", exc_type=ImportError)
+
+from app.workers.vision.detections import FrameDetections
+from app.workers.vision.keyframes import KeyframeTracker, keyframe_interval
+
+
+def _scene(count, *, step=(4, 2)):
+    rng = np.random.default_rng(0)
+    background = rng.integers(0, 60, size=(240, 320, 3), dtype=np.uint8)
+    patch = rng.integers(100, 255, size=(40, 50, 3), dtype=np.uint8)
+    frames, centers = [], []
+    for i in range(count):
+        x, y = 80 + step[0] * i, 100 + step[1] * i
+        frame = background.copy()
+        frame[y - 20:y + 20, x - 25:x + 25] = patch
+        frames.append(frame)
+        centers.append((x, y))
+    return frames, centers
+
+
+class _Detector:
+    def __init__(self, centers_by_frame):
+        self.centers_by_frame = centers_by_frame
+        self.calls = []
+
+    def __call__(self, frames, timestamps):
+        self.calls.append(list(timestamps))
+        out = []
+        for frame, t in zip(frames, timestamps):
+            x, y = self.centers_by_frame[id(frame)]
+            out.append(
+                FrameDetections.from_arrays(
+                    clip_id="c",
+                    t=t,
+                    xywh=np.array([[x, y, 50.0, 40.0]]),
+                    conf=np.array([0.9]),
+                    class_id=np.array([2]),
+                    track_id=np.array([7]),
+                    names={2: "car"},
+                    frame_width=320,
+                    frame_height=240,
+                )
+            )
+        return out
+
+
+def test_keyframe_interval_shrinks_with_motion():
+    assert keyframe_interval(0.0, k_max=4) == 4
+    assert keyframe_interval(6.0, k_max=4, motion_high_px=12.0) == 2
+    assert keyframe_interval(50.0, k_max=4, k_min=1) == 1
+    assert keyframe_interval(0.0, k_max=1) == 1
+
+
+def test_detector_runs_on_keyframes_and_tracks_are_propagated_between():
+    frames, centers = _scene(7)
+    detector = _Detector({id(f): c for f, c in zip(frames, centers)})
+    tracker = KeyframeTracker(detector, k_max=3, k_min=3)
+    times = [i * 0.2 for i in range(7)]
+
+    out = tracker.process(frames[:4], times[:4]) + tracker.process(frames[4:], times[4:])
+
+    assert [round(t, 1) for call in detector.calls for t in call] == [0.0, 0.6, 1.2]
+    assert [bool(d.predicted[0]) for d in out] == [False, True, True, False, True, True, False]
+    assert tracker.detector_frames == 3 and tracker.predicted_frames == 4
+    for dets, (x, y) in zip(out, centers):
+        assert dets.track_id.tolist() == [7]
+        assert dets.xc[0] == pytest.approx(x, abs=1.5)
+        assert dets.yc[0] == pytest.approx(y, abs=1.5)
+    assert out[1].to_dicts()[0]["predicted"] is True
+
+
+def test_process_with_motion_reports_global_motion_in_input_pixels():
+    rng = np.random.default_rng(1)
+    background = rng.integers(0, 255, size=(480, 960, 3), dtype=np.uint8)
+    background = np.repeat(np.repeat(background[::8, ::8], 8, axis=0), 8, axis=1)
+    # camera pans 6 px right per frame; frames wider than WORK_WIDTH are downscaled
+    frames = [np.ascontiguousarray(np.roll(background, 6 * i, axis=1)) for i in range(4)]
+    detector = _Detector({id(f): (480, 240) for f in frames})
+    tracker = KeyframeTracker(detector, k_max=2, k_min=2)
+
+    out = tracker.process_with_motion(frames, [i * 0.2 for i in range(4)])
+
+    assert [bool(dets.predicted[0]) for dets, _ in out] == [False, True, False, True]
+    assert out[0][1] == (0.0, 0.0)
+    for _, (dx, dy) in out[1:]:
+        assert dx == pytest.approx(6.0, abs=1.0) and dy == pytest.approx(0.0, abs=1.0)
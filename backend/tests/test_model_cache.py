@@ -0,0 +1,113 @@
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import app.workers.vision.tracking as tracking
+
+
+class _FakeTracker:
+    def __init__(self):
+        self.resets = 0
+
+    def reset(self):
+        self.resets += 1
+
+
+class _FakeYOLO:
+    instances = 0
+    exports: list[str] = []
+
+    def __init__(self, weights):
+        _FakeYOLO.instances += 1
+        self.weights = weights
+        self.device = None
+        self.predict_calls = 0
+        self.predictor = None
+
+    def to(self, device):
+        self.device = device
+        return self
+
+    def export(self, *, format, **_kwargs):
+        _FakeYOLO.exports.append(format)
+        if format == "broken":
+            raise RuntimeError("exporter missing")
+        out = Path(self.weights).with_suffix(".onnx")
+        out.write_bytes(b"onnx")
+        return str(out)
+
+    def predict(self, *_args, **_kwargs):
+        self.predict_calls += 1
+        self.predictor = type("P", (), {"trackers": [_FakeTracker()]})()
+        return []
+
+
+@pytest.fixture
+def fake_yolo(monkeypatch):
+    _FakeYOLO.instances = 0
+    _FakeYOLO.exports = []
+    monkeypatch.setattr(tracking, "YOLO", _FakeYOLO)
+    tracking.clear_model_cache()
+    yield _FakeYOLO
+    tracking.clear_model_cache()
+
+
+def test_get_model_loads_and_warms_once_per_key(fake_yolo):
+    assert not tracking.model_is_cached("a.pt", "cpu")
+
+    first = tracking.get_model("a.pt", "cpu")
+    again = tracking.get_model("a.pt", "cpu")
+    other = tracking.get_model("b.pt", "cpu")
+
+    assert first is again
+    assert other is not first
+    assert fake_yolo.instances == 2
+    assert first.predict_calls == 1
+    assert first.device == "cpu"
+    assert tracking.model_is_cached("a.pt", "cpu")
+
+
+def test_reset_tracker_clears_persisted_state(fake_yolo):
+    model = tracking.get_model("a.pt", "cpu")
+    tracker = model.predictor.trackers[0]
+
+    tracking.reset_tracker(model)
+    tracking.reset_tracker(None)
+
+    assert tracker.resets == 1
+
+
+def test_onnx_backend_exports_once_and_loads_export(fake_yolo, tmp_path):
+    weights = tmp_path / "model.pt"
+    weights.write_bytes(b"pt")
+    export_dir = tmp_path / "exports"
+    tracking.settings.yolo_export_dir = str(export_dir)
+    try:
+        model = tracking.get_model(str(weights), "cpu", backend="onnx")
+        tracking.clear_model_cache()
+        again = tracking.get_model(str(weights), "cpu", backend="onnx")
+    finally:
+        tracking.settings.yolo_export_dir = ""
+
+    assert fake_yolo.exports == ["onnx"]
+    assert model.weights == again.weights == str(export_dir / "model.onnx")
+    assert model.device is None
+    assert tracking.model_is_cached(str(weights), "cpu", backend="onnx")
+    assert not tracking.model_is_cached(str(weights), "cpu", backend="torch")
+
+
+def test_backend_export_failure_falls_back_to_torch(fake_yolo, tmp_path, monkeypatch):
+    monkeypatch.setattr(tracking, "INFERENCE_BACKENDS", (*tracking.INFERENCE_BACKENDS, "broken"))
+    weights = tmp_path / "model.pt"
+
+    model = tracking.get_model(str(weights), "cpu", backend="broken")
+
+    assert model.weights == str(weights)
+    assert model.device == "cpu"
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        tracking.resolve_backend_weights("model.pt", "tensorrt")
@@ -0,0 +1,48 @@
+import random
+import time
+
+import pytest
+
+from app.workers.pipeline import run_pipeline
+
+
+def _jitter():
+    time.sleep(random.random() * 0.002)
+
+
+def test_pipeline_preserves_order_across_batches():
+    out = []
+
+    def infer(batch):
+        _jitter()
+        return [x * 10 for x in batch]
+
+    def sink(item, result):
+        _jitter()
+        out.append((item, result))
+
+    n = run_pipeline(range(37), infer, sink, batch_size=4, queue_depth=2)
+
+    assert n == 37
+    assert out == [(i, i * 10) for i in range(37)]
+
+
+@pytest.mark.parametrize("stage", ["decode", "infer", "encode"])
+def test_pipeline_propagates_stage_errors(stage):
+    def source():
+        for i in range(100):
+            if stage == "decode" and i == 20:
+                raise ValueError("decode failed")
+            yield i
+
+    def infer(batch):
+        if stage == "infer" and 20 in batch:
+            raise ValueError("infer failed")
+        return batch
+
+    def sink(item, _result):
+        if stage == "encode" and item == 20:
+            raise ValueError("encode failed")
+
+    with pytest.raises(ValueError, match=f"{stage} failed"):
+        run_pipeline(source(), infer, sink, batch_size=3, queue_depth=2)
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import app.workers.vision.tracking as tracking
+from app.workers.vision.quantize import continuity
+from app.workers.vision.tracking import guardrail_report_path, int8_guardrail_error
+
+
+def _write_model(tmp_path, report=None):
+    model = tmp_path / "model_int8.onnx"
+    model.write_bytes(b"onnx")
+    if report is not None:
+        guardrail_report_path(model).write_text(json.dumps(report))
+    return model
+
+
+def test_guardrail_accepts_model_within_drift(tmp_path):
+    model = _write_model(tmp_path, {"fp32_detections": 120, "count_drift": 0.02, "continuity_drift": 0.04})
+    assert int8_guardrail_error(model, max_drift=0.05) is None
+
+
+@pytest.mark.parametrize(
+    "report, reason",
+    [
+        (None, "missing"),
+        ({"fp32_detections": 0, "count_drift": 0.0, "continuity_drift": 0.0}, "no FP32 detections"),
+        ({"fp32_detections": 120, "count_drift": 0.02, "continuity_drift": 0.2}, "exceeds"),
+    ],
+)
+def test_guardrail_refuses_unverified_or_drifting_model(tmp_path, report, reason):
+    model = _write_model(tmp_path, report)
+    assert reason in int8_guardrail_error(model, max_drift=0.05)
+
+
+def test_guardrail_refuses_missing_model(tmp_path):
+    assert "not found" in int8_guardrail_error(tmp_path / "missing.onnx")
+
+
+def test_rejected_int8_model_is_not_resolved(tmp_path):
+    weights = tmp_path / "model.pt"
+    _write_model(tmp_path, {"fp32_detections": 50, "count_drift": 0.5, "continuity_drift": 0.0})
+    assert tracking.resolve_backend_weights(str(weights), "onnx_int8") is None
+
+
+def test_continuity_is_mean_track_length():
+    frames = [(2, np.array([1, 2])), (2, np.array([1, 2])), (1, np.array([3])), (0, np.array([], dtype=int))]
+    assert continuity(frames) == pytest.approx(5 / 3)
+    assert continuity([]) == 0.0
+
+
+def test_track_clip_streams_batches_at_guardrail_imgsz(monkeypatch, tmp_path):
+    pytest.importorskip("cv2")
+    from app.workers.vision import quantize
+    from app.workers.vision.detections import FrameDetections
+
+    decoded = []
+
+    def frames(cap, **kwargs):
+        for i in range(10):
+            decoded.append(i)
+            yield i, i / 5.0, np.zeros((4, 4, 3), dtype=np.uint8)
+
+    calls = []
+
+    def track(model, batch, *, clip_id, timestamps_s, imgsz=None, **kwargs):
+        # nothing past the current batch has been decoded yet
+        calls.append((len(batch), len(decoded), imgsz))
+        return [FrameDetections.empty(clip_id, t, frame_area=16) for t in timestamps_s]
+
+    monkeypatch.setattr(quantize, "iter_sampled_frames", frames)
+    monkeypatch.setattr(quantize, "track_batch_columnar", track)
+
+    out = quantize._track_clip(object(), str(tmp_path / "clip.mp4"), fps_sampled=5.0, batch_size=4, imgsz=320)
+
+    assert len(out) == 10
+    assert calls == [(4, 4, 320), (4, 8, 320), (2, 10, 320)]
@@ -0,0 +1,156 @@
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.db.session import Base
+from app.models.entities import AnalyticsWindow, Event, Job, Organization, Track
+from app.services.result_cache import lookup_result, pipeline_key, remember_result, reuse_result
+from app.services.usage import get_or_create_usage, record_cache_lookup
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Organization(id=1, name="Org"))
+        session.flush()
+        yield session
+
+
+def _completed_job(db, digest="abc"):
+    job = Job(
+        org_id=1,
+        filename="drive.mp4",
+        status="completed",
+        storage_key=f"jobs/raw/{digest}.mp4",
+        fps_sampled=5,
+        settings_json={"fps_sampled": 5, "input_sha256": digest},
+        artifacts_json={"artifacts": [{"name": "events.jsonl", "key": "jobs/1/artifacts/events.jsonl"}]},
+    )
+    db.add(job)
+    db.flush()
+    db.add(Track(job_id=job.id, clip_id="main", class_name="truck", start_t=0.0, end_t=2.0))
+    track = Track(job_id=job.id, clip_id="main", class_name="car", start_t=0.0, end_t=4.0)
+    db.add(track)
+    db.flush()
+    db.add(Event(job_id=job.id, clip_id="main", track_id=track.id, type="cut_in", timestamp=1.0, confidence=0.8, review_status="confirm"))
+    db.add(AnalyticsWindow(job_id=job.id, clip_id="main", t_start=0.0, t_end=5.0, congestion_score=42.0))
+    db.flush()
+    return job
+
+
+def test_pipeline_key_depends_on_settings():
+    assert pipeline_key({"fps_sampled": 5}) == pipeline_key({"fps_sampled": 5, "input_sha256": "x"})
+    assert pipeline_key({"fps_sampled": 5}) != pipeline_key({"fps_sampled": 10})
+
+
+@pytest.mark.parametrize(
+    "name, value",
+    [
+        ("analytics_track_idle_s", 7.5),
+        ("video_decoder", "ffmpeg"),
+        ("keyframe_motion_high_px", 20.0),
+        ("adaptive_window_frames", 4),
+        ("adaptive_min_detections", 3),
+        ("preview_full_res_annotation", True),
+    ],
+)
+def test_pipeline_key_covers_worker_settings(monkeypatch, name, value):
+    from app.services import result_cache
+
+    before = pipeline_key({"fps_sampled": 5})
+    monkeypatch.setattr(result_cache.settings, name, value)
+    assert pipeline_key({"fps_sampled": 5}) != before
+
+
+def test_duplicate_upload_reuses_tracks_events_and_windows(db):
+    source = _completed_job(db)
+    remember_result(db, source)
+
+    target = Job(org_id=1, filename="drive.mp4", status="queued", storage_key=source.storage_key, settings_json={"fps_sampled": 5})
+    db.add(target)
+    db.flush()
+
+    hit = lookup_result(db, "abc", pipeline_key(target.settings_json), org_id=1)
+    assert hit.id == source.id
+    assert lookup_result(db, "abc", pipeline_key({"fps_sampled": 10}), org_id=1) is None
+    assert lookup_result(db, "abc", pipeline_key(target.settings_json), org_id=1, exclude_job_id=source.id) is None
+
+    reuse_result(db, hit, target)
+
+    assert target.status == "completed"
+    assert target.artifacts_json == source.artifacts_json
+    tracks = db.scalars(select(Track).where(Track.job_id == target.id).order_by(Track.id)).all()
+    assert [t.class_name for t in tracks] == ["truck", "car"]
+    event = db.scalars(select(Event).where(Event.job_id == target.id)).one()
+    assert event.track_id == tracks[1].id
+    assert event.review_status == "pending"
+    assert db.scalars(select(AnalyticsWindow).where(AnalyticsWindow.job_id == target.id)).one().congestion_score == 42.0
+
+
+def test_lookup_is_scoped_to_the_organization(db):
+    db.add(Organization(id=2, name="Other"))
+    remember_result(db, _completed_job(db))
+
+    key = pipeline_key({"fps_sampled": 5})
+    assert lookup_result(db, "abc", key, org_id=1) is not None
+    assert lookup_result(db, "abc", key, org_id=2) is None
+
+
+def test_worker_pipeline_key_is_remembered_and_matched(db):
+    from app.workers.tasks import _reuse_cached_result
+
+    source = _completed_job(db)
+    source.settings_json = {**source.settings_json, "pipeline_key": "worker-key"}
+    remember_result(db, source)
+    assert lookup_result(db, "abc", "worker-key", org_id=1).id == source.id
+    assert lookup_result(db, "abc", pipeline_key(source.settings_json), org_id=1) is None
+
+    target = Job(
+        org_id=1,
+        filename="drive.mp4",
+        status="running",
+        storage_key=source.storage_key,
+        settings_json={"fps_sampled": 5, "input_sha256": "abc", "pipeline_key": "worker-key"},
+    )
+    db.add(target)
+    db.flush()
+
+    assert _reuse_cached_result(db, target)
+    assert target.status == "completed"
+    assert target.settings_json["reused_from_job_id"] == source.id
+    assert get_or_create_usage(db, 1).cache_hits == 1
+
+
+def test_worker_records_one_cache_lookup_per_job(db):
+    from app.workers.tasks import _reuse_cached_result
+
+    job = Job(
+        org_id=1,
+        filename="drive.mp4",
+        status="running",
+        storage_key="jobs/raw/new.mp4",
+        settings_json={"fps_sampled": 5, "input_sha256": "new", "pipeline_key": "worker-key"},
+    )
+    db.add(job)
+    db.flush()
+
+    # a retried process_job runs the lookup again
+    assert not _reuse_cached_result(db, job)
+    assert not _reuse_cached_result(db, job)
+
+    usage = get_or_create_usage(db, 1)
+    assert (usage.cache_hits, usage.cache_misses) == (0, 1)
+
+
+def test_cache_lookups_are_counted(db):
+    record_cache_lookup(db, 1, hit=True)
+    record_cache_lookup(db, 1, hit=False)
+    record_cache_lookup(db, 1, hit=True)
+
+    usage = get_or_create_usage(db, 1)
+    assert (usage.cache_hits, usage.cache_misses) == (2, 1)
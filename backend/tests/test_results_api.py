@@ -0,0 +1,91 @@
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("boto3")
+
+from app.models.entities import AnalyticsWindow, Event, Job
+
+
+@pytest.fixture
+def client(api_client, api_session):
+    with api_session() as db:
+        db.add(Job(id=1, org_id=1, filename="drive.mp4", storage_key="jobs/raw/drive.mp4"))
+        for i in range(25):
+            # pairs of events share a timestamp, so pages must break ties on id
+            db.add(
+                Event(
+                    job_id=1,
+                    clip_id="a" if i % 2 else "b",
+                    type="cut_in",
+                    timestamp=float(i // 2),
+                    confidence=0.5,
+                    details_json={"i": i},
+                )
+            )
+            db.add(
+                AnalyticsWindow(
+                    job_id=1, clip_id="a", t_start=5.0 * i, t_end=5.0 * i + 5, congestion_score=10.0,
+                    counts_json={}, motion_json={},
+                )
+            )
+        db.commit()
+    return api_client
+
+
+def test_events_unpaginated_returns_every_field(client):
+    r = client.get("/api/jobs/1/events")
+    assert r.status_code == 200
+    body = r.json()
+    assert len(body) == 25 and "X-Next-Cursor" not in r.headers
+    assert set(body[0]) == {
+        "id", "job_id", "clip_id", "track_id", "type", "timestamp", "confidence", "details_json",
+        "review_status", "review_notes",
+    }
+    assert [e["details_json"]["i"] for e in body] == list(range(25))
+
+
+def test_events_keyset_pages_cover_all_rows_once(client):
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 4, "fields": "id,timestamp"}
+        if cursor:
+            params["cursor"] = cursor
+        r = client.get("/api/jobs/1/events", params=params)
+        page = r.json()
+        assert all(set(e) == {"id", "timestamp"} for e in page)
+        seen += page
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert len(seen) == 25
+    assert seen == sorted(seen, key=lambda e: (e["timestamp"], e["id"]))
+    assert len({e["id"] for e in seen}) == 25
+
+
+def test_events_time_range_and_clip_filters(client):
+    r = client.get("/api/jobs/1/events", params={"t_from": 3, "t_to": 6, "clip_id": "a", "fields": "timestamp,clip_id"})
+    assert r.json() == [{"timestamp": t, "clip_id": "a"} for t in (3.0, 4.0, 5.0)]
+
+
+def test_analytics_pagination_and_bad_params(client):
+    r = client.get("/api/jobs/1/analytics", params={"limit": 10, "t_from": 20, "fields": "t_start"})
+    assert [w["t_start"] for w in r.json()] == [5.0 * i for i in range(4, 14)]
+    r2 = client.get("/api/jobs/1/analytics", params={"limit": 10, "cursor": r.headers["X-Next-Cursor"], "fields": "t_start"})
+    assert r2.json()[0]["t_start"] == 70.0
+
+    assert client.get("/api/jobs/1/analytics", params={"fields": "t_start,secret"}).status_code == 400
+    assert client.get("/api/jobs/1/events", params={"cursor": "nope"}).status_code == 400
+    assert client.get("/api/jobs/1/events", params={"limit": 0}).status_code == 422
+
+
+def test_projected_rows_have_only_requested_keys_and_cursor_is_exposed(client):
+    r = client.get(
+        "/api/jobs/1/events",
+        params={"fields": "type,details_json", "limit": 2},
+        headers={"Origin": "http://localhost:3000"},
+    )
+    assert [set(e) for e in r.json()] == [{"type", "details_json"}] * 2
+    assert "x-next-cursor" in r.headers["access-control-expose-headers"].lower()
+
+    r = client.get("/api/jobs/1/analytics", params={"fields": "congestion_score"})
+    assert all(w == {"congestion_score": 10.0} for w in r.json())
@@ -0,0 +1,97 @@
+import asyncio
+import hashlib
+import io
+
+import pytest
+
+pytest.importorskip("boto3")
+pytest.importorskip("fastapi")
+
+import app.services.storage as storage
+
+
+class _FakeS3:
+    def __init__(self):
+        self.objects = {}
+        self.uploads = {}
+        self.aborted = []
+
+    def list_buckets(self):
+        return {"Buckets": [{"Name": storage.settings.s3_bucket}]}
+
+    def create_multipart_upload(self, Bucket, Key, ContentType):
+        upload_id = f"u{len(self.uploads) + 1}"
+        self.uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket, Key, PartNumber, UploadId, Body):
+        self.uploads[UploadId][PartNumber] = Body
+        return {"ETag": f"etag-{PartNumber}"}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        parts = self.uploads.pop(UploadId)
+        self.objects[Key] = b"".join(parts[p["PartNumber"]] for p in MultipartUpload["Parts"])
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.uploads.pop(UploadId, None)
+        self.aborted.append(Key)
+
+    def copy(self, CopySource, Bucket, Key):
+        self.objects[Key] = self.objects[CopySource["Key"]]
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop(Key, None)
+
+
+class _FakeUploadFile:
+    def __init__(self, payload: bytes):
+        self._body = io.BytesIO(payload)
+        self.content_type = "video/mp4"
+
+    async def read(self, size: int = -1) -> bytes:
+        return self._body.read(size)
+
+
+@pytest.fixture
+def fake_s3(monkeypatch):
+    fake = _FakeS3()
+    monkeypatch.setattr(storage, "s3", fake)
+    return fake
+
+
+def test_multipart_upload_splits_into_parts(fake_s3):
+    upload = storage.MultipartUpload("k", part_size=10)
+    for chunk in (b"a" * 7, b"b" * 7, b"c" * 7):
+        upload.write(chunk)
+    assert len(upload._buffer) < 10
+    upload.complete()
+
+    assert fake_s3.objects["k"] == b"a" * 7 + b"b" * 7 + b"c" * 7
+    assert upload.size == 21
+
+
+def test_stream_upload_is_content_addressed(fake_s3, monkeypatch):
+    from app.api import routes
+
+    monkeypatch.setattr(routes, "UPLOAD_READ_BYTES", 4)
+    payload = b"dashcam-bytes" * 5
+
+    key, digest, size = asyncio.run(routes.stream_upload_to_storage(_FakeUploadFile(payload), "mp4", 1024))
+
+    assert digest == hashlib.sha256(payload).hexdigest()
+    assert key == f"jobs/raw/{digest}.mp4"
+    assert size == len(payload)
+    assert list(fake_s3.objects) == [key]
+    assert fake_s3.objects[key] == payload
+
+
+def test_stream_upload_enforces_limit_and_aborts(fake_s3):
+    from fastapi import HTTPException
+
+    from app.api import routes
+
+    with pytest.raises(HTTPException) as err:
+        asyncio.run(routes.stream_upload_to_storage(_FakeUploadFile(b"x" * 100), "mp4", 50))
+
+    assert err.value.status_code == 400
+    assert fake_s3.aborted and not fake_s3.objects
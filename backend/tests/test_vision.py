@@ -5,10 +5,18 @@ from pathlib import Path
 import pytest
 
 np = pytest.importorskip("numpy")
-pytest.importorskip("cv2", exc_type=ImportError)
+cv2 = pytest.importorskip("cv2", exc_type=ImportError)
 
-from app.workers.vision.annotate import annotate_frame
-from app.workers.vision.tracking import track_frame
+from app.workers.vision.annotate import FrameAnnotator, annotate_frame
+from app.workers.vision.detections import FrameDetections
+from app.workers.vision.tracking import (
+    AdaptiveResolution,
+    parse_roi,
+    roi_pixels,
+    target_class_indices,
+    track_batch,
+    track_frame,
+)
 
 
 class _FakeTensor:
@@ -46,10 +54,29 @@ class _FakeResult:
 
 
 class _FakeModel:
-    def track(self, *_args, **_kwargs):
+    def track(self, source, *_args, **_kwargs):
+        if isinstance(source, list):
+            return [_FakeResult() for _ in source]
         return [_FakeResult()]
 
 
+class _SequentialTrackerModel:
+    """Fake model whose tracker state advances once per image, like ByteTrack."""
+
+    def __init__(self):
+        self.updates = 0
+
+    def track(self, source, *_args, **_kwargs):
+        images = source if isinstance(source, list) else [source]
+        results = []
+        for _ in images:
+            self.updates += 1
+            result = _FakeResult()
+            result.boxes.id = _FakeTensor([self.updates, self.updates + 100])
+            results.append(result)
+        return results
+
+
 def test_tracking_returns_stable_track_ids_across_frames():
     model = _FakeModel()
     frame = np.zeros((240, 320, 3), dtype=np.uint8)
@@ -75,6 +102,139 @@ def test_tracking_returns_stable_track_ids_across_frames():
     assert [d["track_id"] for d in second] == [1, 2]
 
 
+def test_track_batch_matches_per_frame_track_ids():
+    frames = [np.zeros((240, 320, 3), dtype=np.uint8) for _ in range(5)]
+    times = [i * 0.2 for i in range(5)]
+
+    per_frame_model = _SequentialTrackerModel()
+    per_frame = [
+        track_frame(
+            per_frame_model,
+            f,
+            clip_id="clipA",
+            timestamp_s=t,
+            frame_width=320,
+            frame_height=240,
+        )
+        for f, t in zip(frames, times)
+    ]
+
+    batched = track_batch(
+        _SequentialTrackerModel(),
+        frames,
+        clip_id="clipA",
+        timestamps_s=times,
+        frame_width=320,
+        frame_height=240,
+    )
+
+    assert len(batched) == len(frames)
+    assert batched == per_frame
+    assert [dets[0]["t"] for dets in batched] == times
+
+
+def test_track_batch_without_model_returns_empty_per_frame():
+    frames = [np.zeros((10, 10, 3), dtype=np.uint8)] * 3
+    out = track_batch(
+        None,
+        frames,
+        clip_id="clipA",
+        timestamps_s=[0.0, 0.1, 0.2],
+        frame_width=10,
+        frame_height=10,
+    )
+    assert out == [[], [], []]
+
+
+class _ClassFilteringModel(_FakeModel):
+    names = {0: "person", 1: "bicycle", 2: "car", 9: "traffic light", 56: "chair"}
+
+    def __init__(self):
+        self.calls = []
+
+    def track(self, source, *args, **kwargs):
+        self.calls.append(kwargs.get("classes"))
+        return super().track(source, *args, **kwargs)
+
+
+def test_target_classes_are_passed_to_detector_as_indices():
+    model = _ClassFilteringModel()
+    frames = [np.zeros((240, 320, 3), dtype=np.uint8)] * 2
+
+    track_frame(model, frames[0], clip_id="clipA", timestamp_s=0.0, frame_width=320, frame_height=240)
+    track_batch(model, frames, clip_id="clipA", timestamps_s=[0.0, 0.2], frame_width=320, frame_height=240)
+    track_frame(
+        model,
+        frames[0],
+        clip_id="clipA",
+        timestamp_s=0.0,
+        frame_width=320,
+        frame_height=240,
+        target_classes={"car"},
+    )
+
+    assert model.calls == [[0, 1, 2], [0, 1, 2], [2]]
+    assert target_class_indices(model, frozenset({"car"})) is target_class_indices(model, frozenset({"car"}))
+    assert target_class_indices(model, frozenset({"boat"})) is None
+    assert target_class_indices(_FakeModel(), frozenset({"car"})) is None
+
+
+class _RecordingModel(_FakeModel):
+    def __init__(self):
+        self.shapes = []
+        self.imgsz = []
+
+    def track(self, source, *args, **kwargs):
+        self.shapes.extend(img.shape for img in source)
+        self.imgsz.append(kwargs.get("imgsz"))
+        return super().track(source, *args, **kwargs)
+
+
+def test_roi_crop_maps_boxes_back_to_frame_coordinates():
+    model = _RecordingModel()
+    frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    roi = roi_pixels(parse_roi("0.1,0.25,0.9,0.75"), 1920, 1080)
+
+    full = track_frame(model, frame, clip_id="c", timestamp_s=0.0, frame_width=1920, frame_height=1080)
+    cropped = track_frame(
+        model,
+        frame,
+        clip_id="c",
+        timestamp_s=0.0,
+        frame_width=1920,
+        frame_height=1080,
+        imgsz=500,
+        roi=roi,
+    )
+
+    assert roi == (192, 270, 1728, 810)
+    assert model.shapes == [(1080, 1920, 3), (540, 1536, 3)]
+    assert model.imgsz == [640, 512]
+    assert cropped[0]["xc"] == full[0]["xc"] + 192
+    assert cropped[0]["yc"] == full[0]["yc"] + 270
+    assert cropped[0]["area_ratio"] == full[0]["area_ratio"]
+
+
+def test_roi_parsing():
+    assert parse_roi("") is None
+    assert roi_pixels(parse_roi("0,0,1,1"), 640, 480) is None
+    with pytest.raises(ValueError):
+        parse_roi("0,0.5,1,0.4")
+    with pytest.raises(ValueError):
+        parse_roi("top")
+
+
+def test_adaptive_resolution_drops_on_empty_frames_and_recovers():
+    res = AdaptiveResolution(640, 320, window=3)
+    res.update([0, 0])
+    assert res.imgsz == 640
+    res.update([0])
+    assert res.imgsz == 320
+    res.update([0, 0, 2])
+    assert res.imgsz == 640
+    assert AdaptiveResolution(640).imgsz == 640
+
+
 def test_preview_tracking_mp4_generated(tmp_path: Path):
     cv2 = pytest.importorskip("cv2")
 
@@ -109,4 +269,82 @@ def test_preview_tracking_mp4_generated(tmp_path: Path):
         writer.release()
 
     assert out_path.exists()
-    assert out_path.stat().st_size > 0
\ No newline at end of file
+    assert out_path.stat().st_size > 0
+
+
+def _columnar(track_ids, xc):
+    n = len(track_ids)
+    return FrameDetections.from_arrays(
+        clip_id="c",
+        t=0.0,
+        xywh=np.column_stack([xc, np.full(n, 100.0), np.full(n, 40.0), np.full(n, 30.0)]),
+        conf=np.full(n, 0.9),
+        class_id=np.full(n, 2),
+        track_id=np.array(track_ids),
+        names={2: "car"},
+        frame_width=320,
+        frame_height=240,
+    )
+
+
+def test_frame_annotator_matches_annotate_frame_and_reuses_buffer():
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 255, size=(240, 320, 3), dtype=np.uint8)
+    annotator = FrameAnnotator(trail_length=5)
+    history: dict[int, list[tuple[float, float]]] = {}
+
+    outputs = []
+    for i in range(8):
+        dets = _columnar([7], [60.0 + 10 * i])
+        out = annotator.draw(frame, dets)
+        assert np.array_equal(out, annotate_frame(frame, dets, history, trail_length=5))
+        outputs.append(out)
+    assert all(o is outputs[0] for o in outputs)
+    assert len(history[7]) == 5
+
+
+def test_frame_annotator_evicts_stale_trails():
+    annotator = FrameAnnotator(trail_length=4, evict_after=3, capacity=2)
+    for i in range(10):
+        annotator.observe(_columnar([i, 100], [10.0 * i, 50.0]))
+        assert annotator.live_trails <= 5
+    annotator.observe(_columnar([100], [50.0]))
+    for _ in range(4):
+        annotator.observe(_columnar([], []))
+    assert annotator.live_trails == 0
+
+
+def test_frame_annotator_downscaled_blur_stays_close():
+    frame = np.random.default_rng(1).integers(0, 255, size=(480, 640, 3), dtype=np.uint8)
+    dets = _columnar([], [])
+    full = FrameAnnotator().draw(frame, dets).copy()
+    scaled = FrameAnnotator(blur_scale=0.5).draw(frame, dets)
+    assert np.abs(full.astype(int) - scaled).mean() < 3.0
+    assert np.array_equal(full[:96], scaled[:96])
+
+
+def test_frame_annotator_draws_at_output_size():
+    rng = np.random.default_rng(2)
+    frame = rng.integers(0, 255, size=(480, 640, 3), dtype=np.uint8)
+    small = cv2.resize(frame, (320, 240), interpolation=cv2.INTER_AREA)
+    annotator = FrameAnnotator(trail_length=5, output_size=(320, 240), src_size=(640, 480))
+    history: dict[int, list[tuple[float, float]]] = {7: [(40.0, 50.0)]}
+
+    annotator.observe(_columnar([7], [80.0]))
+    for i in range(4):
+        out = annotator.draw(frame, _columnar([7], [120.0 + 20 * i]))
+        # the same box in output pixels: every coordinate halves
+        dets = _columnar([7], [60.0 + 10 * i])
+        scaled = FrameDetections.from_arrays(
+            clip_id="c",
+            t=0.0,
+            xywh=np.column_stack([dets.xc, dets.yc / 2, dets.w / 2, dets.h / 2]),
+            conf=dets.conf,
+            class_id=np.full(1, 2),
+            track_id=dets.track_id,
+            names={2: "car"},
+            frame_width=320,
+            frame_height=240,
+        )
+        assert out.shape == (240, 320, 3)
+        assert np.array_equal(out, annotate_frame(small, scaled, history, trail_length=5))